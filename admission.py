@@ -0,0 +1,221 @@
+"""
+Admission control and load shedding
+
+Under a burst, uvicorn accepts every connection and /predict work piles
+up until every request times out. AdmissionControl sits in front of
+the app and sorts requests into route classes. Each limited class has:
+
+    - a concurrency limit: requests past it wait in a FIFO queue
+    - a queue limit: past it, requests are shed right away
+    - a latency budget: the expected wait (queue length x the class's
+      recent service time / concurrency) must fit in it, and nobody
+      waits longer than it
+
+A slot covers only the expensive part of a request: the handler takes
+it with ``async with admitted(request.scope)`` once the body has been
+received, just before inference. Slow uploads therefore hold no slot
+(a handful of slowloris clients cannot starve /predict), and upload
+time stays out of the service-time average behind the wait estimate.
+
+Requests that would be shed anyway (queue full, or expected wait over
+budget) get 503 with Retry-After (the expected wait) before their body
+is read; the rest can still be shed when they ask for a slot, in which
+case admitted() raises Overloaded and the handler answers 503. An
+overloaded server keeps completing the requests it admitted instead of
+timing out all of them. Requests in no limited class (/, OPTIONS,
+/honeypot, ...) are never queued or shed.
+
+Configuration (environment variables):
+    ADMISSION_CONCURRENCY   /predict requests processed at once (default 8, 0 disables)
+    ADMISSION_QUEUE         /predict requests allowed to wait (default 32)
+    ADMISSION_BUDGET        seconds a /predict request may wait (default 10)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from asgi_fast_path import InlineCORS
+from serialization import StaticJSON
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_QUEUE = 32
+DEFAULT_BUDGET = 10.0
+# Weight of the newest request in the service-time average
+SMOOTHING = 0.2
+
+OVERLOADED = StaticJSON({"error": "Server busy, retry later"})
+# Where AdmissionControl leaves a request's RouteClass for admitted()
+SCOPE_KEY = "admission.route_class"
+
+
+def retry_after_header(retry_after: float) -> str:
+    """Retry-After value: whole seconds, at least 1"""
+    return str(max(1, math.ceil(retry_after)))
+
+
+class Overloaded(Exception):
+    """The request was shed: no slot within its class's queue and latency limits"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Server busy, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return retry_after_header(self.retry_after)
+
+
+class RouteClass:
+    """Concurrency, queue and latency limits of one kind of request"""
+
+    def __init__(self, name: str, concurrency: int, queue: int, budget: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.budget = budget
+        self.in_flight = 0
+        self.service_time = 0.0  # moving average, seconds
+        self.admitted = 0
+        self.shed = 0
+        self._waiters: deque = deque()
+
+    def expected_wait(self) -> float:
+        """Seconds a request arriving now would wait for a slot"""
+        if self.in_flight < self.concurrency and not self._waiters:
+            return 0.0
+        return (len(self._waiters) + 1) * self.service_time / self.concurrency
+
+    def would_shed(self) -> Optional[float]:
+        """Retry delay if a request asking for a slot now would be shed at once, else None"""
+        if self.in_flight < self.concurrency and not self._waiters:
+            return None
+        wait = self.expected_wait()
+        if len(self._waiters) >= self.queue or wait > self.budget:
+            return wait
+        return None
+
+    async def acquire(self) -> Optional[float]:
+        """Take a slot (waiting if needed): None when admitted, else a retry delay"""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+        wait = self.would_shed()
+        if wait is not None:
+            self.shed += 1
+            return wait
+
+        slot = asyncio.get_running_loop().create_future()
+        self._waiters.append(slot)
+        try:
+            await asyncio.wait_for(slot, self.budget)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if slot.done() and not slot.cancelled():
+                self.release(None)  # handed over just as we gave up
+            elif slot in self._waiters:
+                self._waiters.remove(slot)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.shed += 1
+            return self.expected_wait() or self.budget
+        self.admitted += 1
+        return None
+
+    def release(self, elapsed: Optional[float]) -> None:
+        """Free a slot, handing it to the oldest waiter"""
+        if elapsed is not None:
+            self.service_time += SMOOTHING * (elapsed - self.service_time)
+        while self._waiters:
+            slot = self._waiters.popleft()
+            if not slot.done():
+                slot.set_result(None)  # in_flight stays: the slot changes hands
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "queued": len(self._waiters),
+                "concurrency": self.concurrency, "service_ms": round(self.service_time * 1000, 1),
+                "expected_wait_ms": round(self.expected_wait() * 1000, 1),
+                "admitted": self.admitted, "shed": self.shed}
+
+
+class AdmissionControl:
+    """
+    Usage:
+        app = AdmissionControl(app, classify=lambda scope: "predict" if ... else None,
+                               classes={"predict": RouteClass("predict", 8, 32, 10.0)},
+                               cors=CORS_OPTIONS)
+    """
+
+    def __init__(self, app, classify: Callable[[dict], Optional[str]],
+                 classes: Dict[str, RouteClass], cors: Optional[dict] = None):
+        self.app = app
+        self.classify = classify
+        self.classes = classes
+        self.cors = InlineCORS(cors) if cors is not None else None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self.classes.get(self.classify(scope))
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Hopeless requests are turned away before their body is read;
+        # the slot itself is taken by the handler (admitted())
+        retry_after = route_class.would_shed()
+        if retry_after is not None:
+            route_class.shed += 1
+            await self._shed(scope, send, retry_after)
+            return
+        scope[SCOPE_KEY] = route_class
+        await self.app(scope, receive, send)
+
+    async def _shed(self, scope, send, retry_after: float) -> None:
+        headers = list(OVERLOADED.raw_headers)
+        headers.append((b"retry-after", retry_after_header(retry_after).encode()))
+        if self.cors is not None:
+            headers.extend(self.cors.headers(InlineCORS.origin(scope)[0]))
+        await send({"type": "http.response.start", "status": 503, "headers": headers})
+        await send({"type": "http.response.body", "body": OVERLOADED.body})
+
+    def stats(self) -> dict:
+        return {name: route_class.stats() for name, route_class in self.classes.items()}
+
+
+@asynccontextmanager
+async def admitted(scope: dict) -> AsyncIterator[None]:
+    """
+    Hold a slot of the request's route class while the block runs (the
+    expensive part, after the body is in); a no-op for requests
+    AdmissionControl did not classify. Raises Overloaded when shed.
+    """
+    route_class: Optional[RouteClass] = scope.get(SCOPE_KEY)
+    if route_class is None:
+        yield
+        return
+    retry_after = await route_class.acquire()
+    if retry_after is not None:
+        raise Overloaded(retry_after)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        route_class.release(time.monotonic() - started)
+
+
+def predict_class_from_env() -> Optional[RouteClass]:
+    """The /predict route class from ADMISSION_*, None when disabled"""
+    concurrency = int(os.environ.get("ADMISSION_CONCURRENCY", DEFAULT_CONCURRENCY))
+    if concurrency <= 0:
+        return None
+    return RouteClass("predict", concurrency,
+                      int(os.environ.get("ADMISSION_QUEUE", DEFAULT_QUEUE)),
+                      float(os.environ.get("ADMISSION_BUDGET", DEFAULT_BUDGET)))
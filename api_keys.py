@@ -0,0 +1,270 @@
+"""
+API key store: hashed keys, cached constant-time checks, per-key rate limits
+
+Keys are configured as salted PBKDF2-SHA256 hashes, never in clear:
+
+    pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+
+A presented key is checked against every configured hash with
+hmac.compare_digest. PBKDF2 is slow on purpose, so outcomes are kept
+under an HMAC of the presented key with a per-process secret: a key
+that verified is remembered for the life of the process (it is never
+hashed, or throttled, again), and a wrong one that keeps coming back
+costs one hash per cache TTL. Hash work is rate limited per client
+address, so a client sending random keys cannot eat the CPU or lock
+anyone else out, and check_async runs it on a worker thread instead of
+the event loop.
+
+Each key has a token bucket: over-quota callers get 429 with
+Retry-After before their body is read or any inference runs.
+
+Only a configured key passes. Before this store, app.py and main_old.py
+let through any key containing "guvi" (any case), so "GUVI-test" or
+"guvi_2024" worked; those clients now get 401. API_KEY_LEGACY_MATCH=guvi
+brings the old check back, as a stopgap while clients move to a real
+key: every key containing the text (configured ones included) shares
+one "legacy" bucket and is never hashed.
+
+Configuration (environment variables):
+    API_KEY_HASHES         comma-separated hashes, each optionally "name=hash"
+    API_KEYS_FILE          JSON file {"name": {"hash": "...", "rate": 5, "burst": 10}}
+    API_KEY                a plain key, hashed at startup (default guvi123;
+                           used only when no hashes are configured)
+    API_KEY_RATE           requests per second per key (default 20)
+    API_KEY_BURST          bucket size per key (default 40)
+    API_KEY_FAILURE_RATE   new wrong keys hashed per second per client address (default 5)
+    API_KEY_CACHE_TTL      seconds a lookup stays cached (default 300)
+    API_KEY_LEGACY_MATCH   also accept any key containing this text, any case (default: off)
+
+Usage:
+    python api_keys.py hash <key>      # prints a hash for API_KEY_HASHES
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import math
+import os
+import secrets
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from prediction_cache import LRUCache
+
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 20_000
+DEFAULT_KEY = "guvi123"
+DEFAULT_RATE = 20.0
+DEFAULT_BURST = 40.0
+DEFAULT_FAILURE_RATE = 5.0
+DEFAULT_CACHE_TTL = 300.0
+# Cached value of a presented key that matches nothing
+UNKNOWN = ""
+# Name reported for keys let in by API_KEY_LEGACY_MATCH
+LEGACY = "legacy"
+
+
+def hash_key(key: str, iterations: int = DEFAULT_ITERATIONS, salt: Optional[bytes] = None) -> str:
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", key.encode(), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``burst`` saved up"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """Spend a token: 0 if allowed, else seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def refund(self) -> None:
+        """Give back a token spent on something that turned out not to count"""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class ApiKey:
+    def __init__(self, name: str, hashed: str, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST):
+        algorithm, iterations, salt, digest = hashed.split("$")
+        if algorithm != ALGORITHM:
+            raise ValueError(f"Unsupported key hash '{algorithm}' for key '{name}'")
+        self.name = name
+        self.iterations = int(iterations)
+        self.salt = bytes.fromhex(salt)
+        self.digest = bytes.fromhex(digest)
+        self.bucket = TokenBucket(rate, burst)
+
+    def matches(self, key: str) -> bool:
+        candidate = hashlib.pbkdf2_hmac("sha256", key.encode(), self.salt, self.iterations)
+        return hmac.compare_digest(candidate, self.digest)
+
+
+class KeyCheck(NamedTuple):
+    status: int  # 200, 401 or 429
+    key: Optional[str] = None  # name of the matching key
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value: whole seconds, at least 1"""
+        return str(max(1, math.ceil(min(self.retry_after, 3600))))
+
+
+def client_host(request) -> Optional[str]:
+    """The address a request came from, for per-client failure limits"""
+    return request.client.host if request.client else None
+
+
+class ApiKeyStore:
+    """
+    Usage:
+        store = ApiKeyStore.from_env()
+        check = await store.check_async(request.headers.get("x-api-key"), client_host(request))
+        if check.status != 200: ...  # 401, or 429 + check.retry_after
+    """
+
+    def __init__(self, keys: List[ApiKey], failure_rate: float = DEFAULT_FAILURE_RATE,
+                 cache_ttl: float = DEFAULT_CACHE_TTL, cache_entries: int = 4096,
+                 legacy_match: Optional[str] = None, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST):
+        self.keys: Dict[str, ApiKey] = {key.name: key for key in keys}
+        # Substring check of the old servers, only when asked for
+        self.legacy_match = legacy_match.lower() if legacy_match else None
+        self._legacy_bucket = TokenBucket(rate, burst)
+        # Presented key token -> name: keys that verified (one entry per configured key)
+        self._verified: Dict[str, str] = {}
+        # Presented key token -> UNKNOWN: wrong keys seen lately
+        self._cache = LRUCache(max_entries=cache_entries, max_bytes=cache_entries * 64, ttl=cache_ttl)
+        self._secret = secrets.token_bytes(32)
+        self.failure_rate = failure_rate
+        # Client address -> TokenBucket for hash work
+        self._failures = LRUCache(max_entries=cache_entries, max_bytes=cache_entries, ttl=cache_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.rejected: Dict[int, int] = {401: 0, 429: 0}
+
+    @classmethod
+    def from_env(cls) -> "ApiKeyStore":
+        rate = float(os.environ.get("API_KEY_RATE", DEFAULT_RATE))
+        burst = float(os.environ.get("API_KEY_BURST", DEFAULT_BURST))
+        keys = []
+        for number, entry in enumerate(filter(None, os.environ.get("API_KEY_HASHES", "").split(","))):
+            name, _, hashed = entry.strip().rpartition("=")
+            keys.append(ApiKey(name or f"key-{number + 1}", hashed, rate, burst))
+        path = os.environ.get("API_KEYS_FILE")
+        if path:
+            with open(path) as f:
+                for name, config in json.load(f).items():
+                    keys.append(ApiKey(name, config["hash"], float(config.get("rate", rate)),
+                                       float(config.get("burst", burst))))
+        if not keys:
+            keys.append(ApiKey("default", hash_key(os.environ.get("API_KEY", DEFAULT_KEY)), rate, burst))
+        return cls(keys,
+                   failure_rate=float(os.environ.get("API_KEY_FAILURE_RATE", DEFAULT_FAILURE_RATE)),
+                   cache_ttl=float(os.environ.get("API_KEY_CACHE_TTL", DEFAULT_CACHE_TTL)),
+                   legacy_match=os.environ.get("API_KEY_LEGACY_MATCH"), rate=rate, burst=burst)
+
+    def _verify(self, presented: str) -> str:
+        name = UNKNOWN
+        for key in self.keys.values():  # no early exit: same work for every outcome
+            if key.matches(presented) and not name:
+                name = key.name
+        return name
+
+    def check(self, presented: Optional[str], client: Optional[str] = None) -> KeyCheck:
+        """
+        Authenticate and rate-limit one request (no key counts as a wrong
+        one); any hashing runs on the calling thread
+        """
+        pending = self._lookup(presented, client)
+        if isinstance(pending, KeyCheck):
+            return pending
+        return self._verified_check(pending, self._verify(presented))
+
+    async def check_async(self, presented: Optional[str], client: Optional[str] = None) -> KeyCheck:
+        """check() for async handlers: hashing runs on a worker thread, never on the event loop"""
+        pending = self._lookup(presented, client)
+        if isinstance(pending, KeyCheck):
+            return pending
+        return self._verified_check(pending, await run_in_threadpool(self._verify, presented))
+
+    def _lookup(self, presented: Optional[str], client: Optional[str]):
+        """A KeyCheck when no hashing is needed, else (token, the client's failure bucket)"""
+        if not presented:
+            return self._admit(UNKNOWN)
+        token = hmac.new(self._secret, presented.encode(), hashlib.sha256).hexdigest()
+        name = self._verified.get(token)
+        if name is None:
+            name = self._cache.get(token)
+        if name is not None:
+            self.hits += 1
+            return self._admit(name)
+        if self.legacy_match and self.legacy_match in presented.lower():
+            return self._admit(LEGACY, self._legacy_bucket)
+
+        # Not seen lately: hashing is rate limited per client address. The
+        # token is given back if the key verifies, so only failures count.
+        bucket = self._failures.get(client or "")
+        if bucket is None:
+            bucket = TokenBucket(self.failure_rate, max(self.failure_rate, 1.0))
+            self._failures.put(client or "", bucket, 1)
+        retry_after = bucket.take()
+        if retry_after:
+            self.rejected[429] += 1
+            return KeyCheck(429, retry_after=retry_after)
+        self.misses += 1
+        return token, bucket
+
+    def _verified_check(self, pending: tuple, name: str) -> KeyCheck:
+        token, bucket = pending
+        if name:
+            self._verified[token] = name
+            bucket.refund()
+        else:
+            self._cache.put(token, name, 64)
+        return self._admit(name)
+
+    def _admit(self, name: str, bucket: Optional[TokenBucket] = None) -> KeyCheck:
+        if not name:
+            self.rejected[401] += 1
+            return KeyCheck(401)
+        retry_after = (bucket or self.keys[name].bucket).take()
+        if retry_after:
+            self.rejected[429] += 1
+            return KeyCheck(429, name, retry_after)
+        return KeyCheck(200, name)
+
+    def stats(self) -> dict:
+        return {"keys": len(self.keys), "cache_hits": self.hits, "cache_misses": self.misses,
+                "rejected": dict(self.rejected)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hash API keys for API_KEY_HASHES / API_KEYS_FILE")
+    commands = parser.add_subparsers(dest="command", required=True)
+    hash_command = commands.add_parser("hash", help="print the hash of a key")
+    hash_command.add_argument("key")
+    hash_command.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    args = parser.parse_args()
+    print(hash_key(args.key, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Lean ASGI front for the hot routes
+
+Every /honeypot and /predict call (and every request to an unknown or
+empty path) normally goes through FastAPI routing, CORSMiddleware and
+the catch-all handler before the real handler builds a Response.
+FastPathApp answers those requests itself:
+
+    - the route is looked up in a table precompiled from the wrapped
+      app's routes (exact paths first, then the catch-all)
+    - CORS headers and preflights are handled inline with the same
+      configuration as the CORSMiddleware of the wrapped app
+    - handlers return a FastResponse (status, body bytes, media type),
+      sent as two ASGI messages
+
+Anything else (/, /ready, /stats, /admin, docs, lifespan) is passed to
+the wrapped app untouched, so status codes and payloads stay the same
+whichever app serves a request.
+"""
+
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+
+
+class FastResponse(NamedTuple):
+    status: int
+    body: bytes = b""
+    media_type: Optional[str] = None
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+Handler = Callable[[Request], Awaitable[FastResponse]]
+Route = Tuple[Iterable[str], Handler]
+
+# A path the wrapped app serves for every method (mounts, websockets)
+ANY_METHOD = None
+
+
+class InlineCORS:
+    """CORSMiddleware's headers and preflight answers, for raw ASGI senders"""
+
+    def __init__(self, options: dict):
+        self.middleware = CORSMiddleware(None, **options)
+        self._simple = [(name.lower().encode(), value.encode("latin-1"))
+                        for name, value in self.middleware.simple_headers.items()
+                        if name.lower() != "access-control-allow-origin"]
+
+    @staticmethod
+    def origin(scope) -> Tuple[Optional[str], bool]:
+        """(Origin header, whether this is a preflight)"""
+        origin, preflight = None, False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"access-control-request-method":
+                preflight = True
+        return origin, preflight and origin is not None and scope["method"] == "OPTIONS"
+
+    async def preflight(self, scope, receive, send) -> None:
+        response = self.middleware.preflight_response(request_headers=Headers(scope=scope))
+        await response(scope, receive, send)
+
+    def headers(self, origin: Optional[str]) -> List[Tuple[bytes, bytes]]:
+        """What CORSMiddleware adds to a non-preflight response"""
+        cors = self.middleware
+        if origin is None:
+            return [(b"vary", b"Origin")]
+        headers = list(self._simple)
+        if cors.allow_all_origins and not cors.allow_credentials:
+            headers.append((b"access-control-allow-origin", b"*"))
+        elif cors.is_allowed_origin(origin):
+            # Credentials (or a specific origin list): mirror the origin back
+            headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+        headers.append((b"vary", b"Origin"))
+        return headers
+
+
+def _with_head(methods: Iterable[str]) -> frozenset:
+    # Starlette serves HEAD wherever it serves GET
+    methods = frozenset(methods)
+    return methods | {"HEAD"} if "GET" in methods else methods
+
+
+class FastPathApp:
+    """
+    Usage:
+        app = FastPathApp(fastapi_app,
+                          routes={"/honeypot": (["GET", "POST"], honeypot)},
+                          catch_all=(["GET", "POST", "OPTIONS"], catch_all),
+                          cors=CORS_OPTIONS)
+    """
+
+    def __init__(self, app, routes: Dict[str, Route], catch_all: Optional[Route] = None,
+                 cors: Optional[dict] = None):
+        self.app = app
+        self.routes = {path: (_with_head(methods), handler) for path, (methods, handler) in routes.items()}
+        self.catch_all = (_with_head(catch_all[0]), catch_all[1]) if catch_all else None
+        self.cors = InlineCORS(cors) if cors is not None else None
+        # Built on the first request: routes are still being added at import time
+        self._table: Optional[Dict[str, Optional[frozenset]]] = None
+
+    def _build_table(self) -> Dict[str, Optional[frozenset]]:
+        """Methods the wrapped app serves on each fixed path it owns"""
+        table: Dict[str, Optional[frozenset]] = {}
+        for route in getattr(self.app, "routes", ()):
+            path = getattr(route, "path", None)
+            if path is None or "{" in path or path in self.routes:
+                continue  # the catch-all or a route served here
+            methods = getattr(route, "methods", None)
+            if methods is None or table.get(path, frozenset()) is ANY_METHOD:
+                table[path] = ANY_METHOD
+            else:
+                table[path] = table.get(path, frozenset()) | _with_head(methods)
+        return table
+
+    def resolve(self, path: str, method: str) -> Optional[Handler]:
+        """The handler serving this request here, or None to pass it on"""
+        route = self.routes.get(path)
+        if route is not None and method in route[0]:
+            return route[1]
+        owned = self._table.get(path, frozenset())
+        if owned is ANY_METHOD or method in owned:
+            return None
+        if self.catch_all is not None and method in self.catch_all[0]:
+            return self.catch_all[1]
+        return None  # the wrapped app answers (405)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._table is None:
+            self._table = self._build_table()
+        handler = self.resolve(scope["path"], scope["method"])
+        if handler is None:
+            await self.app(scope, receive, send)
+            return
+
+        origin, preflight = InlineCORS.origin(scope)
+        if self.cors is not None and preflight:
+            await self.cors.preflight(scope, receive, send)
+            return
+
+        try:
+            result = await handler(Request(scope, receive))
+        except Exception:
+            # As Starlette's ServerErrorMiddleware: plain 500, then re-raise for the server log
+            await self._send(send, FastResponse(500, b"Internal Server Error", "text/plain; charset=utf-8"),
+                             None, cors=False)
+            raise
+        await self._send(send, result, origin)
+
+    async def _send(self, send, result: FastResponse, origin: Optional[str], cors: bool = True) -> None:
+        headers: List[Tuple[bytes, bytes]] = [(name.lower().encode(), value.encode("latin-1"))
+                                              for name, value in result.headers]
+        headers.append((b"content-length", str(len(result.body)).encode()))
+        if result.media_type is not None:
+            headers.append((b"content-type", result.media_type.encode()))
+        if cors and self.cors is not None:
+            headers.extend(self.cors.headers(origin))
+        await send({"type": "http.response.start", "status": result.status, "headers": headers})
+        await send({"type": "http.response.body", "body": result.body})
+
+
+async def call(app, method: str, path: str, headers: Sequence[Tuple[str, str]] = (),
+               body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Run one HTTP request through an ASGI app in-process (no server):
+    returns (status, headers, body). Used by the tests and benchmark.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+        "headers": [(name.lower().encode(), value.encode("latin-1")) for name, value in headers],
+    }
+    if body:
+        scope["headers"].append((b"content-length", str(len(body)).encode()))
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in start["headers"]}
+    return start["status"], response_headers, b"".join(m.get("body", b"") for m in sent[1:])
@@ -0,0 +1,344 @@
+"""
+Streaming audio payload decoder for /predict
+
+Parses the JSON request body as it arrives and decodes the
+audio_base64 / audioBase64 field chunk by chunk straight into the
+audio buffer. Only the decoded audio is ever held in memory in full;
+the JSON text and the base64 string are never buffered.
+"""
+
+import binascii
+import json
+import re
+import sys
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from body_reader import BoundedBody
+
+AUDIO_FIELDS = ("audio_base64", "audioBase64")
+
+# Other top-level fields (language, audioFormat, ...) are small; anything
+# bigger than this is skipped instead of being buffered.
+MAX_FIELD_BYTES = 4096
+
+_WHITESPACE = b" \t\r\n"
+# URL-safe alphabet -> standard alphabet
+_URLSAFE = bytes.maketrans(b"-_", b"+/")
+_AUDIO_STOP = re.compile(rb'["\\]')
+# a2b_base64 otherwise skips stray characters, shifting every later
+# 4-char group; before 3.11 the alphabet is checked here instead
+_STRICT_BASE64 = sys.version_info >= (3, 11)
+_NOT_BASE64 = re.compile(rb"[^A-Za-z0-9+/=]")
+_JSON_ESCAPES = {ord("/"): b"/", ord("n"): b"", ord("r"): b"", ord("t"): b""}
+
+# Parser states
+_START, _KEY_OR_END, _KEY, _COLON, _VALUE, _AUDIO, _AUDIO_ESCAPE, _OTHER, _DONE = range(9)
+
+
+class AudioPayloadError(ValueError):
+    """Raised when the body is not a JSON object or the audio is not valid base64"""
+
+
+class RequestAudio(NamedTuple):
+    audio: bytearray
+    fields: Dict[str, Any]
+    # Why the body stopped early ("idle", "deadline" or "disconnect"):
+    # the audio is then only the part that arrived
+    truncated: Optional[str] = None
+
+
+class StreamingAudioDecoder:
+    """
+    Incremental parser for a top-level JSON object
+
+    Usage:
+        decoder = StreamingAudioDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+        audio, fields = decoder.close()
+    """
+
+    def __init__(self, audio_fields=AUDIO_FIELDS, max_field_bytes: int = MAX_FIELD_BYTES):
+        self.audio_fields = set(audio_fields)
+        self.max_field_bytes = max_field_bytes
+        self.audio = bytearray()
+        self.fields: Dict[str, Any] = {}
+        self.audio_field = None
+
+        self._state = _START
+        self._key = bytearray()
+        self._key_escape = False
+        self._pending = bytearray()  # base64 chars not yet forming a 4-char group
+        self._padded = False  # a group ending in "=" was decoded: no more audio may follow
+        self._unicode = None  # hex digits of a \uXXXX escape inside the audio string
+        self._raw = bytearray()
+        self._raw_overflow = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    # ----------------------------------------
+    # Public API
+    # ----------------------------------------
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next piece of the request body"""
+        pos = 0
+        end = len(chunk)
+        while pos < end:
+            state = self._state
+            if state == _AUDIO:
+                pos = self._feed_audio(chunk, pos)
+            elif state == _AUDIO_ESCAPE:
+                pos = self._feed_audio_escape(chunk, pos)
+            elif state == _OTHER:
+                pos = self._feed_other(chunk, pos)
+            elif state == _DONE:
+                if chunk[pos:].strip(_WHITESPACE):
+                    raise AudioPayloadError("Unexpected data after JSON object")
+                return
+            else:
+                pos = self._feed_structure(chunk, pos)
+
+    def close(self) -> Tuple[bytearray, Dict[str, Any]]:
+        """
+        Finish parsing
+
+        Returns:
+            audio: decoded audio bytes (empty if no audio field was sent)
+            fields: the other top-level fields of the JSON object
+        """
+        if self._state != _DONE:
+            raise AudioPayloadError("Truncated JSON body")
+        return self.audio, self.fields
+
+    def partial(self) -> Tuple[bytearray, Dict[str, Any]]:
+        """
+        What a body that stopped early decoded to: the audio up to its last
+        complete base64 group and the fields that arrived in full
+        """
+        return self.audio, self.fields
+
+    # ----------------------------------------
+    # Object structure (keys, colons, commas)
+    # ----------------------------------------
+
+    def _feed_structure(self, chunk: bytes, pos: int) -> int:
+        byte = chunk[pos]
+        state = self._state
+
+        if state == _KEY:
+            if self._key_escape:
+                self._key_escape = False
+            elif byte == 0x5C:  # backslash
+                self._key_escape = True
+            elif byte == 0x22:  # closing quote
+                self._state = _COLON
+                return pos + 1
+            self._key.append(byte)
+            return pos + 1
+
+        if byte in _WHITESPACE:
+            return pos + 1
+
+        if state == _START:
+            if byte != 0x7B:  # {
+                raise AudioPayloadError("Body is not a JSON object")
+            self._state = _KEY_OR_END
+        elif state == _KEY_OR_END:
+            if byte == 0x22:
+                self._key.clear()
+                self._state = _KEY
+            elif byte == 0x7D:  # }
+                self._state = _DONE
+            elif byte != 0x2C:  # ,
+                raise AudioPayloadError("Expected a key in JSON object")
+        elif state == _COLON:
+            if byte != 0x3A:  # :
+                raise AudioPayloadError("Expected ':' after key")
+            self._state = _VALUE
+        elif state == _VALUE:
+            key = self._current_key()
+            if byte == 0x22 and key in self.audio_fields and self.audio_field is None:
+                self.audio_field = key
+                self._state = _AUDIO
+            else:
+                self._start_other(byte)
+        return pos + 1
+
+    def _current_key(self) -> str:
+        try:
+            return json.loads(b'"' + bytes(self._key) + b'"')
+        except ValueError:
+            raise AudioPayloadError("Invalid key in JSON object")
+
+    # ----------------------------------------
+    # Audio string: decoded in 4-char groups as it arrives
+    # ----------------------------------------
+
+    def _feed_audio(self, chunk: bytes, pos: int) -> int:
+        match = _AUDIO_STOP.search(chunk, pos)
+        stop = match.start() if match else len(chunk)
+        if stop > pos:
+            self._push_base64(chunk[pos:stop])
+        if not match:
+            return stop
+        if chunk[stop] == 0x22:
+            self._flush_base64()
+            self._state = _KEY_OR_END
+        else:
+            self._state = _AUDIO_ESCAPE
+        return stop + 1
+
+    def _feed_audio_escape(self, chunk: bytes, pos: int) -> int:
+        byte = chunk[pos]
+        if self._unicode is None:
+            if byte == ord("u"):
+                self._unicode = bytearray()
+                return pos + 1
+            if byte not in _JSON_ESCAPES:
+                raise AudioPayloadError("Invalid escape in base64 audio")
+            self._push_base64(_JSON_ESCAPES[byte])
+            self._state = _AUDIO
+            return pos + 1
+        self._unicode.append(byte)
+        if len(self._unicode) == 4:
+            try:
+                char = chr(int(self._unicode, 16))
+            except ValueError:
+                raise AudioPayloadError("Invalid escape in base64 audio")
+            self._unicode = None
+            if not char.isascii():
+                raise AudioPayloadError("Invalid character in base64 audio")
+            self._push_base64(char.encode("ascii"))
+            self._state = _AUDIO
+        return pos + 1
+
+    def _push_base64(self, data: bytes) -> None:
+        data = data.translate(_URLSAFE, _WHITESPACE)
+        if not _STRICT_BASE64 and _NOT_BASE64.search(data):
+            raise AudioPayloadError("Invalid character in base64 audio")
+        pending = self._pending
+        if pending:
+            pending += data
+            data = bytes(pending)
+            pending.clear()
+        usable = len(data) - len(data) % 4
+        if usable:
+            self._decode(data[:usable] if usable != len(data) else data)
+        if usable != len(data):
+            pending += data[usable:]
+
+    def _flush_base64(self) -> None:
+        if not self._pending:
+            return
+        # Tolerate missing padding on the final group
+        remainder = bytes(self._pending) + b"=" * (-len(self._pending) % 4)
+        self._pending.clear()
+        self._decode(remainder)
+
+    def _decode(self, data: bytes) -> None:
+        if self._padded or (not _STRICT_BASE64 and b"=" in data.rstrip(b"=")):
+            raise AudioPayloadError("Invalid base64 audio data: data after padding")
+        try:
+            if _STRICT_BASE64:
+                self.audio += binascii.a2b_base64(data, strict_mode=True)
+            else:
+                self.audio += binascii.a2b_base64(data)
+        except binascii.Error as e:
+            raise AudioPayloadError(f"Invalid base64 audio data: {e}")
+        self._padded = data.endswith(b"=")
+
+    # ----------------------------------------
+    # Any other value: kept raw (bounded) and parsed at the end
+    # ----------------------------------------
+
+    def _start_other(self, byte: int) -> None:
+        self._raw.clear()
+        self._raw_overflow = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = _OTHER
+        self._feed_other(bytes([byte]), 0)
+
+    def _feed_other(self, chunk: bytes, pos: int) -> int:
+        end = len(chunk)
+        start = pos
+        while pos < end:
+            byte = chunk[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif byte == 0x5C:
+                    self._escape = True
+                elif byte == 0x22:
+                    self._in_string = False
+                    if self._depth == 0:
+                        self._collect(chunk[start:pos + 1])
+                        self._finish_other()
+                        return pos + 1
+            elif byte == 0x22:
+                self._in_string = True
+            elif byte in b"[{":
+                self._depth += 1
+            elif byte in b"]}":
+                if self._depth == 0:
+                    # End of the enclosing object after a scalar
+                    self._collect(chunk[start:pos])
+                    self._finish_other()
+                    self._state = _DONE
+                    return pos + 1
+                self._depth -= 1
+                if self._depth == 0:
+                    self._collect(chunk[start:pos + 1])
+                    self._finish_other()
+                    return pos + 1
+            elif byte == 0x2C and self._depth == 0:
+                self._collect(chunk[start:pos])
+                self._finish_other()
+                return pos + 1
+            pos += 1
+        self._collect(chunk[start:pos])
+        return pos
+
+    def _collect(self, data: bytes) -> None:
+        if self._raw_overflow:
+            return
+        if len(self._raw) + len(data) > self.max_field_bytes:
+            self._raw_overflow = True
+            self._raw.clear()
+            return
+        self._raw += data
+
+    def _finish_other(self) -> None:
+        key = self._current_key()
+        if not self._raw_overflow:
+            try:
+                self.fields[key] = json.loads(bytes(self._raw))
+            except ValueError:
+                raise AudioPayloadError(f"Invalid JSON value for '{key}'")
+        self._raw.clear()
+        self._state = _KEY_OR_END
+
+
+async def decode_request_audio(request, limits=None) -> RequestAudio:
+    """
+    Decode the audio of a /predict request while the body is being received
+
+    Works with any Starlette/FastAPI Request. The body is read through
+    BoundedBody: BodyTooLarge is raised past ``limits.max_bytes``. A body
+    cut short by its idle/total deadline (or a disconnect) returns the
+    audio decoded so far with ``truncated`` set; it is an
+    AudioPayloadError only when no audio arrived at all.
+    """
+    decoder = StreamingAudioDecoder()
+    body = BoundedBody(request, limits)
+    async for chunk in body.stream():
+        decoder.feed(chunk)
+    if body.truncated:
+        audio, fields = decoder.partial()
+        if not audio:
+            raise AudioPayloadError(f"Request body cut short ({body.truncated}) before any audio")
+        return RequestAudio(audio, fields, body.truncated)
+    return RequestAudio(*decoder.close())
@@ -0,0 +1,144 @@
+"""
+Micro-batching inference scheduler
+
+Concurrent /predict requests put their features on an asyncio queue.
+A single scheduler task drains the queue into batches of up to
+max_batch_size clips, waiting at most max_wait_ms after the first clip
+arrives, runs each batch through VoiceDetectionModel in one forward
+pass and hands every caller its own result.
+
+InferencePool puts one in front of its workers: a batch of clips is one
+pool task, and up to one batch per worker runs at a time. While every
+worker is busy, new clips collect into the next batch.
+
+Configuration (environment variables):
+    BATCH_MAX_SIZE      clips per batch (default 16)
+    BATCH_MAX_WAIT_MS   longest wait for a batch to fill (default 10)
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 10))
+
+
+class MicroBatchScheduler:
+    """
+    Usage:
+        scheduler = MicroBatchScheduler(model)
+        await scheduler.start()
+        prediction, confidence = await scheduler.predict(features)
+        await scheduler.stop()
+
+    run_batch replaces the model: an async function from a list of items
+    to one result per item (an exception in a slot fails only that caller).
+    """
+
+    def __init__(self, model=None, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 run_batch: Optional[Callable[[List[Any]], Awaitable[List[Any]]]] = None,
+                 max_concurrent_batches: int = 1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if model is None and run_batch is None:
+            raise ValueError("Either model or run_batch is required")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.batches = 0
+        self.clips = 0
+        self._run_items = run_batch or self._run_model
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Start the scheduler task on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler; queued and running requests are failed"""
+        if self._task is None:
+            return
+        tasks = [self._task, *self._running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    async def predict(self, features: Any) -> Tuple[str, float]:
+        """Queue one clip's features and wait for its (prediction, confidence)"""
+        if self._task is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.clips / self.batches if self.batches else 0.0
+
+    async def _run(self) -> None:
+        while True:
+            # Waiting for a free slot first lets clips pile up meanwhile
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            # The deadline starts when the first clip arrives, so no caller
+            # waits more than max_wait for company.
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Skip callers that already gave up (client disconnected)
+            batch = [(f, fut) for f, fut in batch if not fut.cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_model(self, features: List[Any]) -> List[Any]:
+        # torch releases the GIL, so the forward pass runs in a thread
+        # while the event loop keeps accepting requests.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.model.predict_features_batch, features)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._run_items([f for f, _ in batch])
+        except asyncio.CancelledError:
+            results = [RuntimeError("Batch scheduler stopped")] * len(batch)
+        except Exception as e:
+            results = [e] * len(batch)
+        else:
+            self.batches += 1
+            self.clips += len(batch)
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,71 @@
+"""
+Benchmark: FastAPI stack vs the raw ASGI fast path (asgi_fast_path.py)
+Run with: python benchmark_asgi.py [seconds per case]
+
+Requests are driven in-process through the ASGI interface (no server,
+no sockets), so the numbers are the framework's own per-request cost:
+routing, middleware, request and response objects.
+"""
+
+import asyncio
+import base64
+import json
+import sys
+import os
+import time
+
+# Every request uses the same key: take its rate limit out of the measurement
+os.environ.setdefault("API_KEY_BURST", "1e12")
+
+import app as service  # noqa: E402
+from asgi_fast_path import call
+from synthetic_audio import to_wav_bytes, tone
+
+GUVI = ("x-api-key", "guvi123")
+ORIGIN = ("origin", "https://tester.example")
+PREDICT_BODY = json.dumps({"language": "en", "audio_format": "wav",
+                           "audio_base64": base64.b64encode(
+                               to_wav_bytes(tone(220, 0.5, 16000), 16000)).decode()}).encode()
+
+CASES = [
+    ("GET /honeypot", "GET", "/honeypot", ()),
+    ("POST /honeypot", "POST", "/honeypot", (GUVI,)),
+    ("POST /honeypot + Origin", "POST", "/honeypot", (GUVI, ORIGIN)),
+    ("OPTIONS /predict preflight", "OPTIONS", "/predict",
+     (ORIGIN, ("access-control-request-method", "POST"))),
+    ("POST /predict (cached)", "POST", "/predict", (GUVI,), PREDICT_BODY),
+    ("POST /unknown", "POST", "/some/unknown/path", (GUVI,)),
+]
+
+
+async def requests_per_second(app, method, path, headers, body, seconds: float) -> float:
+    for _ in range(50):
+        await call(app, method, path, headers, body)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            await call(app, method, path, headers, body)
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+async def run(seconds: float):
+    fastapi_app = service.fastapi_app
+    print("=" * 72)
+    print("ASGI benchmark (in-process, one request at a time)")
+    print("=" * 72)
+    print(f"{'request':<28} {'FastAPI req/s':>14} {'fast path req/s':>16} {'speedup':>9}")
+    for name, method, path, headers, *body in CASES:
+        body = body[0] if body else b""
+        slow = await requests_per_second(fastapi_app, method, path, headers, body, seconds)
+        fast = await requests_per_second(service.fast_app, method, path, headers, body, seconds)
+        print(f"{name:<28} {slow:>14,.0f} {fast:>16,.0f} {fast / slow:>8.1f}x")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    asyncio.run(run(seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: eager PyTorch vs TorchScript vs ONNX Runtime on CPU
+Run with: python benchmark_backends.py [weights.pth]
+
+Reports per-clip latency (batch of 1) and batched throughput for each
+backend, so we can pick the fastest one for an instance size.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from export_model import load_classifier
+from inference_backends import (
+    OnnxBackend,
+    TorchBackend,
+    TorchScriptBackend,
+    export_onnx,
+    export_torchscript,
+)
+from model_integration import INPUT_FRAMES, N_MFCC
+
+BATCH_SIZES = (1, 8, 32)
+
+
+def measure(backend, batch: np.ndarray, rounds: int) -> list:
+    for _ in range(5):
+        backend.run(batch)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        backend.run(batch)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    weights = sys.argv[1] if len(sys.argv) > 1 else None
+    model = load_classifier(weights if weights and os.path.exists(weights) else None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            TorchBackend(model),
+            TorchScriptBackend(export_torchscript(model, os.path.join(tmp, "model.pt"))),
+        ]
+        try:
+            backends.append(OnnxBackend(export_onnx(model, os.path.join(tmp, "model.onnx"))))
+        except ImportError as e:
+            print(f"⚠️  Skipping ONNX Runtime: {e}")
+
+        print("=" * 66)
+        print(f"Backend benchmark on CPU (torch threads={torch.get_num_threads()}, cpus={os.cpu_count()})")
+        print("=" * 66)
+        print(f"{'backend':<12} {'batch':>5} {'p50 ms':>9} {'p99 ms':>9} {'clips/s':>10}")
+        for batch_size in BATCH_SIZES:
+            batch = np.random.default_rng(0).standard_normal(
+                (batch_size, 1, N_MFCC, INPUT_FRAMES), dtype=np.float32)
+            reference = backends[0].run(batch)
+            for backend in backends:
+                assert np.allclose(backend.run(batch), reference, atol=1e-5), backend.name
+                timings = sorted(measure(backend, batch, rounds=max(20, 400 // batch_size)))
+                p50 = statistics.median(timings)
+                p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+                print(f"{backend.name:<12} {batch_size:>5} {p50 * 1000:>9.3f} "
+                      f"{p99 * 1000:>9.3f} {batch_size / p50:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: serial single-clip inference vs the micro-batching scheduler
+Run with: python benchmark_batching.py [num_requests] [max_batch_size]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import torch
+
+from batching import MicroBatchScheduler
+from inference_backends import TorchBackend
+from model_integration import INPUT_FRAMES, N_MFCC, VoiceClassifier, VoiceDetectionModel
+
+
+def make_model() -> VoiceDetectionModel:
+    detector = VoiceDetectionModel(model_path=None)
+    detector.backend = TorchBackend(VoiceClassifier())
+    return detector
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run_serial(detector, clips):
+    # All clips arrive at once, so a serial server answers clip i only
+    # after clips 0..i-1: latency is measured from the common arrival time.
+    latencies = []
+    start = time.perf_counter()
+    for clip in clips:
+        detector.predict_features_batch([clip])
+        latencies.append(time.perf_counter() - start)
+    return time.perf_counter() - start, latencies
+
+
+async def run_batched(detector, clips, max_batch_size):
+    scheduler = MicroBatchScheduler(detector, max_batch_size=max_batch_size, max_wait_ms=10)
+    await scheduler.start()
+    latencies = []
+
+    async def one(clip):
+        t = time.perf_counter()
+        await scheduler.predict(clip)
+        latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(clip) for clip in clips))
+    elapsed = time.perf_counter() - start
+    await scheduler.stop()
+    return elapsed, latencies, scheduler.mean_batch_size
+
+
+def report(name, elapsed, latencies, n):
+    print(f"{name:<10} {n / elapsed:8.1f} clips/s   "
+          f"p50 {statistics.median(latencies) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.2f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    max_batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    torch.manual_seed(0)
+    detector = make_model()
+    clips = [torch.randn(1, N_MFCC, INPUT_FRAMES) for _ in range(n)]
+
+    # Warm up
+    detector.predict_features_batch(clips[:max_batch_size])
+
+    print("=" * 60)
+    print(f"Micro-batching benchmark: {n} concurrent clips, torch threads={torch.get_num_threads()}")
+    print("=" * 60)
+    elapsed, latencies = asyncio.run(run_serial(detector, clips))
+    report("serial", elapsed, latencies, n)
+    elapsed, latencies, mean_batch = asyncio.run(run_batched(detector, clips, max_batch_size))
+    report("batched", elapsed, latencies, n)
+    print(f"mean batch size: {mean_batch:.1f} (max {max_batch_size})")
+
+
+if __name__ == "__main__":
+    main()
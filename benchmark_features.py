@@ -0,0 +1,60 @@
+"""
+Benchmark: per-clip MFCC feature time with transforms rebuilt on every
+call (the old extract_features) vs the shared DSP plan registry
+Run with: python benchmark_features.py [clips_per_case]
+"""
+
+import sys
+import time
+
+import torch
+import torchaudio
+
+from dsp_plans import COMMON_SAMPLE_RATES, HOP_LENGTH, N_FFT, N_MELS, N_MFCC, DSPPlanRegistry
+
+
+def features_rebuilt(waveform: torch.Tensor, sample_rate: int) -> torch.Tensor:
+    """What extract_features did before the registry"""
+    if sample_rate != 16000:
+        waveform = torchaudio.transforms.Resample(sample_rate, 16000)(waveform)
+    mfcc_transform = torchaudio.transforms.MFCC(
+        sample_rate=16000,
+        n_mfcc=N_MFCC,
+        melkwargs={"n_fft": N_FFT, "hop_length": HOP_LENGTH, "n_mels": N_MELS},
+    )
+    return mfcc_transform(waveform)
+
+
+def time_per_clip(fn, clips) -> float:
+    start = time.perf_counter()
+    for waveform in clips:
+        fn(waveform)
+    return (time.perf_counter() - start) / len(clips) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    torch.manual_seed(0)
+
+    start = time.perf_counter()
+    registry = DSPPlanRegistry()
+    registry.warm()
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 68)
+    print(f"DSP plan benchmark ({n} clips per case), eager warm-up "
+          f"of {len(registry)} plans: {warm_ms:.0f} ms")
+    print("=" * 68)
+    print(f"{'rate':>7} {'clip':>6} {'rebuilt ms':>12} {'plan ms':>10} {'speedup':>9}")
+    for sample_rate in COMMON_SAMPLE_RATES:
+        for seconds in (1, 3):
+            clips = [torch.randn(1, sample_rate * seconds) * 0.1 for _ in range(n)]
+            plan = registry.get(sample_rate)
+            with torch.no_grad():
+                before = time_per_clip(lambda w: features_rebuilt(w, sample_rate), clips)
+                after = time_per_clip(plan, clips)
+            print(f"{sample_rate:>7} {seconds:>5}s {before:>12.2f} {after:>10.2f} {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: torchaudio vs NumPy MFCC feature extraction on CPU
+Run with: python benchmark_numpy_features.py
+
+Reports per-clip feature latency for both pipelines at the common input
+rates, plus how long importing each stack takes (cold start of a slim
+worker vs a torch one).
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import torch
+
+from dsp_plans import DSPPlan
+from numpy_features import NumpyDSPPlan, normalize
+from synthetic_audio import speech_like
+
+SAMPLE_RATES = (8000, 16000, 44100, 48000)
+CLIP_SECONDS = (1.0, 5.0)
+
+
+def measure(fn, rounds: int) -> float:
+    for _ in range(3):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_seconds(statement: str) -> float:
+    """Median wall time of a fresh interpreter running ``statement``"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=here, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    print("=" * 66)
+    print(f"MFCC benchmark on CPU (torch threads={torch.get_num_threads()}, cpus={os.cpu_count()})")
+    print("=" * 66)
+    print(f"{'rate':>6} {'seconds':>7} {'torch ms':>10} {'numpy ms':>10} {'speedup':>8} {'max diff':>9}")
+    for sample_rate in SAMPLE_RATES:
+        torch_plan, numpy_plan = DSPPlan(sample_rate), NumpyDSPPlan(sample_rate)
+        for seconds in CLIP_SECONDS:
+            waveform = speech_like(seconds, sample_rate, np.random.default_rng(0), pad_seconds=0)[np.newaxis]
+            tensor = torch.from_numpy(waveform)
+
+            def torch_features():
+                mfcc = torch_plan(tensor)
+                return (mfcc - mfcc.mean()) / (mfcc.std() + 1e-8)
+
+            def numpy_features():
+                return normalize(numpy_plan(waveform))
+
+            diff = np.abs(numpy_features() - torch_features().numpy()).max()
+            rounds = 50 if seconds <= 1 else 20
+            torch_time, numpy_time = measure(torch_features, rounds), measure(numpy_features, rounds)
+            print(f"{sample_rate:>6} {seconds:>7.1f} {torch_time * 1000:>10.3f} "
+                  f"{numpy_time * 1000:>10.3f} {torch_time / numpy_time:>7.2f}x {diff:>9.1e}")
+
+    print()
+    print("Cold import (fresh interpreter)")
+    slim = "import sys; sys.modules['torch'] = sys.modules['torchaudio'] = None; import numpy_features"
+    print(f"  torch + torchaudio: {import_seconds('import torch, torchaudio'):.2f}s")
+    print(f"  numpy_features:     {import_seconds(slim):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
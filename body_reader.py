@@ -0,0 +1,107 @@
+"""
+Bounded, time-limited request body reader
+
+Reading a whole body with ``await request.body()`` trusts the client:
+a huge body is buffered in full, and a client that sends a byte every
+few seconds (slowloris) holds the handler forever. That is why the
+honeypot never reads its body. BoundedBody streams the body instead:
+
+    - Content-Length over the limit fails at once, and a body that
+      grows past it fails as soon as it does (BodyTooLarge -> 413)
+    - each receive must arrive within the idle timeout, and the whole
+      body within the total deadline; when either runs out (or the
+      client disconnects) the stream simply ends, ``truncated`` is set,
+      and the handler gets what arrived so far
+
+Configuration (environment variables):
+    MAX_BODY_BYTES      largest accepted body (default 20 MB)
+    BODY_IDLE_TIMEOUT   seconds between two body chunks (default 10)
+    BODY_DEADLINE       seconds for the whole body (default 30)
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Optional
+
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_IDLE_TIMEOUT = 10.0
+DEFAULT_DEADLINE = 30.0
+
+
+class BodyTooLarge(ValueError):
+    """The body is (or announces itself as) bigger than the limit"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Request body is larger than {limit} bytes")
+        self.limit = limit
+
+
+class BodyLimits:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 deadline: float = DEFAULT_DEADLINE):
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.deadline = deadline
+
+    @classmethod
+    def from_env(cls) -> "BodyLimits":
+        return cls(int(os.environ.get("MAX_BODY_BYTES", DEFAULT_MAX_BYTES)),
+                   float(os.environ.get("BODY_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT)),
+                   float(os.environ.get("BODY_DEADLINE", DEFAULT_DEADLINE)))
+
+
+default_limits = BodyLimits.from_env()
+
+
+class BoundedBody:
+    """
+    Usage:
+        body = BoundedBody(request)
+        async for chunk in body.stream():   # or: data = await body.read()
+            ...
+        if body.truncated: ...               # "idle", "deadline" or "disconnect"
+    """
+
+    def __init__(self, request, limits: Optional[BodyLimits] = None):
+        self.request = request
+        self.limits = limits or default_limits
+        self.received = 0
+        self.truncated: Optional[str] = None
+
+    def check_length(self) -> None:
+        """Fail before reading anything when Content-Length is over the limit"""
+        length = self.request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.limits.max_bytes:
+            raise BodyTooLarge(self.limits.max_bytes)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        self.check_length()
+        limits = self.limits
+        give_up_at = time.monotonic() + limits.deadline
+        while True:
+            remaining = give_up_at - time.monotonic()
+            timeout = min(limits.idle_timeout, remaining)
+            if timeout <= 0:
+                self.truncated = "deadline"
+                return
+            try:
+                message = await asyncio.wait_for(self.request.receive(), timeout)
+            except asyncio.TimeoutError:
+                self.truncated = "idle" if timeout < remaining else "deadline"
+                return
+            if message["type"] == "http.disconnect":
+                self.truncated = "disconnect"
+                return
+            chunk = message.get("body", b"")
+            if chunk:
+                self.received += len(chunk)
+                if self.received > limits.max_bytes:
+                    raise BodyTooLarge(limits.max_bytes)
+                yield chunk
+            if not message.get("more_body", False):
+                return
+
+    async def read(self) -> bytes:
+        """The whole body, or the part that arrived in time (see ``truncated``)"""
+        return b"".join([chunk async for chunk in self.stream()])
@@ -0,0 +1,139 @@
+"""
+Duration-bucketed batching for variable-length MFCC input
+
+VoiceClassifier pools over time, so clips no longer have to be cropped
+or padded to one fixed size; a batch only needs padding up to its own
+longest clip. Grouping clips of similar length keeps that padding (and
+the compute spent on it) small:
+
+    BucketBatchSampler   training: shuffled batches of similar-length clips
+    length_groups        inference: split one list of clips into buckets
+    pad_batch            stack a bucket into (batch, 1, N_MFCC, T) + lengths
+
+Only pad_batch on tensors and collate_padded need torch.
+"""
+
+import random
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+def pad_batch(features: Sequence) -> Tuple:
+    """
+    Zero-pad (…, N_MFCC, T) features to the longest T
+
+    Returns:
+        batch of shape (batch, 1, N_MFCC, max T) and int64 lengths (batch,),
+        as torch tensors for tensor input and NumPy arrays for NumPy input
+    """
+    features = [f.reshape(1, f.shape[-2], f.shape[-1]) for f in features]
+    lengths = np.array([f.shape[-1] for f in features], dtype=np.int64)
+    shape = (len(features), 1, features[0].shape[-2], int(lengths.max()))
+    if isinstance(features[0], np.ndarray):
+        batch = np.zeros(shape, dtype=features[0].dtype)
+    else:
+        import torch
+
+        batch, lengths = features[0].new_zeros(shape), torch.from_numpy(lengths)
+    for i, f in enumerate(features):
+        batch[i, :, :, :f.shape[-1]] = f
+    return batch, lengths
+
+
+def padding_overhead(lengths: Sequence[int]) -> Tuple[int, int]:
+    """(real frames, padded frames) of one batch padded to its longest clip"""
+    lengths = np.asarray(lengths)
+    return int(lengths.sum()), int(lengths.max() * len(lengths) - lengths.sum())
+
+
+def length_groups(lengths: Sequence[int], max_batch_size: int,
+                  max_padding: float = 0.25) -> List[List[int]]:
+    """
+    Indices grouped into batches of similar length
+
+    Clips are taken shortest first; a batch is closed when it is full or
+    when the next clip would pad the shortest one by more than
+    ``max_padding`` of the longest.
+    """
+    order = np.argsort(np.asarray(lengths), kind="stable")
+    groups: List[List[int]] = []
+    for i in order.tolist():
+        group = groups[-1] if groups else None
+        if (group is None or len(group) >= max_batch_size
+                or lengths[group[0]] < (1 - max_padding) * lengths[i]):
+            groups.append([i])
+        else:
+            group.append(i)
+    return groups
+
+
+def collate_padded(samples: List[Tuple]):
+    """DataLoader collate_fn: (features, label) tensor pairs -> (batch, lengths, labels)"""
+    import torch
+
+    batch, lengths = pad_batch([features for features, _ in samples])
+    return batch, lengths, torch.stack([label for _, label in samples])
+
+
+class BucketBatchSampler:
+    """
+    Yield batches of indices whose clips have similar lengths
+
+    Each epoch the indices are shuffled, cut into pools of
+    ``batch_size * pool_batches``, sorted by length inside each pool and
+    split into batches; the batches are then shuffled again. Pools keep
+    some randomness in which clips share a batch while sorting keeps
+    the padding low. Call set_epoch() for a new, reproducible order.
+
+    Usage:
+        sampler = BucketBatchSampler(store.frames, batch_size=32)
+        loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=collate_padded)
+    """
+
+    def __init__(self, lengths: Sequence[int], batch_size: int, pool_batches: int = 50,
+                 shuffle: bool = True, drop_last: bool = False, seed: int = 0):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.pool_batches = pool_batches
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def batches(self) -> List[List[int]]:
+        rng = random.Random(self.seed + self.epoch)
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            rng.shuffle(indices)
+        pool_size = self.batch_size * self.pool_batches
+        batches = []
+        for start in range(0, len(indices), pool_size):
+            pool = sorted(indices[start:start + pool_size], key=lambda i: self.lengths[i])
+            batches.extend(pool[i:i + self.batch_size] for i in range(0, len(pool), self.batch_size))
+        if self.drop_last:
+            batches = [b for b in batches if len(b) == self.batch_size]
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def padding_overhead(self) -> float:
+        """Padded frames / real frames for this epoch's batches"""
+        real = padded = 0
+        for batch in self.batches():
+            r, p = padding_overhead(self.lengths[batch])
+            real, padded = real + r, padded + p
+        return padded / real if real else 0.0
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.batches())
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        pool_size = self.batch_size * self.pool_batches
+        full, rest = divmod(len(self.lengths), pool_size)
+        return full * -(-pool_size // self.batch_size) + -(-rest // self.batch_size)
@@ -0,0 +1,117 @@
+"""
+Classifier networks run by VoiceDetectionModel
+
+    VoiceClassifier     the full model (teacher)
+    StudentClassifier   distilled depthwise-separable student
+
+Both take a (batch, 1, N_MFCC, T) MFCC batch and optional int64 frame
+lengths. Kept apart from model_integration.py so that serving with the
+ONNX backend and NumPy features does not need torch.
+"""
+
+import torch
+import torch.nn as nn
+from typing import Optional
+
+from dsp_plans import N_MFCC
+
+# The student only looks at the lowest MFCC coefficients
+STUDENT_MFCC = 13
+
+
+def time_mask(x: torch.Tensor, lengths: torch.Tensor, stride: int) -> torch.Tensor:
+    """
+    (batch, 1, 1, T') mask of the frames of ``x`` that came only from real
+    input; ``lengths`` are input frames, ``stride`` the time downsampling
+    between the input and ``x``
+    """
+    steps = torch.clamp(lengths // stride, min=1)
+    mask = torch.arange(x.size(-1), device=x.device)[None, :] < steps[:, None]
+    return mask.to(x.dtype)[:, None, None, :]
+
+
+def masked_time_mean(x: torch.Tensor, lengths: Optional[torch.Tensor], stride: int) -> torch.Tensor:
+    """Mean of (batch, C, F, T') activations over their real frames"""
+    if lengths is None:
+        return x.mean(dim=-1)
+    mask = time_mask(x, lengths, stride)
+    return (x * mask).sum(dim=-1) / mask.sum(dim=-1)
+
+
+class VoiceClassifier(nn.Module):
+    """
+    Small CNN over a (1, N_MFCC, T) MFCC input of any length T >= MIN_FRAMES
+
+    The conv stack keeps the frequency axis; a (masked) mean over time
+    turns it into a fixed-size vector. With ``lengths`` given, padded
+    frames in a batch of different-length clips are masked out, so every
+    clip scores the same as it would alone.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.conv1 = nn.Conv2d(1, 32, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1)
+        self.pool = nn.MaxPool2d(2, 2)
+        self.fc1 = nn.Linear(64 * (N_MFCC // 4), 128)
+        self.fc2 = nn.Linear(128, 1)
+        self.dropout = nn.Dropout(0.5)
+
+    def forward(self, x, lengths=None):
+        x = self.pool(torch.relu(self.conv1(x)))
+        if lengths is not None:
+            # Zero what padding produced so conv2 sees the same border as
+            # it would for the clip on its own
+            x = x * time_mask(x, lengths, 2)
+        x = self.pool(torch.relu(self.conv2(x)))
+        x = masked_time_mean(x, lengths, 4).flatten(1)
+        x = self.dropout(torch.relu(self.fc1(x)))
+        x = torch.sigmoid(self.fc2(x))
+        return x
+
+
+class DepthwiseSeparableConv(nn.Module):
+    """3x3 depthwise conv followed by a 1x1 pointwise conv"""
+
+    def __init__(self, in_channels: int, out_channels: int):
+        super().__init__()
+        self.depthwise = nn.Conv2d(in_channels, in_channels, kernel_size=3, padding=1,
+                                   groups=in_channels)
+        self.pointwise = nn.Conv2d(in_channels, out_channels, kernel_size=1)
+
+    def forward(self, x):
+        return self.pointwise(self.depthwise(x))
+
+
+class StudentClassifier(nn.Module):
+    """
+    Tiny distilled VoiceClassifier: depthwise-separable convs over the
+    first STUDENT_MFCC coefficients (~50x fewer multiply-adds)
+
+    Takes the same (batch, 1, N_MFCC, T) input and lengths as the
+    teacher, so every backend and export runs it unchanged.
+    """
+
+    def __init__(self, n_mfcc: int = STUDENT_MFCC):
+        super().__init__()
+        self.n_mfcc = n_mfcc
+        self.conv1 = nn.Conv2d(1, 16, kernel_size=3, padding=1)
+        self.conv2 = DepthwiseSeparableConv(16, 32)
+        self.pool = nn.MaxPool2d(2, 2)
+        self.fc = nn.Linear(32 * (n_mfcc // 4), 1)
+
+    def forward(self, x, lengths=None):
+        x = x[:, :, :self.n_mfcc]
+        x = self.pool(torch.relu(self.conv1(x)))
+        if lengths is not None:
+            x = x * time_mask(x, lengths, 2)
+        x = self.pool(torch.relu(self.conv2(x)))
+        x = masked_time_mean(x, lengths, 4).flatten(1)
+        return torch.sigmoid(self.fc(x))
+
+
+def classifier_for(state_dict: dict) -> nn.Module:
+    """Teacher or student module matching a saved state_dict"""
+    if "conv2.depthwise.weight" in state_dict:
+        return StudentClassifier()
+    return VoiceClassifier()
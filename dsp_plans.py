@@ -0,0 +1,137 @@
+"""
+Precomputed DSP plans for feature extraction
+
+Building torchaudio's Resample kernel and the MFCC mel filterbank,
+window and DCT matrix costs about as much as running them on a short
+clip. A plan holds those transforms for one
+(sample_rate, n_fft, hop_length, n_mels, n_mfcc) key; the registry
+builds plans once (eagerly for the common input rates) and shares them
+across requests and threads.
+
+The sample rate comes from the client's WAV header, so only the common
+rates (and any passed to warm()) are kept for good; plans for other
+rates live in a small LRU, and a stream of odd rates cannot grow
+memory without bound. Rates that share almost no factor with 16 kHz
+(44101 Hz needs a 16000 x 44101 resample kernel) are refused outright.
+
+The registry also serves the torch-free plans in numpy_features.py;
+this module imports without torch/torchaudio installed.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import torch
+    import torchaudio
+except ImportError:  # slim deployment: only numpy_features plans
+    torch = torchaudio = None
+
+# Feature parameters used by VoiceDetectionModel
+TARGET_SAMPLE_RATE = 16000
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 40
+
+COMMON_SAMPLE_RATES = (8000, 16000, 22050, 44100, 48000)
+# Plans kept for rates outside COMMON_SAMPLE_RATES, least recently used dropped first
+OTHER_RATE_PLANS = 8
+# Resample filter phases x taps (rates divided by their gcd) past which a rate is refused
+MAX_RESAMPLE_KERNEL = 1 << 20
+
+PlanKey = Tuple[int, int, int, int, int]
+
+
+class DSPPlan:
+    """Resampler (input rate -> 16 kHz) plus MFCC transform for one key"""
+
+    def __init__(self, sample_rate: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH,
+                 n_mels: int = N_MELS, n_mfcc: int = N_MFCC):
+        self.key: PlanKey = (sample_rate, n_fft, hop_length, n_mels, n_mfcc)
+        self.resampler = None
+        if sample_rate != TARGET_SAMPLE_RATE:
+            self.resampler = torchaudio.transforms.Resample(sample_rate, TARGET_SAMPLE_RATE)
+        self.mfcc = torchaudio.transforms.MFCC(
+            sample_rate=TARGET_SAMPLE_RATE,
+            n_mfcc=n_mfcc,
+            melkwargs={
+                "n_fft": n_fft,
+                "hop_length": hop_length,
+                "n_mels": n_mels,
+            }
+        )
+        # Plans are shared between threads: nothing may track gradients
+        for module in (self.resampler, self.mfcc):
+            if module is not None:
+                module.eval()
+                module.requires_grad_(False)
+
+    def resample(self, waveform: "torch.Tensor") -> "torch.Tensor":
+        if self.resampler is None:
+            return waveform
+        return self.resampler(waveform)
+
+    def mel_db(self, waveform: "torch.Tensor") -> "torch.Tensor":
+        """(channels, frames) at 16 kHz -> (channels, n_mels, T) in dB"""
+        with torch.no_grad():
+            return self.mfcc.amplitude_to_DB(self.mfcc.MelSpectrogram(waveform))
+
+    def cepstrum(self, mel_db: "torch.Tensor") -> "torch.Tensor":
+        """mel_db() output -> (channels, n_mfcc, T), as the MFCC transform does"""
+        return torch.matmul(mel_db.transpose(-1, -2), self.mfcc.dct_mat).transpose(-1, -2)
+
+    def __call__(self, waveform: "torch.Tensor") -> "torch.Tensor":
+        """(channels, frames) at the plan's input rate -> MFCC at 16 kHz"""
+        with torch.no_grad():
+            return self.mfcc(self.resample(waveform))
+
+
+class DSPPlanRegistry:
+    """Thread-safe cache of DSPPlan (or NumpyDSPPlan) objects"""
+
+    def __init__(self, plan_class=DSPPlan, max_other_plans: int = OTHER_RATE_PLANS):
+        self.plan_class = plan_class
+        self.max_other_plans = max_other_plans
+        self._plans: Dict[PlanKey, DSPPlan] = {}  # common and warmed rates, never dropped
+        self._others: "OrderedDict[PlanKey, DSPPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sample_rate: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH,
+            n_mels: int = N_MELS, n_mfcc: int = N_MFCC, keep: bool = False) -> DSPPlan:
+        key = (sample_rate, n_fft, hop_length, n_mels, n_mfcc)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        gcd = math.gcd(sample_rate, TARGET_SAMPLE_RATE) if sample_rate > 0 else 0
+        if not gcd or (sample_rate // gcd) * (TARGET_SAMPLE_RATE // gcd) > MAX_RESAMPLE_KERNEL:
+            raise ValueError(f"Unsupported sample rate: {sample_rate} Hz")
+        with self._lock:
+            # Another thread may have built it while we waited
+            plan = self._plans.get(key) or self._others.pop(key, None)
+            if plan is None:
+                plan = self.plan_class(*key)
+            if keep or sample_rate in COMMON_SAMPLE_RATES:
+                self._plans[key] = plan
+            elif self.max_other_plans > 0:
+                self._others[key] = plan
+                while len(self._others) > self.max_other_plans:
+                    self._others.popitem(last=False)
+        return plan
+
+    def warm(self, sample_rates: Optional[Iterable[int]] = None, **params) -> None:
+        """Build plans up front so the first request at each rate is not slower"""
+        for sample_rate in sample_rates or COMMON_SAMPLE_RATES:
+            self.get(sample_rate, keep=True, **params)
+
+    def __len__(self) -> int:
+        return len(self._plans) + len(self._others)
+
+    def __contains__(self, key: PlanKey) -> bool:
+        return key in self._plans or key in self._others
+
+
+# Process-wide registry used by VoiceDetectionModel
+default_registry = DSPPlanRegistry()
@@ -0,0 +1,203 @@
+"""
+Batched evaluation of VoiceDetectionModel on a labeled dataset
+
+Runs every clip through the model in batches and prints a JSON report:
+a confusion matrix and precision/recall/F1 overall and per language,
+throughput and p50/p95/p99 per-clip latency. Release gates turn the
+report into an exit code, so CI can block a model that got less
+accurate or slower.
+
+Usage:
+    python evaluate_model.py voice_model.pth data/
+    python evaluate_model.py voice_model.pth data/ --student voice_student.pth
+    python evaluate_model.py voice_model.onnx features/ --backend onnx --batch-size 32 \\
+        --output report.json --min-f1 0.9 --max-p95-ms 40
+
+The dataset is a labeled audio tree or a feature store directory (see
+feature_store.py); "AI" is the positive class. Clips without a label
+are skipped, clips without a language count as "unknown". With
+--student the report also has the fraction of clips escalated to the
+teacher.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from inference_backends import BACKENDS, DEFAULT_BACKEND
+from model_integration import ESCALATION_CONFIDENCE, VoiceDetectionModel
+
+UNKNOWN_LANGUAGE = "unknown"
+
+
+def iter_dataset(source: str,
+                 model: VoiceDetectionModel) -> Iterator[Tuple[torch.Tensor, int, str, float]]:
+    """Yield (features, label, language, feature seconds) for every labeled clip"""
+    if os.path.exists(os.path.join(source, "index.json")):
+        from feature_store import FeatureStore
+
+        store = FeatureStore(source)
+        for i in range(len(store)):
+            if not np.isnan(store.labels[i]):
+                language = store.metadata(i).get("language", UNKNOWN_LANGUAGE)
+                yield torch.from_numpy(store.features(i)), int(store.labels[i]), language, 0.0
+        return
+
+    from feature_store import iter_labeled_audio
+
+    for path, label, metadata in iter_labeled_audio(source):
+        if label is None:
+            continue
+        with open(path, "rb") as f:
+            audio = f.read()
+        start = time.perf_counter()
+        features = model.extract_features(audio)
+        yield features, label, metadata.get("language", UNKNOWN_LANGUAGE), time.perf_counter() - start
+
+
+def confusion(labels: np.ndarray, predictions: np.ndarray) -> Dict:
+    """Confusion matrix and precision/recall/F1 with AI (1) as the positive class"""
+    tp = int(np.sum((predictions == 1) & (labels == 1)))
+    fp = int(np.sum((predictions == 1) & (labels == 0)))
+    tn = int(np.sum((predictions == 0) & (labels == 0)))
+    fn = int(np.sum((predictions == 0) & (labels == 1)))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "support": int(len(labels)),
+        "confusion_matrix": {"tp": tp, "fp": fp, "tn": tn, "fn": fn},
+        "accuracy": round((tp + tn) / len(labels), 4) if len(labels) else 0.0,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+    }
+
+
+def classification_report(labels: Sequence[int], predictions: Sequence[int],
+                          languages: Sequence[str]) -> Dict:
+    """Overall metrics plus the same metrics for each language"""
+    labels, predictions, languages = np.asarray(labels), np.asarray(predictions), np.asarray(languages)
+    return {
+        "overall": confusion(labels, predictions),
+        "per_language": {
+            language: confusion(labels[languages == language], predictions[languages == language])
+            for language in sorted(set(languages.tolist()))
+        },
+    }
+
+
+def percentiles_ms(seconds: Sequence[float]) -> Dict:
+    values = np.asarray(seconds) * 1000
+    if not len(values):
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    return {f"p{q}": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+
+
+def evaluate(model: VoiceDetectionModel, source: str, batch_size: int = 16) -> Dict:
+    """
+    Score every labeled clip in ``source`` and build the report
+
+    A clip's latency is its own feature extraction plus the forward pass
+    of the batch it was scored in, i.e. what it costs when served batched
+    (queueing excluded).
+    """
+    labels: List[int] = []
+    languages: List[str] = []
+    predictions: List[int] = []
+    latencies: List[float] = []
+    pending: List[Tuple[torch.Tensor, float]] = []
+
+    def flush():
+        start = time.perf_counter()
+        probabilities = model.probabilities([features for features, _ in pending])
+        forward = time.perf_counter() - start
+        predictions.extend(int(p > 0.5) for p in probabilities)
+        latencies.extend(feature_seconds + forward for _, feature_seconds in pending)
+        pending.clear()
+
+    start = time.perf_counter()
+    for features, label, language, feature_seconds in iter_dataset(source, model):
+        labels.append(label)
+        languages.append(language)
+        pending.append((features, feature_seconds))
+        if len(pending) == batch_size:
+            flush()
+    if pending:
+        flush()
+    elapsed = time.perf_counter() - start
+
+    report = classification_report(labels, predictions, languages)
+    report["speed"] = {
+        "clips": len(labels),
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "samples_per_second": round(len(labels) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": percentiles_ms(latencies),
+    }
+    if model.student is not None:
+        # Accuracy above is the combined student+teacher system
+        report["tiers"] = model.tier_stats()
+    return report
+
+
+def check_gates(report: Dict, min_f1: Optional[float] = None,
+                min_accuracy: Optional[float] = None,
+                max_p95_ms: Optional[float] = None) -> List[str]:
+    """Names of the release gates the report fails (overall and per language)"""
+    failures = []
+    groups = {"overall": report["overall"], **report["per_language"]}
+    for name, metrics in groups.items():
+        if min_f1 is not None and metrics["f1"] < min_f1:
+            failures.append(f"{name}: f1 {metrics['f1']} < {min_f1}")
+        if min_accuracy is not None and metrics["accuracy"] < min_accuracy:
+            failures.append(f"{name}: accuracy {metrics['accuracy']} < {min_accuracy}")
+    if max_p95_ms is not None:
+        p95 = report["speed"]["latency_ms"]["p95"]
+        if p95 > max_p95_ms:
+            failures.append(f"p95 latency {p95}ms > {max_p95_ms}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a voice detection model on a labeled dataset")
+    parser.add_argument("model", help="model artifact (.pth, .pt or .onnx)")
+    parser.add_argument("dataset", help="labeled audio tree or feature store directory")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--student", help="distilled student artifact; serve tiered (student first)")
+    parser.add_argument("--escalation-confidence", type=float, default=ESCALATION_CONFIDENCE,
+                        help="escalate to the teacher below this student confidence")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--min-f1", type=float, help="fail if overall or any language F1 is lower")
+    parser.add_argument("--min-accuracy", type=float,
+                        help="fail if overall or any language accuracy is lower")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if p95 per-clip latency is higher")
+    args = parser.parse_args()
+
+    # Keep stdout pure JSON; model loading prints progress
+    with contextlib.redirect_stdout(sys.stderr):
+        model = VoiceDetectionModel(args.model, backend=args.backend, student_path=args.student,
+                                    escalation_confidence=args.escalation_confidence)
+    report = evaluate(model, args.dataset, args.batch_size)
+    report.update({"model": args.model, "backend": args.backend})
+    report["gate_failures"] = check_gates(report, args.min_f1, args.min_accuracy, args.max_p95_ms)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if report["gate_failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
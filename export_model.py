@@ -0,0 +1,81 @@
+"""
+Export a trained VoiceClassifier (or StudentClassifier) to TorchScript and/or ONNX
+
+Usage:
+    python export_model.py voice_model.pth
+    python export_model.py voice_model.pth --formats onnx --output-dir models
+
+Each export is checked against the eager model on a random batch before
+it is reported as written.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import torch
+
+from classifiers import VoiceClassifier, classifier_for
+from inference_backends import (
+    OnnxBackend,
+    TorchBackend,
+    TorchScriptBackend,
+    export_onnx,
+    export_torchscript,
+)
+from model_integration import INPUT_FRAMES, N_MFCC
+
+EXTENSIONS = {"torchscript": ".pt", "onnx": ".onnx"}
+TOLERANCE = 1e-5
+
+
+def load_classifier(weights: str) -> torch.nn.Module:
+    """The teacher or student saved at ``weights`` (a random teacher without one)"""
+    if not weights:
+        return VoiceClassifier().eval()
+    state_dict = torch.load(weights, map_location="cpu")
+    model = classifier_for(state_dict)
+    model.load_state_dict(state_dict)
+    return model.eval()
+
+
+def export(model: torch.nn.Module, fmt: str, path: str) -> float:
+    """Write one export and return its max abs difference from eager"""
+    if fmt == "torchscript":
+        export_torchscript(model, path)
+        backend = TorchScriptBackend(path)
+    else:
+        export_onnx(model, path)
+        backend = OnnxBackend(path)
+
+    batch = torch.randn(8, 1, N_MFCC, INPUT_FRAMES).numpy()
+    expected = TorchBackend(model).run(batch)
+    return float(np.max(np.abs(backend.run(batch) - expected)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("weights", nargs="?", default="voice_model.pth",
+                        help="VoiceClassifier or StudentClassifier state_dict (.pth)")
+    parser.add_argument("--formats", nargs="+", choices=sorted(EXTENSIONS),
+                        default=["torchscript", "onnx"])
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.weights):
+        raise SystemExit(f"❌ Model weights not found: {args.weights} "
+                         "(train one with model_integration.py or pass its path)")
+    model = load_classifier(args.weights)
+    stem = os.path.splitext(os.path.basename(args.weights))[0]
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for fmt in args.formats:
+        path = os.path.join(args.output_dir, stem + EXTENSIONS[fmt])
+        diff = export(model, fmt, path)
+        if diff > TOLERANCE:
+            raise SystemExit(f"❌ {fmt} export differs from eager by {diff:.2e}")
+        print(f"✅ {fmt:<12} {path} (max diff vs eager {diff:.1e})")
+
+
+if __name__ == "__main__":
+    main()
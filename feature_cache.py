@@ -0,0 +1,142 @@
+"""
+Shared cache of intermediate audio features
+
+Shadow and candidate models (and ensemble members) see the same request
+audio; without sharing, each one decodes, resamples and computes MFCCs
+again. A FeatureContext wraps one request's audio and hands every model
+the same intermediates:
+
+    pcm         decoded (channels, frames) float32 samples and their rate
+    resampled   mono waveform at 16 kHz
+    mel         mel spectrogram in dB
+    mfcc        normalized MFCC features (the classifier input)
+    window      normalized MFCCs of one sliding window of a long clip
+
+Stages are keyed by a hash of the audio plus everything that changes the
+result (pipeline, plan parameters), so models with different feature
+settings never see each other's tensors. Entries live in a process-wide
+LRU bounded by bytes with a short TTL: long enough for every model on
+one request, short enough not to hold audio around.
+
+Cached arrays are shared, never copy-on-read: callers must not modify
+them in place.
+
+Configuration (environment variables):
+    FEATURE_CACHE_ENTRIES  max entries (default 256, 0 disables sharing)
+    FEATURE_CACHE_BYTES    max bytes (default 64 MB)
+    FEATURE_CACHE_TTL      seconds an entry stays valid (default 30)
+"""
+
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from prediction_cache import LRUCache
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 30.0
+
+
+def audio_digest(audio: Any, sample_rate: Optional[int] = None) -> str:
+    """
+    Hash of request audio: raw bytes, NumPy samples (with their rate) or
+    a file path (identified by path, size and mtime, without reading it)
+    """
+    digest = hashlib.blake2b(digest_size=20, person=b"voice-feat")
+    if isinstance(audio, str):
+        stat = os.stat(audio)
+        digest.update(f"path:{os.path.realpath(audio)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    elif isinstance(audio, np.ndarray):
+        digest.update(f"array:{audio.dtype.str}:{audio.shape}:{sample_rate}".encode())
+        digest.update(memoryview(np.ascontiguousarray(audio)).cast("B"))
+    else:
+        digest.update(memoryview(audio))
+    return digest.hexdigest()
+
+
+def nbytes(value: Any) -> int:
+    """Memory held by a cached stage: arrays, tensors and tuples of them"""
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "element_size"):  # torch.Tensor
+        return value.element_size() * value.nelement()
+    return 64
+
+
+class FeatureCache:
+    """
+    Usage:
+        value = cache.get_or_compute(digest, ("mel", "torch", 2048, 512, 128), compute)
+    """
+
+    def __init__(self, memory: LRUCache):
+        self.memory = memory
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FeatureCache":
+        return cls(LRUCache(
+            max_entries=int(os.environ.get("FEATURE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(os.environ.get("FEATURE_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+            ttl=float(os.environ.get("FEATURE_CACHE_TTL", DEFAULT_TTL)),
+        ))
+
+    def get_or_compute(self, digest: str, stage: Tuple, compute: Callable[[], Any]) -> Any:
+        # Two threads missing at once both compute; the last put wins
+        key = digest + ":" + ":".join(map(str, stage))
+        value = self.memory.get(key)
+        counts = self.hits if value is not None else self.misses
+        with self._lock:
+            counts[stage[0]] = counts.get(stage[0], 0) + 1
+        if value is None:
+            value = compute()
+            self.memory.put(key, value, nbytes(value))
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes,
+        }
+
+
+# Process-wide cache shared by every VoiceDetectionModel
+default_feature_cache = FeatureCache.from_env()
+
+
+class FeatureContext:
+    """
+    One request's audio plus the stages computed for it so far
+
+    Pass the same context to every model scoring the request; stages are
+    also kept on the context itself, so they survive for the request
+    even when the shared cache is disabled or evicts them.
+    """
+
+    def __init__(self, audio: Any, sample_rate: Optional[int] = None,
+                 cache: Optional[FeatureCache] = None):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.cache = cache if cache is not None else default_feature_cache
+        self.digest = audio_digest(audio, sample_rate)
+        self._stages: Dict[Tuple, Any] = {}
+
+    def get(self, stage: Tuple, compute: Callable[[], Any]) -> Any:
+        """The value of ``stage`` (name, *parameters), computed at most once"""
+        value = self._stages.get(stage)
+        if value is None:
+            value = self.cache.get_or_compute(self.digest, stage, compute)
+            self._stages[stage] = value
+        return value
@@ -0,0 +1,194 @@
+"""
+Memory-mapped precomputed feature store for training
+
+Decoding audio and computing MFCCs every epoch makes training wait on
+the data pipeline. This preprocesses a labeled audio tree once into
+sharded float32 .npy files plus a labels/offsets index; the Dataset
+then serves features as read-only views into memory-mapped shards, so
+every DataLoader worker shares the OS page cache instead of holding
+its own copy.
+
+Store layout:
+    index.json        format version, n_mfcc, dtype, shard list
+    index.npy         one record per clip: shard, offset, frames, label
+    metadata.jsonl    one JSON object per clip (source, language, ...)
+    shard-00000.npy   (frames, N_MFCC) float32, clips concatenated
+
+Audio tree layout (label folders "ai"/"human", optional language level):
+    data/ai/clip.wav            data/ta/ai/clip.wav
+    data/human/clip.wav         data/ta/human/clip.wav
+
+Usage:
+    python feature_store.py data/ features/
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg")
+LABELS = {"ai": 1, "human": 0}
+FORMAT_VERSION = 1
+DEFAULT_SHARD_FRAMES = 1 << 20  # ~160 MB of float32 at 40 MFCCs
+
+INDEX_DTYPE = np.dtype([
+    ("shard", "<i4"),
+    ("offset", "<i8"),
+    ("frames", "<i4"),
+    ("label", "<f4"),
+])
+
+
+def iter_labeled_audio(root: str) -> Iterator[Tuple[str, Optional[int], Dict]]:
+    """Yield (path, label, metadata) for every audio file under ``root``"""
+    for directory, _, files in sorted(os.walk(root)):
+        parts = os.path.relpath(directory, root).split(os.sep)
+        label, language = None, None
+        for i, part in enumerate(parts):
+            if part.lower() in LABELS:
+                label = LABELS[part.lower()]
+                language = parts[i - 1] if i > 0 else None
+        for name in sorted(files):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                path = os.path.join(directory, name)
+                metadata = {"source": os.path.relpath(path, root)}
+                if language:
+                    metadata["language"] = language
+                yield path, label, metadata
+
+
+class FeatureStoreWriter:
+    """
+    Append (N_MFCC, frames) feature arrays; shards are flushed to disk as
+    they fill up, so memory stays bounded by one shard.
+    """
+
+    def __init__(self, out_dir: str, n_mfcc: int, shard_frames: int = DEFAULT_SHARD_FRAMES):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.n_mfcc = n_mfcc
+        self.shard_frames = shard_frames
+        self._records: List[tuple] = []
+        self._shards: List[Dict] = []
+        self._pending: List[np.ndarray] = []
+        self._pending_frames = 0
+        self._metadata = open(os.path.join(out_dir, "metadata.jsonl"), "w")
+
+    def add(self, features: np.ndarray, label: Optional[float], metadata: Optional[Dict] = None) -> None:
+        features = np.asarray(features, dtype=np.float32).reshape(self.n_mfcc, -1)
+        frames = features.shape[1]
+        if self._pending and self._pending_frames + frames > self.shard_frames:
+            self._flush()
+        self._records.append((len(self._shards), self._pending_frames, frames,
+                              np.nan if label is None else float(label)))
+        self._pending.append(features.T)  # stored frame-major
+        self._pending_frames += frames
+        self._metadata.write(json.dumps(metadata or {}) + "\n")
+
+    def close(self) -> int:
+        """Write the last shard and the index; returns the number of clips"""
+        if self._pending:
+            self._flush()
+        self._metadata.close()
+        np.save(os.path.join(self.out_dir, "index.npy"), np.array(self._records, dtype=INDEX_DTYPE))
+        with open(os.path.join(self.out_dir, "index.json"), "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "n_mfcc": self.n_mfcc,
+                "dtype": "float32",
+                "clips": len(self._records),
+                "shards": self._shards,
+            }, f, indent=2)
+        return len(self._records)
+
+    def _flush(self) -> None:
+        name = f"shard-{len(self._shards):05d}.npy"
+        np.save(os.path.join(self.out_dir, name), np.concatenate(self._pending, axis=0))
+        self._shards.append({"file": name, "frames": self._pending_frames})
+        self._pending = []
+        self._pending_frames = 0
+
+
+class FeatureStore:
+    """Read side: zero-copy (N_MFCC, frames) views into memory-mapped shards"""
+
+    def __init__(self, store_dir: str):
+        with open(os.path.join(store_dir, "index.json")) as f:
+            info = json.load(f)
+        if info.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store version {info.get('version')}")
+        self.store_dir = store_dir
+        self.n_mfcc = info["n_mfcc"]
+        self.shard_files = [s["file"] for s in info["shards"]]
+        self.index = np.load(os.path.join(store_dir, "index.npy"))
+        self._shards: Optional[List[np.ndarray]] = None
+        self._metadata: Optional[List[Dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self.index["label"]
+
+    @property
+    def frames(self) -> np.ndarray:
+        return self.index["frames"]
+
+    def features(self, i: int) -> np.ndarray:
+        """(N_MFCC, frames) view of clip ``i``; no bytes are copied"""
+        if self._shards is None:
+            # Opened lazily so each DataLoader worker maps the files itself
+            # after fork. "c" (copy-on-write) gives writable arrays that
+            # torch.from_numpy accepts while never touching the files.
+            self._shards = [np.load(os.path.join(self.store_dir, name), mmap_mode="c")
+                            for name in self.shard_files]
+        shard, offset, frames, _ = self.index[i]
+        return self._shards[shard][offset:offset + frames].T
+
+    def metadata(self, i: int) -> Dict:
+        if self._metadata is None:
+            with open(os.path.join(self.store_dir, "metadata.jsonl")) as f:
+                self._metadata = [json.loads(line) for line in f]
+        return self._metadata[i]
+
+    def __getstate__(self):
+        # Ship only the index to DataLoader workers, not open memmaps
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+
+def build_feature_store(audio_root: str, out_dir: str, detector=None,
+                        shard_frames: int = DEFAULT_SHARD_FRAMES) -> int:
+    """
+    Decode every clip under ``audio_root`` once and write its MFCCs to
+    ``out_dir`` (with either feature pipeline: tensors and arrays alike)
+    """
+    from model_integration import N_MFCC, VoiceDetectionModel
+
+    detector = detector or VoiceDetectionModel(model_path=None)
+    writer = FeatureStoreWriter(out_dir, N_MFCC, shard_frames)
+    for path, label, metadata in iter_labeled_audio(audio_root):
+        with open(path, "rb") as f:
+            features = detector.extract_features(f.read())
+        writer.add(np.asarray(features), label, metadata)
+    return writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute MFCC features into a memory-mapped store")
+    parser.add_argument("audio_root", help="labeled audio tree (ai/ and human/ folders)")
+    parser.add_argument("out_dir", help="feature store directory to write")
+    parser.add_argument("--shard-frames", type=int, default=DEFAULT_SHARD_FRAMES)
+    args = parser.parse_args()
+
+    clips = build_feature_store(args.audio_root, args.out_dir, shard_frames=args.shard_frames)
+    print(f"✅ Wrote {clips} clips to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+import hashlib
 import json
 import os
 
@@ -14,6 +15,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def precompute(payload: dict) -> tuple:
+    """Body bytes and headers, built once (this image ships app.py alone)"""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    return body, {"Content-Length": str(len(body)), "ETag": etag}
+
+UNAUTHORIZED_BODY, UNAUTHORIZED_HEADERS = precompute({"error": "Unauthorized"})
+
+# Honeypot response with maximum compatibility
+HONEYPOT_BODY, HONEYPOT_HEADERS = precompute({
+    "status": "success",
+    "threat_analysis": {
+        "risk_level": "high",
+        "detected_patterns": ["suspicious_content"],
+        "origin_ip": "unknown"
+    },
+    "extracted_data": {
+        "intent": "scam_attempt",
+        "action": "flagged"
+    },
+    "extracted_intelligence": { # Alternate format
+        "threat": "active",
+        "intent": "scam_detected",
+        "action": "logged"
+    }
+})
+
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
 async def catch_all(request: Request, path: str):
     # Handle OPTIONS
@@ -23,31 +51,14 @@ async def catch_all(request: Request, path: str):
     # API Key check
     api_key = request.headers.get("x-api-key", "").lower()
     if api_key and "guvi" not in api_key:
-        return Response(content=json.dumps({"error": "Unauthorized"}), status_code=401, media_type="application/json")
-
-    # Honeypot response with maximum compatibility
-    payload = {
-        "status": "success",
-        "threat_analysis": {
-            "risk_level": "high",
-            "detected_patterns": ["suspicious_content"],
-            "origin_ip": "unknown"
-        },
-        "extracted_data": {
-            "intent": "scam_attempt",
-            "action": "flagged"
-        },
-        "extracted_intelligence": { # Alternate format
-            "threat": "active",
-            "intent": "scam_detected",
-            "action": "logged"
-        }
-    }
-    
+        return Response(content=UNAUTHORIZED_BODY, status_code=401, media_type="application/json",
+                        headers=UNAUTHORIZED_HEADERS)
+
     return Response(
-        content=json.dumps(payload),
-        status_code=200, 
-        media_type="application/json"
+        content=HONEYPOT_BODY,
+        status_code=200,
+        media_type="application/json",
+        headers=HONEYPOT_HEADERS
     )
 
 if __name__ == "__main__":
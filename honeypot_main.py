@@ -3,16 +3,18 @@ GUVI x HCL Hackathon - Agentic Honey-Pot API
 Minimal FastAPI backend for honeypot endpoint testing
 """
 
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
 import os
 
+from api_keys import ApiKeyStore, client_host
+
 # Initialize FastAPI app
 app = FastAPI(title="Agentic Honeypot API")
 
-# Valid API key
-VALID_API_KEY = "guvi123"
+# Hashed API keys with per-key rate limits (see api_keys.py)
+api_keys = ApiKeyStore.from_env()
 
 
 @app.get("/")
@@ -22,7 +24,7 @@ async def root():
 
 
 @app.get("/honeypot")
-async def honeypot_endpoint(x_api_key: Optional[str] = Header(None)):
+async def honeypot_endpoint(request: Request, x_api_key: Optional[str] = Header(None)):
     """
     Honeypot endpoint for GUVI testing
     
@@ -34,11 +36,18 @@ async def honeypot_endpoint(x_api_key: Optional[str] = Header(None)):
     """
     
     # Verify API key
-    if not x_api_key or x_api_key != VALID_API_KEY:
+    check = await api_keys.check_async(x_api_key, client_host(request))
+    if check.status == 401:
         return JSONResponse(
             status_code=401,
             content={"error": "Unauthorized"}
         )
+    if check.status == 429:
+        return JSONResponse(
+            status_code=429,
+            content={"error": "Too many requests"},
+            headers={"Retry-After": check.retry_after_header}
+        )
     
     # Return success response
     return JSONResponse(
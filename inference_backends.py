@@ -0,0 +1,190 @@
+"""
+Pluggable inference backends for VoiceClassifier
+
+VoiceDetectionModel hands a (batch, 1, N_MFCC, frames) float32 batch
+and each clip's real frame count (the rest is padding) to a backend and
+gets one probability per clip back. The fp32 backends give
+the same outputs; int8 is within quantization error of them:
+
+    torch        eager PyTorch (state_dict .pth file)
+    torchscript  TorchScript module (.pt file written by export_model.py)
+    onnx         ONNX Runtime, CPU execution provider (.onnx file)
+    int8         INT8-quantized TorchScript (.pt file written by quantize_model.py)
+
+Select one with the INFERENCE_BACKEND environment variable.
+"""
+
+import inspect
+import os
+from typing import Optional
+
+import numpy as np
+
+BACKENDS = ("torch", "torchscript", "onnx", "int8")
+DEFAULT_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+
+ONNX_INPUT = "features"
+ONNX_LENGTHS = "lengths"
+ONNX_OUTPUT = "probability"
+
+
+def full_lengths(batch: np.ndarray) -> np.ndarray:
+    """Lengths for an unpadded batch: every clip uses all frames"""
+    return np.full(len(batch), batch.shape[-1], dtype=np.int64)
+
+
+class InferenceBackend:
+    """Common interface: batch of features in, probabilities out"""
+
+    name = "base"
+
+    def run(self, batch: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Args:
+            batch: float32 array of shape (batch, 1, N_MFCC, frames)
+            lengths: int64 real frames per clip (default: all frames)
+
+        Returns:
+            float array of shape (batch,) with P(AI) per clip
+        """
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    """Eager PyTorch module"""
+
+    name = "torch"
+
+    def __init__(self, module, device=None):
+        import torch
+
+        self.torch = torch
+        self.device = device or torch.device("cpu")
+        self.module = module.to(self.device).eval()
+
+    def run(self, batch: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+        torch = self.torch
+        lengths = full_lengths(batch) if lengths is None else lengths
+        with torch.no_grad():
+            output = self.module(torch.from_numpy(batch).to(self.device),
+                                 torch.from_numpy(lengths).to(self.device))
+        return output.reshape(-1).cpu().numpy()
+
+
+class TorchScriptBackend(TorchBackend):
+    """Scripted/traced module loaded with torch.jit.load"""
+
+    name = "torchscript"
+
+    def __init__(self, path: str, device=None):
+        import torch
+
+        device = device or torch.device("cpu")
+        super().__init__(torch.jit.load(path, map_location=device), device)
+
+
+class QuantizedBackend(TorchScriptBackend):
+    """INT8 TorchScript module; quantized kernels only run on the CPU"""
+
+    name = "int8"
+
+    def __init__(self, path: str, engine: Optional[str] = None):
+        import torch
+
+        engine = engine or os.environ.get("QUANT_ENGINE")
+        if engine:
+            torch.backends.quantized.engine = engine
+        super().__init__(path, torch.device("cpu"))
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime on the CPU execution provider"""
+
+    name = "onnx"
+
+    def __init__(self, path: str, intra_op_threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("The onnx backend needs onnxruntime: pip install onnxruntime")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def run(self, batch: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+        lengths = full_lengths(batch) if lengths is None else lengths
+        (output,) = self.session.run([ONNX_OUTPUT], {ONNX_INPUT: batch, ONNX_LENGTHS: lengths})
+        return output.reshape(-1)
+
+
+def load_backend(kind: str, model_path: str, device=None) -> InferenceBackend:
+    """Build the backend named ``kind`` from the artifact at ``model_path``"""
+    if kind == "torch":
+        import torch
+        from classifiers import classifier_for
+
+        state_dict = torch.load(model_path, map_location=device or "cpu")
+        module = classifier_for(state_dict)
+        module.load_state_dict(state_dict)
+        return TorchBackend(module, device)
+    if kind == "torchscript":
+        return TorchScriptBackend(model_path, device)
+    if kind == "onnx":
+        return OnnxBackend(model_path)
+    if kind == "int8":
+        return QuantizedBackend(model_path)
+    raise ValueError(f"Unknown inference backend '{kind}' (expected one of {', '.join(BACKENDS)})")
+
+
+def export_torchscript(module, path: str, example: Optional["torch.Tensor"] = None) -> str:
+    """Trace ``module`` with (features, lengths) inputs and save it as a TorchScript file"""
+    import torch
+
+    module = module.eval()
+    example = example if example is not None else _example_input()
+    with torch.no_grad():
+        traced = torch.jit.trace(module, (example, _example_lengths(example)))
+    traced.save(path)
+    return path
+
+
+def export_onnx(module, path: str, example: Optional["torch.Tensor"] = None) -> str:
+    """Export ``module`` to ONNX with dynamic batch and frame dimensions"""
+    import torch
+
+    module = module.eval()
+    example = example if example is not None else _example_input()
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript-based exporter needs no extra dependencies
+        kwargs["dynamo"] = False
+    torch.onnx.export(
+        module,
+        (example, _example_lengths(example)),
+        path,
+        input_names=[ONNX_INPUT, ONNX_LENGTHS],
+        output_names=[ONNX_OUTPUT],
+        dynamic_axes={
+            ONNX_INPUT: {0: "batch", 3: "frames"},
+            ONNX_LENGTHS: {0: "batch"},
+            ONNX_OUTPUT: {0: "batch"},
+        },
+        **kwargs,
+    )
+    return path
+
+
+def _example_input():
+    import torch
+    from model_integration import INPUT_FRAMES, N_MFCC
+
+    return torch.zeros(1, 1, N_MFCC, INPUT_FRAMES)
+
+
+def _example_lengths(example):
+    import torch
+
+    return torch.from_numpy(full_lengths(example.numpy()))
@@ -0,0 +1,263 @@
+"""
+Off-event-loop execution of feature extraction and inference
+
+MFCC extraction and the forward pass are CPU-bound; run inside an
+``async def`` handler they block uvicorn's event loop, so health checks
+and /honeypot stall behind every clip. InferencePool runs them in a
+managed pool instead:
+
+    process  ProcessPoolExecutor; every worker loads the model once in
+             its initializer (default, sidesteps the GIL entirely)
+    thread   ThreadPoolExecutor sharing one model (torch releases the
+             GIL inside its kernels; lighter on memory)
+
+Concurrent predictions are batched first (batching.MicroBatchScheduler):
+each batch of clips is one task, scored by analyze_batch in a single
+forward pass, and at most one batch per worker is in flight.
+
+Tasks have a timeout. A crashed worker (BrokenProcessPool) or a task
+that overruns its timeout restarts the pool, and the crashed task is
+retried once on the fresh pool.
+
+Configuration (environment variables):
+    INFERENCE_POOL      process | thread (default process)
+    INFERENCE_WORKERS   pool size (default: number of CPUs)
+    INFERENCE_TIMEOUT   seconds per task (default 30)
+    BATCH_MAX_SIZE      clips per task (default 16)
+    BATCH_MAX_WAIT_MS   longest wait for a batch to fill (default 10)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatchScheduler
+
+POOL_KINDS = ("process", "thread")
+
+# Model owned by a process-mode pool worker (thread-mode pools keep
+# theirs on the InferencePool)
+_model = None
+_model_lock = threading.Lock()
+# Models loaded before a pre-fork server forks its workers (launcher.py);
+# the first thread-mode pool of each worker takes its copy-on-write share
+_preloaded: Dict[Tuple[str, Optional[str]], object] = {}
+
+
+def preload(model_path: str, backend: Optional[str] = None) -> None:
+    """Load a model now, for the next thread-mode pool serving it"""
+    _preloaded[(model_path, backend)] = _build_model(model_path, backend)
+
+
+def _build_model(model_path: str, backend: Optional[str]):
+    model = _preloaded.pop((model_path, backend), None)
+    if model is not None:
+        return model
+    from model_integration import VoiceDetectionModel
+
+    kwargs = {"backend": backend} if backend else {}
+    return VoiceDetectionModel(model_path, **kwargs)
+
+
+def _load_model(model_path: str, backend: Optional[str], torch_threads: int):
+    global _model
+    with _model_lock:
+        if _model is None:
+            from model_integration import torch
+
+            if torch_threads and torch is not None:
+                torch.set_num_threads(torch_threads)
+            _model = _build_model(model_path, backend)
+    return _model
+
+
+def _worker_init(model_path: str, backend: Optional[str], torch_threads: int) -> None:
+    _load_model(model_path, backend, torch_threads)
+
+
+def _worker_ping() -> int:
+    return os.getpid()
+
+
+def _worker_warm_up(model=None) -> float:
+    """Run the model on synthetic clips so lazy init happens before real traffic"""
+    model = model or _model
+    import numpy as np
+    from model_integration import LONG_CLIP_SECONDS
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(0)
+    for sample_rate, seconds in ((16000, 2), (44100, 2), (16000, LONG_CLIP_SECONDS + 2)):
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        clip = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(t.size)
+        model.analyze(clip.astype(np.float32), sample_rate)
+    return time.perf_counter() - start
+
+
+def _worker_predict_batch(clips: List[Tuple[bytes, Optional[int]]], model=None) -> list:
+    return (model or _model).analyze_batch(clips)
+
+
+class InferenceTimeout(Exception):
+    """A task did not finish within the pool's task timeout"""
+
+
+class InferencePool:
+    """
+    Usage:
+        pool = InferencePool("voice_model.pth")
+        await pool.start()
+        result = await pool.predict(audio_bytes)  # prediction, confidence, windows_evaluated
+        await pool.stop()
+    """
+
+    def __init__(self, model_path: str, backend: Optional[str] = None, kind: str = "process",
+                 workers: Optional[int] = None, task_timeout: float = 30.0,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown pool kind '{kind}' (expected one of {', '.join(POOL_KINDS)})")
+        self.model_path = model_path
+        self.backend = backend
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        # Split the cores between process workers instead of letting every
+        # worker start one torch thread per core
+        self.torch_threads = max(1, (os.cpu_count() or 1) // self.workers) if kind == "process" else 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.completed = 0
+        self._executor = None
+        # Thread pools own their model, so two pools (e.g. during a model
+        # swap) never share one
+        self._model = None
+        self._lock = asyncio.Lock()
+        self._batcher = MicroBatchScheduler(run_batch=self._predict_batch, max_batch_size=max_batch_size,
+                                            max_wait_ms=max_wait_ms, max_concurrent_batches=self.workers)
+
+    @classmethod
+    def from_env(cls, model_path: str, backend: Optional[str] = None) -> "InferencePool":
+        workers = os.environ.get("INFERENCE_WORKERS")
+        return cls(
+            model_path,
+            backend=backend,
+            kind=os.environ.get("INFERENCE_POOL", "process"),
+            workers=int(workers) if workers else None,
+            task_timeout=float(os.environ.get("INFERENCE_TIMEOUT", 30)),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    async def start(self) -> None:
+        """Create the pool and wait until every worker has loaded the model"""
+        async with self._lock:
+            if self._executor is None:
+                await self._spawn()
+
+    async def stop(self) -> None:
+        await self._batcher.stop()
+        async with self._lock:
+            self._shutdown()
+
+    async def predict(self, audio: bytes, sample_rate: Optional[int] = None) -> dict:
+        """
+        Run VoiceDetectionModel.analyze on ``audio`` without blocking the event loop
+        """
+        if self._executor is None:
+            await self.start()
+        return await self._batcher.predict((audio, sample_rate))
+
+    async def _predict_batch(self, clips: List[Tuple[bytes, Optional[int]]]) -> list:
+        executor = self._executor
+        if executor is None:
+            await self.start()
+            executor = self._executor
+        try:
+            return await self._submit(executor, clips)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault in a native kernel):
+            # replace the pool and retry this task once.
+            await self._restart(executor)
+            return await self._submit(self._executor, clips)
+
+    async def warm_up(self) -> float:
+        """Push synthetic clips through every worker; returns the slowest warm-up in seconds"""
+        if self._executor is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        # Thread workers share one model, so once is enough
+        rounds = self.workers if self.kind == "process" else 1
+        timings = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _worker_warm_up, self._model) for _ in range(rounds)
+        ))
+        return max(timings)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "running": self.running,
+            "completed": self.completed,
+            "batches": self._batcher.batches,
+            "mean_batch_size": round(self._batcher.mean_batch_size, 2),
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+    async def _submit(self, executor, clips: List[Tuple[bytes, Optional[int]]]) -> list:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, _worker_predict_batch, clips, self._model)
+        try:
+            result = await asyncio.wait_for(future, self.task_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if self.kind == "process":
+                # The stuck worker would keep its slot forever
+                await self._restart(executor)
+            raise InferenceTimeout(f"Inference took longer than {self.task_timeout:g}s")
+        self.completed += len(clips)
+        return result
+
+    async def _spawn(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.kind == "thread":
+            self._model = await loop.run_in_executor(None, _build_model, self.model_path, self.backend)
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="inference")
+            return
+
+        # spawn, not fork: forking a process with live OpenMP threads can deadlock
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.model_path, self.backend, self.torch_threads),
+        )
+        # Touch every worker so they all pay the model load now, not on the first request
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _worker_ping) for _ in range(self.workers)
+        ))
+
+    async def _restart(self, failed=None) -> None:
+        async with self._lock:
+            if failed is not None and self._executor is not failed:
+                return  # another task already replaced it
+            self._shutdown()
+            self.restarts += 1
+            await self._spawn()
+
+    def _shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if isinstance(executor, ProcessPoolExecutor):
+            # Hung workers never return on their own
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,429 @@
+"""
+Multi-worker production launcher
+
+`uvicorn app:app` is one process on one core. The launcher runs a
+pre-fork master instead:
+
+    1. detects the CPUs and memory the container may use (cgroup
+       limits, CPU affinity) and sizes the worker count from them
+    2. imports the app and calls its ``preload()`` hook (app.py loads
+       the startup model's weights), then freezes the GC so forked
+       workers keep sharing those pages copy-on-write
+    3. binds the socket once and forks the workers; each one runs
+       uvicorn on the shared socket with its own share of torch threads
+
+The master runs torch single-threaded (intra-op and inter-op), so it has
+no OpenMP or inter-op pool threads when it forks: a child inherits the
+locks of threads that do not exist in it and could deadlock on them.
+Each worker sizes its own intra-op pool after the fork; inter-op
+parallelism stays off. Shared weights need INFERENCE_POOL=thread (the
+default here): a process pool loads a copy in every pool process, so
+with any other pool the launcher warns and skips the preload.
+
+Workers are recycled after MAX_REQUESTS requests (with jitter) or when
+their private memory passes MAX_WORKER_RSS_MB; the master forks a fresh
+one from the preloaded image. SIGHUP replaces the workers one at a time
+(a new one is serving before an old one is told to stop). SIGTERM and
+SIGINT stop every worker gracefully.
+
+Configuration (environment variables):
+    HOST, PORT            bind address (default 0.0.0.0:8000)
+    WEB_CONCURRENCY       worker count (default: from CPUs and memory)
+    WORKER_MEMORY_MB      memory budgeted per worker when sizing (default 256)
+    TORCH_THREADS         torch threads per worker (default: CPUs / workers)
+    MAX_REQUESTS          recycle a worker after this many requests (default 0: never)
+    MAX_REQUESTS_JITTER   random extra requests, so workers do not recycle together (default 0)
+    MAX_WORKER_RSS_MB     recycle a worker past this much private memory (default 0: never)
+    GRACEFUL_TIMEOUT      seconds a stopping worker may finish requests (default 30)
+
+Usage:
+    python launcher.py app:app
+    kill -HUP <master pid>      # rolling restart
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import math
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("launcher")
+
+DEFAULT_WORKER_MEMORY_MB = 256
+# Kept free for the master and the OS when sizing from memory
+RESERVED_MEMORY_MB = 128
+RSS_CHECK_INTERVAL = 5.0
+READY_TIMEOUT = 120.0
+# A stopping worker stops accepting, then waits this long before closing
+# idle connections: ones it accepted just before have sent their request
+ACCEPT_DRAIN_SECONDS = 0.5
+
+
+# ----------------------------------------
+# Resources
+# ----------------------------------------
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by a cgroup CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = None
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>" or "max <period>"
+    if cpu_max and not cpu_max.startswith("max"):
+        limit, period = cpu_max.split()[:2]
+        quota = int(limit) / int(period)
+    else:
+        limit, period = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"), _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memory this process may use: the cgroup limit or the host total"""
+    limits = []
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read(path)
+        if value and value.isdigit() and int(value) < 1 << 60:
+            limits.append(int(value) // (1024 * 1024))
+    meminfo = _read("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                limits.append(int(line.split()[1]) // 1024)
+    return min(limits) if limits else None
+
+
+def plan_workers(cpus: int, memory_mb: Optional[int], worker_memory_mb: int = DEFAULT_WORKER_MEMORY_MB,
+                 requested: Optional[int] = None) -> Tuple[int, int]:
+    """(workers, torch threads per worker)"""
+    if requested:
+        workers = requested
+    else:
+        workers = cpus
+        if memory_mb is not None:
+            workers = min(workers, (memory_mb - RESERVED_MEMORY_MB) // max(1, worker_memory_mb))
+    workers = max(1, workers)
+    return workers, max(1, cpus // workers)
+
+
+def private_memory_mb(pid: str = "self") -> float:
+    """Memory only this process holds (pages shared with the master excluded)"""
+    rollup = _read(f"/proc/{pid}/smaps_rollup")
+    if rollup:
+        kb = sum(int(line.split()[1]) for line in rollup.splitlines()
+                 if line.startswith(("Private_Clean:", "Private_Dirty:")))
+        return kb / 1024
+    statm = _read(f"/proc/{pid}/statm")
+    return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if statm else 0.0
+
+
+# ----------------------------------------
+# Workers
+# ----------------------------------------
+
+def single_threaded_torch() -> None:
+    """Keep torch from starting thread pools in the master (see the module docstring)"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:  # only settable before any inter-op work
+        pass
+
+
+def set_torch_threads(threads: int) -> None:
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def request_limit(max_requests: int, jitter: int) -> Optional[int]:
+    """
+    Requests this worker serves before it is recycled (None: no limit).
+    Jitter is drawn here, not by uvicorn's limit_max_requests_jitter,
+    which older uvicorn releases lack; random is reseeded in every fork.
+    """
+    if not max_requests:
+        return None
+    return max_requests + random.randint(0, max(0, jitter))
+
+
+def run_worker(app, sock: socket.socket, threads: int, ready_fd: int, options: dict) -> None:
+    """Body of a forked worker: uvicorn on the inherited socket"""
+    import asyncio
+
+    import uvicorn
+
+    class WorkerServer(uvicorn.Server):
+        async def shutdown(self, sockets=None) -> None:
+            # uvicorn closes idle connections right away, including ones
+            # accepted a moment ago whose request is still unread
+            for server in self.servers:
+                server.close()
+            await asyncio.sleep(ACCEPT_DRAIN_SECONDS)
+            await super().shutdown(sockets)
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    set_torch_threads(threads)
+    server = WorkerServer(uvicorn.Config(
+        app,
+        limit_max_requests=request_limit(options["max_requests"], options["max_requests_jitter"]),
+        timeout_graceful_shutdown=options["graceful_timeout"],
+        log_level=options["log_level"],
+    ))
+
+    def watch():
+        while not server.started and not server.should_exit:
+            time.sleep(0.05)
+        os.write(ready_fd, b"1" if server.started else b"0")
+        os.close(ready_fd)
+        while options["max_rss_mb"] and not server.should_exit:
+            time.sleep(RSS_CHECK_INTERVAL)
+            if private_memory_mb() > options["max_rss_mb"]:
+                logger.warning("Worker %d over %d MB, recycling", os.getpid(), options["max_rss_mb"])
+                server.should_exit = True
+
+    threading.Thread(target=watch, name="worker-watch", daemon=True).start()
+    server.run(sockets=[sock])
+
+
+class Launcher:
+    """
+    Usage:
+        Launcher("app:app", workers=4, threads=2).run()
+    """
+
+    def __init__(self, target: str, host: str = "0.0.0.0", port: int = 8000, workers: int = 1,
+                 threads: int = 1, max_requests: int = 0, max_requests_jitter: int = 0,
+                 max_rss_mb: int = 0, graceful_timeout: int = 30, log_level: str = "info"):
+        self.target = target
+        self.host = host
+        self.port = port
+        self.count = workers
+        self.threads = threads
+        self.options = {"max_requests": max_requests, "max_requests_jitter": max_requests_jitter,
+                        "max_rss_mb": max_rss_mb, "graceful_timeout": graceful_timeout,
+                        "log_level": log_level}
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, int] = {}  # pid -> ready pipe
+        self.retiring: Dict[int, float] = {}  # pid -> kill deadline
+        self.app = None
+        self.sock: Optional[socket.socket] = None
+        self._stopping = False
+        self._reload = False
+
+    @classmethod
+    def from_env(cls, target: str) -> "Launcher":
+        requested = os.environ.get("WEB_CONCURRENCY")
+        cpus = available_cpus()
+        workers, threads = plan_workers(
+            cpus, available_memory_mb(),
+            int(os.environ.get("WORKER_MEMORY_MB", DEFAULT_WORKER_MEMORY_MB)),
+            int(requested) if requested else None)
+        return cls(
+            target,
+            host=os.environ.get("HOST", "0.0.0.0"),
+            port=int(os.environ.get("PORT", 8000)),
+            workers=workers,
+            threads=int(os.environ.get("TORCH_THREADS", threads)),
+            max_requests=int(os.environ.get("MAX_REQUESTS", 0)),
+            max_requests_jitter=int(os.environ.get("MAX_REQUESTS_JITTER", 0)),
+            max_rss_mb=int(os.environ.get("MAX_WORKER_RSS_MB", 0)),
+            graceful_timeout=int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+            log_level=os.environ.get("LOG_LEVEL", "info").lower(),
+        )
+
+    def load(self) -> None:
+        """Import the app (and its preloaded model) before any fork"""
+        # Thread-mode inference inside each worker: a process pool would
+        # spawn fresh interpreters and lose the shared weights
+        pool = os.environ.setdefault("INFERENCE_POOL", "thread")
+        os.environ.setdefault("INFERENCE_WORKERS", "1")
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(name, str(self.threads))
+        single_threaded_torch()
+
+        module_name, _, attribute = self.target.partition(":")
+        module = importlib.import_module(module_name)
+        self.app = getattr(module, attribute or "app")
+        preload = getattr(module, "preload", None)
+        if preload is not None and pool != "thread":
+            logger.warning("INFERENCE_POOL=%s loads the model in every pool process, not once in the "
+                           "master: skipping preload (use INFERENCE_POOL=thread to share the weights)", pool)
+        elif preload is not None:
+            started = time.monotonic()
+            preload()
+            logger.info("Preloaded %s in %.1fs", module_name, time.monotonic() - started)
+
+    def bind(self) -> None:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        self.sock = sock
+
+    def spawn(self) -> int:
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            for fd in self.workers.values():  # other workers' pipes
+                os.close(fd)
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.threads, ready_write, self.options)
+            except BaseException:
+                logger.exception("Worker %d failed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_write)
+        self.workers[pid] = ready_read
+        logger.info("Started worker %d (%d torch threads)", pid, self.threads)
+        return pid
+
+    def wait_ready(self, pid: int, timeout: float = READY_TIMEOUT) -> bool:
+        fd = self.workers.get(pid)
+        if fd is None:
+            return False
+        readable, _, _ = select.select([fd], [], [], timeout)
+        return bool(readable) and os.read(fd, 1) == b"1"
+
+    def run(self) -> None:
+        self.load()
+        self.bind()
+        if not hasattr(os, "fork"):
+            import uvicorn  # no fork (Windows): one in-process server
+
+            uvicorn.run(self.app, fd=self.sock.fileno(), log_level=self.options["log_level"])
+            return
+        # Objects that exist now are never collected in the workers, so the
+        # GC does not write to (and unshare) the preloaded pages
+        gc.collect()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        logger.info("Serving %s on %s:%d with %d workers", self.target, self.host, self.port, self.count)
+
+        for _ in range(self.count):
+            self.spawn()
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                self.rolling_restart()
+            self.reap()
+            while len(self.workers) < self.count and not self._stopping:
+                self.spawn()
+            time.sleep(0.2)
+        self.shutdown()
+
+    def rolling_restart(self) -> None:
+        """Replace every worker, one at a time, without dropping capacity"""
+        for old in list(self.workers):
+            if self._stopping:
+                return
+            new = self.spawn()
+            if not self.wait_ready(new):
+                logger.error("Worker %d never became ready; keeping %d", new, old)
+                self.retire(new)
+                return
+            self.retire(old)
+            while old in self.workers and not self._stopping:
+                self.reap()
+                time.sleep(0.05)
+
+    def retire(self, pid: int) -> None:
+        """Ask a worker to finish its requests and exit"""
+        self.retiring[pid] = time.monotonic() + self.graceful_timeout + 5
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reap(self) -> None:
+        """Collect exited workers (the run loop replaces them) and kill overdue ones"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            fd = self.workers.pop(pid, None)
+            if fd is not None:
+                os.close(fd)
+            if self.retiring.pop(pid, None) is None and not self._stopping:
+                logger.info("Worker %d exited (%s), replacing it", pid, status)
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline and pid in self.workers:
+                os.kill(pid, signal.SIGKILL)
+
+    def shutdown(self) -> None:
+        for pid in list(self.workers):
+            self.retire(pid)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+        self.reap()
+        self.sock.close()
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker server for an ASGI app")
+    parser.add_argument("target", nargs="?", default="app:app", help="module:attribute (default app:app)")
+    parser.add_argument("--workers", type=int, help="overrides WEB_CONCURRENCY")
+    parser.add_argument("--port", type=int, help="overrides PORT")
+    args = parser.parse_args()
+    if args.workers:
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    if args.port:
+        os.environ["PORT"] = str(args.port)
+
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s [launcher %(process)d] %(message)s")
+    launcher = Launcher.from_env(args.target)
+    logger.info("%d CPUs, %s MB memory: %d workers x %d torch threads", available_cpus(),
+                available_memory_mb(), launcher.count, launcher.threads)
+    launcher.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,109 +1,13 @@
-from fastapi import FastAPI, Request, Response
-from fastapi.middleware.cors import CORSMiddleware
-import json
-import os
-
-app = FastAPI()
-
-# 1. Enable standard CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
-async def health():
-    return {"status": "success", "message": "Unified API is live and fast"}
+"""
+Docker entry point (uvicorn main:app)
 
-@app.api_route("/honeypot", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
-async def honeypot_endpoint(request: Request):
-    # Immediate handling of OPTIONS
-    if request.method == "OPTIONS":
-        return Response(status_code=200)
+The unified API lives in app.py; this module re-exports it so the
+Docker image and Render/Vercel serve exactly the same routes.
+"""
 
-    # CRITICAL: We DO NOT wait for request.body().
-    # This prevents the "Read timeout" if the tester doesn't send a body correctly.
-    
-    # Get API key
-    api_key = request.headers.get("x-api-key", "").lower()
-    
-    # Check key: We are generous here. If it contains 'guvi', it passes.
-    if api_key and "guvi" not in api_key:
-        return Response(
-            content=json.dumps({"error": "Unauthorized"}), 
-            status_code=401, 
-            media_type="application/json"
-        )
-
-    # Perfect response for the GUVI tester
-    # We include multiple formats to be 100% sure it passses
-    payload = {
-        "status": "success",
-        "threat_analysis": {
-            "risk_level": "high",
-            "detected_patterns": ["suspicious_content"],
-            "origin_ip": "unknown"
-        },
-        "extracted_data": {
-            "intent": "scam_attempt",
-            "action": "flagged"
-        },
-        # Compatibility for older or alternate versions of the tester
-        "extracted_intelligence": {
-            "threat": "active",
-            "intent": "scam_detected",
-            "action": "logged"
-        }
-    }
-    
-    return Response(
-        content=json.dumps(payload),
-        status_code=200,
-        media_type="application/json"
-    )
-
-@app.api_route("/predict", methods=["GET", "POST", "OPTIONS"])
-async def predict_endpoint(request: Request):
-    if request.method == "OPTIONS":
-        return Response(status_code=200)
-
-    api_key = request.headers.get("x-api-key", "").lower()
-    if "guvi" not in api_key:
-        return Response(
-            content=json.dumps({"error": "Unauthorized"}), 
-            status_code=401, 
-            media_type="application/json"
-        )
-    
-    return Response(
-        content=json.dumps({
-            "status": "success",
-            "prediction": "Human",
-            "confidence": 0.99,
-            "language": "en",
-            "audio_format": "wav"
-        }),
-        status_code=200,
-        media_type="application/json"
-    )
+import os
 
-# Catch-all for other paths or empty path
-@app.api_route("/{path:path}", methods=["GET", "POST", "OPTIONS"])
-async def catch_all(request: Request, path: str):
-    clean_path = path.strip("/").lower()
-    if clean_path == "honeypot" or not clean_path:
-        return await honeypot_endpoint(request)
-    if clean_path == "predict":
-        return await predict_endpoint(request)
-        
-    return Response(
-        content=json.dumps({"status": "live", "available_paths": ["/honeypot", "/predict"]}),
-        status_code=200,
-        media_type="application/json"
-    )
+from app import app, preload  # noqa: F401 (preload: launcher.py hook)
 
 if __name__ == "__main__":
     import uvicorn
@@ -5,10 +5,86 @@ This file shows how to replace the simulated predictions
 with actual machine learning model inference.
 """
 
-import torch
-import torchaudio
+from __future__ import annotations
+
+import io
+import os
+import threading
+
 import numpy as np
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
+
+try:
+    import torch
+    import torchaudio
+except ImportError:  # slim deployment: ONNX backend + NumPy features
+    torch = torchaudio = None
+
+import numpy_features
+import wav_io
+from bucketing import (
+    BucketBatchSampler,
+    collate_padded,
+    length_groups,
+    pad_batch,
+    padding_overhead,
+)
+from dsp_plans import HOP_LENGTH, N_MFCC, TARGET_SAMPLE_RATE, default_registry
+from feature_cache import FeatureCache, FeatureContext, default_feature_cache
+from inference_backends import DEFAULT_BACKEND, InferenceBackend, load_backend
+
+if torch is not None:
+    from classifiers import StudentClassifier, VoiceClassifier
+
+# A file path, the raw bytes of an audio file, or decoded samples
+# (1-D mono or (channels, frames)) together with their sample rate;
+# or a FeatureContext wrapping one of those (see feature_cache.py).
+AudioInput = Union[str, bytes, bytearray, memoryview, np.ndarray, FeatureContext]
+
+# The classifier pools over time, so any clip of at least MIN_FRAMES
+# frames (two 2x2 poolings) is a valid input. Windows for long clips
+# and fixed-size calibration sets use INPUT_FRAMES.
+INPUT_FRAMES = 40
+MIN_FRAMES = 4
+
+# Long clips are scored window by window instead of as one MFCC pass.
+# A window is exactly INPUT_FRAMES frames.
+WINDOW_SECONDS = (INPUT_FRAMES - 1) * HOP_LENGTH / TARGET_SAMPLE_RATE
+LONG_CLIP_SECONDS = float(os.environ.get("LONG_CLIP_SECONDS", 10))
+WINDOW_CONFIDENCE = float(os.environ.get("WINDOW_CONFIDENCE", 0.9))
+MAX_WINDOWS = int(os.environ.get("MAX_WINDOWS", 8))
+# Shorter clips are one input; this is the most frames one can have
+MAX_INPUT_FRAMES = int(LONG_CLIP_SECONDS * TARGET_SAMPLE_RATE) // HOP_LENGTH + 1
+
+# Tiered serving: a distilled StudentClassifier answers first and the
+# teacher only sees clips the student is less confident about than this
+STUDENT_MODEL_PATH = os.environ.get("STUDENT_MODEL_PATH")
+ESCALATION_CONFIDENCE = float(os.environ.get("ESCALATION_CONFIDENCE", 0.8))
+
+# MFCC implementation: "torch" (torchaudio), "numpy" (numpy_features.py)
+# or "auto", which picks numpy for the onnx backend or when torch is missing
+FEATURE_PIPELINE = os.environ.get("FEATURE_PIPELINE", "auto")
+
+
+def crop_or_pad(features, frames: int = INPUT_FRAMES):
+    """
+    (…, N_MFCC, T) features -> (1, N_MFCC, frames), zero-padding short
+    clips; tensors stay tensors and NumPy arrays stay arrays
+    """
+    features = features.reshape(1, N_MFCC, -1)
+    available = features.shape[-1]
+    if available >= frames:
+        return features[..., :frames]
+    if isinstance(features, np.ndarray):
+        return np.pad(features, ((0, 0), (0, 0), (0, frames - available)))
+    return torch.nn.functional.pad(features, (0, frames - available))
+
+
+def fit_length(features, max_frames: int = MAX_INPUT_FRAMES):
+    """(…, N_MFCC, T) features -> (1, N_MFCC, T) with T clamped to [MIN_FRAMES, max_frames]"""
+    frames = min(max(features.shape[-1], MIN_FRAMES), max_frames)
+    return crop_or_pad(features, frames)
+
 
 class VoiceDetectionModel:
     """
@@ -16,81 +92,332 @@ class VoiceDetectionModel:
     Replace this with your actual trained model
     """
     
-    def __init__(self, model_path: str = "voice_model.pth"):
-        """Load the trained model"""
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        
-        # Load your trained model
-        # self.model = torch.load(model_path, map_location=self.device)
-        # self.model.eval()
-        
-        # For now, we'll use a placeholder
-        self.model = None
+    def __init__(self, model_path: str = "voice_model.pth", backend: str = DEFAULT_BACKEND,
+                 student_path: Optional[str] = STUDENT_MODEL_PATH,
+                 escalation_confidence: float = ESCALATION_CONFIDENCE,
+                 features: str = FEATURE_PIPELINE,
+                 feature_cache: Optional[FeatureCache] = None):
+        """
+        Load the trained model
+
+        backend picks how the model file is run: "torch" (state_dict),
+        "torchscript", "onnx" or "int8" (see inference_backends.py)
+
+        With a student model (same backend kind), clips are scored by the
+        student and only escalated to the teacher at model_path when the
+        student's confidence is below escalation_confidence.
+
+        features picks the MFCC implementation: "torch", "numpy" or
+        "auto" (NumPy for the onnx backend or without torch installed).
+        Intermediate features go to feature_cache (default: the
+        process-wide one), shared with every other model in the process.
+        """
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu") if torch else "cpu"
+
+        # Load your trained model. Without one we keep the placeholder
+        # probability below.
+        self.backend: Optional[InferenceBackend] = None
+        if model_path and os.path.exists(model_path):
+            self.backend = load_backend(backend, model_path, self.device)
+        self.student: Optional[InferenceBackend] = None
+        if student_path and os.path.exists(student_path):
+            self.student = load_backend(backend, student_path, self.device)
+        self.escalation_confidence = escalation_confidence
+        self.tier_counts = {"student": 0, "escalated": 0}
+        self._tier_lock = threading.Lock()
+
+        # ONNX Runtime takes NumPy input, so MFCCs computed with NumPy skip
+        # torch entirely (and match the torchaudio ones, see numpy_features.py)
+        if features == "auto":
+            features = "numpy" if backend == "onnx" or torch is None else "torch"
+        if features not in ("torch", "numpy"):
+            raise ValueError(f"Unknown feature pipeline '{features}' (expected auto, torch or numpy)")
+        self.features = features
+
+        # Resample/MFCC transforms are built once per input rate and shared
+        self.dsp_plans = numpy_features.numpy_registry if features == "numpy" else default_registry
+        self.dsp_plans.warm()
+        self.feature_cache = feature_cache if feature_cache is not None else default_feature_cache
         print(f"Model loaded on device: {self.device}")
     
-    def extract_features(self, audio_path: str) -> torch.Tensor:
+    def context(self, audio: AudioInput, sample_rate: Optional[int] = None) -> FeatureContext:
+        """
+        Wrap request audio in a FeatureContext; pass it to every model
+        scoring the request so they share decode, resample and MFCC work
+        """
+        if isinstance(audio, FeatureContext):
+            return audio
+        return FeatureContext(audio, sample_rate, self.feature_cache)
+
+    def load_waveform(self, audio: AudioInput,
+                      sample_rate: Optional[int] = None) -> Tuple[torch.Tensor, int]:
         """
-        Extract features from audio file
+        Load audio as a (channels, frames) float tensor without touching disk
+        (a float32 array with the NumPy feature pipeline)
+
+        The decoded samples are shared through the feature cache, so other
+        models on the same audio skip decoding.
+        """
+        context = self.context(audio, sample_rate)
+        waveform, sample_rate = context.get(
+            ("pcm",), lambda: self._decode(context.audio, context.sample_rate))
+        return self._as_waveform(waveform), sample_rate
+
+    @staticmethod
+    def _decode(audio: AudioInput, sample_rate: Optional[int]) -> Tuple[np.ndarray, int]:
+        """
+        (channels, frames) float32 samples of audio
+
+        PCM/float WAV bytes are decoded zero-copy through a NumPy view;
+        other containers (mp3, flac, ...) are handed to torchaudio as an
+        in-memory file. A path still goes through torchaudio.load.
+        """
+        if isinstance(audio, str):
+            if torchaudio is not None:
+                waveform, sample_rate = torchaudio.load(audio)
+                return waveform.numpy(), sample_rate
+            with open(audio, "rb") as f:
+                audio = f.read()
+
+        if isinstance(audio, np.ndarray):
+            if sample_rate is None:
+                raise ValueError("sample_rate is required for NumPy audio")
+            # to_float32 takes the (frames, channels) layout of WAV data
+            frames_first = audio.T if audio.ndim == 2 else audio
+            return wav_io.to_float32(frames_first), sample_rate
+
+        try:
+            samples, sample_rate = wav_io.read_wav(audio)
+        except wav_io.WavFormatError:
+            if torchaudio is None:
+                # Only WAV can be decoded without torchaudio
+                raise
+            waveform, sample_rate = torchaudio.load(io.BytesIO(audio))
+            return waveform.numpy(), sample_rate
+        return wav_io.to_float32(samples), sample_rate
+
+    def _as_waveform(self, waveform: np.ndarray):
+        """A decoded waveform as the feature pipeline's array type (zero-copy)"""
+        return waveform if self.features == "numpy" else torch.from_numpy(waveform)
+
+    def extract_features(self, audio: AudioInput, sample_rate: Optional[int] = None) -> torch.Tensor:
+        """
+        Extract features from audio (path, bytes, NumPy samples or a
+        FeatureContext shared with other models)
         Common features for voice detection:
         - MFCC (Mel-frequency cepstral coefficients)
         - Mel spectrograms
         - Chromagrams
         - Zero-crossing rate
         - Spectral features
+
+        Every stage is looked up in the feature cache under the audio hash
+        and this model's pipeline and plan parameters.
         """
-        # Load audio
-        waveform, sample_rate = torchaudio.load(audio_path)
-        
-        # Resample if needed (most models expect 16kHz)
-        if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-            waveform = resampler(waveform)
-            sample_rate = 16000
-        
-        # Convert to mono if stereo
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
-        
-        # Extract MFCC features
-        mfcc_transform = torchaudio.transforms.MFCC(
-            sample_rate=sample_rate,
-            n_mfcc=40,
-            melkwargs={
-                "n_fft": 2048,
-                "hop_length": 512,
-                "n_mels": 128,
-            }
-        )
-        
-        mfcc = mfcc_transform(waveform)
-        
-        # Normalize features
-        mfcc = (mfcc - mfcc.mean()) / (mfcc.std() + 1e-8)
-        
-        return mfcc
-    
-    def predict(self, audio_path: str) -> Tuple[str, float]:
+        context = self.context(audio, sample_rate)
+        # Mel and DCT stages are the same in every plan; only resampling
+        # depends on the input rate
+        plan = self.dsp_plans.get(TARGET_SAMPLE_RATE)
+        _, n_fft, hop_length, n_mels, n_mfcc = plan.key
+
+        def resampled():
+            # Load audio, convert to mono and resample to 16kHz (most
+            # models expect it) with the precomputed plan for its rate
+            waveform, sample_rate = self.load_waveform(context)
+            return self.dsp_plans.get(sample_rate).resample(self._mono(waveform))
+
+        def mel_db():
+            return plan.mel_db(context.get(("resampled", self.features, TARGET_SAMPLE_RATE), resampled))
+
+        def mfcc():
+            mel = context.get(("mel", self.features, n_fft, hop_length, n_mels), mel_db)
+            return self._normalize(plan.cepstrum(mel))
+
+        # Later stages are looked up first: a cached MFCC needs no decoding
+        return context.get(("mfcc", self.features, n_fft, hop_length, n_mels, n_mfcc), mfcc)
+
+    def features_from_waveform(self, waveform: torch.Tensor, sample_rate: int) -> torch.Tensor:
+        """Normalized MFCC features of a (channels, frames) waveform (tensor or array)"""
+        if isinstance(waveform, np.ndarray):
+            waveform = self._as_waveform(waveform)
+        plan = self.dsp_plans.get(sample_rate)
+        return self._normalize(plan(self._mono(waveform)))
+
+    @staticmethod
+    def _mono(waveform):
+        # Convert to mono if stereo (before resampling: half the work)
+        if waveform.shape[0] == 1:
+            return waveform
+        if isinstance(waveform, np.ndarray):
+            return waveform.mean(axis=0, keepdims=True)
+        return torch.mean(waveform, dim=0, keepdim=True)
+
+    @staticmethod
+    def _normalize(mfcc):
+        if isinstance(mfcc, np.ndarray):
+            return numpy_features.normalize(mfcc)
+        return (mfcc - mfcc.mean()) / (mfcc.std() + 1e-8)
+
+    def prepare_input(self, features: torch.Tensor) -> torch.Tensor:
         """
-        Run inference on audio file
-        
+        Reshape MFCC features to a (1, N_MFCC, T) classifier input, with T
+        clamped to [MIN_FRAMES, MAX_INPUT_FRAMES]
+        """
+        return fit_length(features)
+
+    def predict_features_batch(self, features: List[torch.Tensor]) -> List[Tuple[str, float]]:
+        """
+        Run inference on several clips' features, batching clips of
+        similar length together
+
         Returns:
-            prediction: "AI" or "Human"
-            confidence: float between 0 and 1
+            one (prediction, confidence) pair per clip, in input order
         """
-        # Extract features
-        features = self.extract_features(audio_path)
-        features = features.to(self.device)
-        
-        # Run inference
-        with torch.no_grad():
-            # Example model inference (replace with your actual model)
-            # output = self.model(features)
-            # probability = torch.sigmoid(output).item()
-            
+        return [self._to_prediction(p) for p in self.probabilities(features)]
+
+    def probabilities(self, features: List[torch.Tensor]) -> List[float]:
+        """Raw P(AI) for each clip's features"""
+        if self.backend is None and self.student is None:
             # For demonstration, return a placeholder
             # In reality, this would be your model's output
-            probability = 0.85
+            return [0.85] * len(features)
+        inputs = [self.prepare_input(f) for f in features]
+        if self.student is None:
+            return self._run(self.backend, inputs)
+
+        probabilities = self._run(self.student, inputs)
+        marginal = [i for i, p in enumerate(probabilities)
+                    if max(p, 1 - p) < self.escalation_confidence]
+        if self.backend is None:
+            marginal = []
+        if marginal:
+            for i, p in zip(marginal, self._run(self.backend, [inputs[i] for i in marginal])):
+                probabilities[i] = p
+        with self._tier_lock:
+            self.tier_counts["student"] += len(inputs) - len(marginal)
+            self.tier_counts["escalated"] += len(marginal)
+        return probabilities
+
+    @staticmethod
+    def _run(backend: InferenceBackend, inputs: List[torch.Tensor]) -> List[float]:
+        """Score prepared inputs, batching clips of similar length together"""
+        probabilities = [0.0] * len(inputs)
+        for group in length_groups([f.shape[-1] for f in inputs], max_batch_size=len(inputs)):
+            batch, lengths = pad_batch([inputs[i] for i in group])
+            batch, lengths = np.asarray(batch), np.asarray(lengths)
+            for i, p in zip(group, backend.run(batch, lengths).tolist()):
+                probabilities[i] = p
+        return probabilities
+
+    def tier_stats(self) -> dict:
+        """How many clips the student answered alone vs. escalated to the teacher"""
+        with self._tier_lock:
+            counts = dict(self.tier_counts)
+        total = counts["student"] + counts["escalated"]
+        counts["escalation_fraction"] = round(counts["escalated"] / total, 4) if total else 0.0
+        return counts
+
+    def predict(self, audio: AudioInput, sample_rate: Optional[int] = None) -> Tuple[str, float]:
+        """
+        Run inference on audio (path, bytes or NumPy samples)
         
+        Returns:
+            prediction: "AI" or "Human"
+            confidence: float between 0 and 1
+        """
+        features = self.extract_features(audio, sample_rate)
+        return self.predict_features_batch([features])[0]
+
+    def analyze(self, audio: AudioInput, sample_rate: Optional[int] = None) -> dict:
+        """
+        Predict with the cost of long clips capped
+
+        Clips longer than LONG_CLIP_SECONDS go through predict_windows;
+        shorter ones are a single window.
+
+        Returns:
+            {"prediction", "confidence", "windows_evaluated"}
+        """
+        result = self.analyze_batch([(audio, sample_rate)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def analyze_batch(self, clips: List[Tuple[AudioInput, Optional[int]]]) -> List[Union[dict, Exception]]:
+        """
+        analyze() for several (audio, sample_rate) clips at once
+
+        Short clips share one predict_features_batch call; long ones are
+        windowed on their own. A clip that cannot be decoded gets its
+        exception in place of a result, so it fails alone.
+        """
+        results: List[Union[dict, Exception, None]] = [None] * len(clips)
+        short, features = [], []
+        for i, (audio, sample_rate) in enumerate(clips):
+            try:
+                context = self.context(audio, sample_rate)
+                waveform, rate = self.load_waveform(context)
+                if waveform.shape[-1] > LONG_CLIP_SECONDS * rate:
+                    results[i] = self.predict_windows(waveform, rate, context=context)
+                else:
+                    features.append(self.extract_features(context))
+                    short.append(i)
+            except Exception as e:
+                results[i] = e
+
+        if short:
+            for i, (prediction, confidence) in zip(short, self.predict_features_batch(features)):
+                results[i] = {"prediction": prediction, "confidence": confidence, "windows_evaluated": 1}
+        return results
+
+    def predict_windows(self, waveform: torch.Tensor, sample_rate: int,
+                        confidence_threshold: float = WINDOW_CONFIDENCE,
+                        max_windows: int = MAX_WINDOWS, min_windows: int = 2,
+                        batch_size: int = 4,
+                        context: Optional[FeatureContext] = None) -> dict:
+        """
+        Sliding-window inference with confidence-based early exit
+
+        The waveform is cut into 50%-overlapping windows of WINDOW_SECONDS
+        at its own sample rate, so only the windows actually scored are
+        resampled and turned into MFCCs. At most max_windows of them,
+        spread evenly over the clip, are scored batch_size at a time; the
+        running mean probability stops the scan once its confidence
+        reaches confidence_threshold (after at least min_windows).
+
+        With the request's context, window features are shared through
+        the feature cache like the other stages.
+        """
+        window = int(round(WINDOW_SECONDS * sample_rate))
+        plan_key = self.dsp_plans.get(sample_rate).key
+
+        def window_features(start: int):
+            segment = waveform[..., start:start + window]
+            if context is None:
+                return self.features_from_waveform(segment, sample_rate)
+            return context.get(("window", self.features, *plan_key, start, window),
+                               lambda: self.features_from_waveform(segment, sample_rate))
+
+        hop = max(1, window // 2)
+        total = waveform.shape[-1]
+        starts = list(range(0, max(total - window, 0) + 1, hop))
+        if len(starts) > max_windows:
+            picks = np.linspace(0, len(starts) - 1, max_windows).round().astype(int)
+            starts = [starts[i] for i in picks]
+
+        scores: List[float] = []
+        for i in range(0, len(starts), batch_size):
+            features = [window_features(start) for start in starts[i:i + batch_size]]
+            scores.extend(self.probabilities(features))
+            mean = sum(scores) / len(scores)
+            if len(scores) >= min_windows and max(mean, 1 - mean) >= confidence_threshold:
+                break
+
+        prediction, confidence = self._to_prediction(sum(scores) / len(scores))
+        return {"prediction": prediction, "confidence": confidence, "windows_evaluated": len(scores)}
+
+    @staticmethod
+    def _to_prediction(probability: float) -> Tuple[str, float]:
         # Convert probability to prediction
         prediction = "AI" if probability > 0.5 else "Human"
         confidence = probability if prediction == "AI" else (1 - probability)
@@ -113,30 +440,25 @@ model = VoiceDetectionModel("path/to/your/model.pth")
 
 2. Replace the predict_audio() function in main.py with:
 
-def predict_audio(audio_path: str, language: str, audio_format: str) -> dict:
+def predict_audio(audio: bytes, language: str, audio_format: str) -> dict:
     '''
     Main prediction logic using real ML model
+
+    audio is the decoded audio_base64 payload; it is passed to the model
+    in memory, so no temp file is written or read back.
     '''
     
-    # Check if audio file exists and has content
-    if not os.path.exists(audio_path):
-        raise HTTPException(
-            status_code=400,
-            detail={"error": "Audio file could not be processed"}
-        )
-    
-    file_size = os.path.getsize(audio_path)
-    if file_size == 0:
+    if not audio:
         raise HTTPException(
             status_code=400,
             detail={"error": "Audio file is empty or corrupted"}
         )
     
-    logger.info(f"Processing audio file: {audio_path} ({file_size} bytes)")
+    logger.info(f"Processing audio ({len(audio)} bytes)")
     
     try:
         # Use the ML model for prediction
-        prediction, confidence = model.predict(audio_path)
+        prediction, confidence = model.predict(audio)
         
         logger.info(f"Prediction: {prediction} (confidence: {confidence})")
         
@@ -156,7 +478,26 @@ def predict_audio(audio_path: str, language: str, audio_format: str) -> dict:
         )
 
 
-3. Update requirements.txt to include:
+3. Never call model.predict directly inside an async handler: the
+   MFCC + forward pass would block the event loop. app.py runs it in an
+   InferencePool (see inference_pool.py) when MODEL_PATH is set:
+
+result = await inference_pool.predict(audio)
+
+
+4. The pool batches concurrent clips through one forward pass
+   (MicroBatchScheduler in batching.py, sized by BATCH_MAX_SIZE and
+   BATCH_MAX_WAIT_MS); outside the pool the same scheduler works on
+   features directly:
+
+from batching import MicroBatchScheduler
+scheduler = MicroBatchScheduler(model, max_batch_size=16, max_wait_ms=10)
+
+features = model.extract_features(audio)
+prediction, confidence = await scheduler.predict(features)
+
+
+5. Update requirements.txt to include:
 
 torch==2.1.2
 torchaudio==2.1.2
@@ -201,10 +542,18 @@ Here's a basic outline for training a voice detection model:
    - Analyze confusion matrix
    - Check for bias across different languages/accents
    - Measure inference speed
+     (evaluate_model.py prints all of these as JSON and can fail a
+     release on --min-f1 / --min-accuracy / --max-p95-ms)
 
 6. DEPLOYMENT
    - Export model to ONNX or TorchScript for faster inference
+     (export_model.py; pick one with INFERENCE_BACKEND=torch|torchscript|onnx)
+   - With the onnx backend MFCCs are computed in NumPy (numpy_features.py),
+     so a slim image needs neither torch nor torchaudio for WAV input
    - Optimize for production (quantization, pruning)
+   - Distill a StudentClassifier (train_voice_detection_model(distill_from=...))
+     and serve it first with STUDENT_MODEL_PATH; only marginal clips
+     reach the full model
    - Add model versioning
    - Monitor performance in production
 """
@@ -214,50 +563,109 @@ Here's a basic outline for training a voice detection model:
 # EXAMPLE TRAINING SCRIPT
 # ============================================
 
-def train_voice_detection_model():
+class FeatureStoreDataset:
+    """
+    Training samples served from a precomputed feature store
+    (see feature_store.py) instead of decoding audio every epoch
+    """
+
+    def __init__(self, store_dir: str):
+        from feature_store import FeatureStore
+
+        self.store = FeatureStore(store_dir)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Input frames of every sample, for BucketBatchSampler"""
+        return np.clip(self.store.frames, MIN_FRAMES, MAX_INPUT_FRAMES)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, i: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        # from_numpy wraps the memory-mapped view; only the collate into
+        # a padded batch touches the bytes
+        features = torch.from_numpy(self.store.features(i))
+        label = torch.tensor([self.store.labels[i]], dtype=torch.float32)
+        return fit_length(features), label
+
+
+def soften(probabilities: torch.Tensor, temperature: float) -> torch.Tensor:
+    """Sigmoid outputs with their logits divided by ``temperature``"""
+    logits = torch.logit(probabilities, eps=1e-6)
+    return torch.sigmoid(logits / temperature)
+
+
+def train_voice_detection_model(feature_store_dir: str = "features", num_epochs: int = 10,
+                                batch_size: int = 32, num_workers: int = 2,
+                                output_path: str = "voice_model.pth",
+                                distill_from: Optional[str] = None,
+                                temperature: float = 2.0, distill_weight: float = 0.7):
     """
     Example training script (simplified)
+
+    Build the feature store first:
+        python feature_store.py data/ features/
+
+    Distillation mode: with distill_from set to a trained teacher's
+    state_dict, a StudentClassifier is trained on a mix of the labels and
+    the teacher's temperature-softened probabilities instead:
+        train_voice_detection_model(distill_from="voice_model.pth",
+                                    output_path="voice_student.pth")
     """
     import torch
     import torch.nn as nn
-    from torch.utils.data import DataLoader, Dataset
+    from torch.utils.data import DataLoader
     
-    # Define model architecture
-    class VoiceClassifier(nn.Module):
-        def __init__(self):
-            super().__init__()
-            self.conv1 = nn.Conv2d(1, 32, kernel_size=3, padding=1)
-            self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1)
-            self.pool = nn.MaxPool2d(2, 2)
-            self.fc1 = nn.Linear(64 * 10 * 10, 128)
-            self.fc2 = nn.Linear(128, 1)
-            self.dropout = nn.Dropout(0.5)
-        
-        def forward(self, x):
-            x = self.pool(torch.relu(self.conv1(x)))
-            x = self.pool(torch.relu(self.conv2(x)))
-            x = x.view(x.size(0), -1)
-            x = self.dropout(torch.relu(self.fc1(x)))
-            x = torch.sigmoid(self.fc2(x))
-            return x
+    dataset = FeatureStoreDataset(feature_store_dir)
+    # Batches of similar-length clips, padded only to their own longest clip
+    sampler = BucketBatchSampler(dataset.lengths, batch_size)
+    train_loader = DataLoader(
+        dataset,
+        batch_sampler=sampler,
+        collate_fn=collate_padded,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+    )
     
     # Initialize model
-    model = VoiceClassifier()
+    teacher = None
+    if distill_from:
+        teacher = VoiceClassifier()
+        teacher.load_state_dict(torch.load(distill_from, map_location="cpu"))
+        teacher.eval()
+        model = StudentClassifier()
+    else:
+        model = VoiceClassifier()
     criterion = nn.BCELoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
     
     # Training loop (simplified)
-    # for epoch in range(num_epochs):
-    #     for batch in train_loader:
-    #         features, labels = batch
-    #         optimizer.zero_grad()
-    #         outputs = model(features)
-    #         loss = criterion(outputs, labels)
-    #         loss.backward()
-    #         optimizer.step()
+    for epoch in range(num_epochs):
+        model.train()
+        sampler.set_epoch(epoch)
+        total_loss = 0.0
+        real_frames = padded_frames = 0
+        for features, lengths, labels in train_loader:
+            optimizer.zero_grad()
+            outputs = model(features, lengths)
+            loss = criterion(outputs, labels)
+            if teacher is not None:
+                with torch.no_grad():
+                    soft_targets = soften(teacher(features, lengths), temperature)
+                # T^2 keeps the soft-target gradients on the scale of the hard ones
+                soft_loss = criterion(soften(outputs, temperature), soft_targets) * temperature ** 2
+                loss = distill_weight * soft_loss + (1 - distill_weight) * loss
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(labels)
+            real, padded = padding_overhead(lengths.numpy())
+            real_frames, padded_frames = real_frames + real, padded_frames + padded
+        print(f"Epoch {epoch + 1}/{num_epochs}: loss {total_loss / len(dataset):.4f}, "
+              f"padding overhead {padded_frames / max(real_frames, 1):.1%}")
     
     # Save model
-    # torch.save(model.state_dict(), "voice_model.pth")
+    torch.save(model.state_dict(), output_path)
     
     print("Training complete!")
 
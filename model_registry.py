@@ -0,0 +1,387 @@
+"""
+Versioned model registry and zero-downtime model swaps
+
+Model versions live on local disk, one directory per version:
+
+    models/
+      2024-06-01/
+        voice_model.pth
+      2024-06-20-onnx/
+        model.json          {"artifact": "voice_model.onnx", "backend": "onnx"}
+        voice_model.onnx
+
+Without a model.json the directory's single model artifact is used and
+its backend follows from the extension (.pth torch, .pt torchscript,
+.onnx onnx). A model.json must be a JSON object whose "artifact" names a
+file in the version directory; a broken one raises InvalidManifest
+(/admin/models answers 400 with its message).
+
+ModelRouter serves one or more versions, each in its own InferencePool.
+A deploy loads and warms the new pools in the background while the
+current ones keep serving, then replaces the routing table in one
+assignment. Requests that already picked a version finish on it; a
+replaced version's pool is stopped once its last request is done.
+With several versions, traffic is split by percentage; the split is by
+audio hash, so a clip always goes to the same version (and its cached
+prediction).
+
+Configuration (environment variables):
+    MODEL_REGISTRY_DIR  directory of model versions (default models)
+    MODEL_DRAIN_TIMEOUT seconds a replaced version may finish requests (default 60)
+
+Usage:
+    python model_registry.py list
+    python model_registry.py add voice_model.onnx 2024-06-20-onnx --backend onnx
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from inference_pool import InferencePool
+
+MANIFEST = "model.json"
+BACKEND_BY_EXTENSION = {".pth": "torch", ".pt": "torchscript", ".onnx": "onnx"}
+DEFAULT_DRAIN_TIMEOUT = 60.0
+
+
+class InvalidManifest(ValueError):
+    """A version's model.json cannot be read or does not name a usable artifact"""
+
+
+def backend_for(artifact: str, backend: Optional[str] = None) -> str:
+    """The explicit backend, or the one the artifact's extension implies"""
+    # Imported here: inference_backends needs numpy, which the server
+    # only installs alongside a model
+    from inference_backends import BACKENDS
+
+    backend = backend or BACKEND_BY_EXTENSION.get(os.path.splitext(artifact)[1])
+    if backend not in BACKENDS:
+        raise InvalidManifest(f"Unknown backend for '{os.path.basename(artifact)}' "
+                              f"(expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+class ModelVersion:
+    """One servable model: a version name, an artifact path and its backend"""
+
+    def __init__(self, version: str, path: str, backend: Optional[str] = None,
+                 metadata: Optional[dict] = None):
+        self.version = version
+        self.path = path
+        self.backend = backend
+        self.metadata = metadata or {}
+
+    def describe(self) -> dict:
+        return {"version": self.version, "path": self.path, "backend": self.backend, **self.metadata}
+
+
+class ModelRegistry:
+    """
+    Model versions under one directory, plus versions pinned in memory
+    (the MODEL_PATH of a deployment that predates the registry)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._pinned: Dict[str, ModelVersion] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        return cls(os.environ.get("MODEL_REGISTRY_DIR", "models"))
+
+    @staticmethod
+    def _valid_name(version: str) -> bool:
+        return bool(version) and not version.startswith(".") and "/" not in version and "\\" not in version
+
+    def pin(self, model: ModelVersion) -> None:
+        self._pinned[model.version] = model
+
+    def versions(self) -> List[ModelVersion]:
+        found = dict(self._pinned)
+        if os.path.isdir(self.root):
+            for name in sorted(os.listdir(self.root)):
+                if name not in found and os.path.isdir(os.path.join(self.root, name)):
+                    try:
+                        found[name] = self.get(name)
+                    except (LookupError, ValueError):
+                        continue  # not a model version
+        return list(found.values())
+
+    def get(self, version: str) -> ModelVersion:
+        if version in self._pinned:
+            return self._pinned[version]
+        directory = os.path.join(self.root, version)
+        if not self._valid_name(version) or not os.path.isdir(directory):
+            raise LookupError(f"Unknown model version '{version}'")
+
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            return self._from_manifest(version, directory, manifest_path)
+
+        artifacts = [name for name in os.listdir(directory)
+                     if os.path.splitext(name)[1] in BACKEND_BY_EXTENSION]
+        if len(artifacts) != 1:
+            raise ValueError(f"Model version '{version}' needs exactly one artifact or a {MANIFEST}")
+        backend = BACKEND_BY_EXTENSION[os.path.splitext(artifacts[0])[1]]
+        return ModelVersion(version, os.path.join(directory, artifacts[0]), backend)
+
+    @staticmethod
+    def _from_manifest(version: str, directory: str, manifest_path: str) -> ModelVersion:
+        try:
+            with open(manifest_path) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError) as e:
+            raise InvalidManifest(f"Model version '{version}': unreadable {MANIFEST} ({e})")
+        if not isinstance(metadata, dict):
+            raise InvalidManifest(f"Model version '{version}': {MANIFEST} must be a JSON object")
+        artifact = metadata.pop("artifact", None)
+        if not isinstance(artifact, str) or not artifact or os.path.basename(artifact) != artifact \
+                or artifact.startswith("."):
+            raise InvalidManifest(f"Model version '{version}': {MANIFEST} must name its artifact "
+                                  f"file in \"artifact\"")
+        path = os.path.join(directory, artifact)
+        if not os.path.isfile(path):
+            raise InvalidManifest(f"Model version '{version}': artifact '{artifact}' is missing")
+        backend = metadata.pop("backend", None)
+        try:
+            backend = backend_for(artifact, backend if isinstance(backend, str) else None)
+        except InvalidManifest as e:
+            raise InvalidManifest(f"Model version '{version}': {e}")
+        return ModelVersion(version, path, backend, metadata)
+
+    def add(self, artifact: str, version: str, backend: Optional[str] = None) -> ModelVersion:
+        """Copy an artifact into a new version directory (checked before anything is written)"""
+        if not self._valid_name(version):
+            raise ValueError(f"Invalid model version name '{version}'")
+        if not os.path.isfile(artifact):
+            raise ValueError(f"Model artifact not found: {artifact}")
+        name = os.path.basename(artifact)
+        backend = backend_for(name, backend)
+        directory = os.path.join(self.root, version)
+        if os.path.exists(directory):
+            raise ValueError(f"Model version '{version}' already exists")
+
+        os.makedirs(directory)
+        shutil.copy2(artifact, directory)
+        with open(os.path.join(directory, MANIFEST), "w") as f:
+            json.dump({"artifact": name, "backend": backend,
+                       "created": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=2)
+        return self.get(version)
+
+
+class Deployment:
+    """A model version being served by its own InferencePool"""
+
+    def __init__(self, model: ModelVersion, pool: InferencePool):
+        self.model = model
+        self.pool = pool
+        self.in_flight = 0
+        self.served = 0
+        self.timings: Dict[str, float] = {}
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def version(self) -> str:
+        return self.model.version
+
+    async def predict(self, audio: bytes) -> dict:
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await self.pool.predict(audio)
+        finally:
+            self.in_flight -= 1
+            self.served += 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> None:
+        """Wait for in-flight requests (at most ``timeout``), then stop the pool"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        await self.pool.stop()
+
+
+class ModelRouter:
+    """
+    Usage:
+        router = ModelRouter(registry)
+        await router.deploy({"v1": 100})            # load, warm, swap in
+        deployment = router.choose(audio)
+        result = await deployment.predict(audio)   # + deployment.version
+        await router.deploy({"v1": 90, "v2": 10})  # A/B split
+    """
+
+    def __init__(self, registry: ModelRegistry,
+                 pool_factory: Callable[[str, Optional[str]], InferencePool] = InferencePool.from_env,
+                 drain_timeout: float = DEFAULT_DRAIN_TIMEOUT):
+        self.registry = registry
+        self.pool_factory = pool_factory
+        self.drain_timeout = drain_timeout
+        # (deployment, cumulative percentage) pairs; replaced, never mutated
+        self.routes: Tuple[Tuple[Deployment, float], ...] = ()
+        self.swaps = 0
+        self.status: dict = {"state": "idle"}
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    @classmethod
+    def from_env(cls, registry: ModelRegistry) -> "ModelRouter":
+        return cls(registry, drain_timeout=float(os.environ.get("MODEL_DRAIN_TIMEOUT", DEFAULT_DRAIN_TIMEOUT)))
+
+    @property
+    def deployments(self) -> Dict[str, Deployment]:
+        return {deployment.version: deployment for deployment, _ in self.routes}
+
+    def choose(self, audio: bytes) -> Optional[Deployment]:
+        """The deployment that serves ``audio`` (None before the first deploy)"""
+        routes = self.routes  # read once: a swap may replace it meanwhile
+        if len(routes) <= 1:
+            return routes[0][0] if routes else None
+        point = zlib.crc32(audio) % 10000 / 100
+        for deployment, cumulative in routes:
+            if point < cumulative:
+                return deployment
+        return routes[-1][0]
+
+    @property
+    def busy(self) -> bool:
+        """A deploy is loading new versions"""
+        return self._lock.locked()
+
+    def check(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """
+        Validated routes: versions with a positive share, adding up to 100
+
+        Raises ValueError for bad percentages, LookupError for a version
+        the registry does not have.
+        """
+        try:
+            weights = {str(version): float(weight) for version, weight in weights.items()}
+        except (TypeError, ValueError):
+            raise ValueError("Traffic percentages must be numbers")
+        weights = {version: weight for version, weight in weights.items() if weight > 0}
+        if not weights or abs(sum(weights.values()) - 100) > 1e-6:
+            raise ValueError("Traffic percentages must be positive and add up to 100")
+        for version in weights:
+            self.registry.get(version)
+        return weights
+
+    async def deploy(self, weights: Dict[str, float]) -> None:
+        """
+        Serve the given versions with the given traffic percentages
+
+        New versions are loaded and warmed before any traffic moves; if
+        one fails to load, the current routes stay as they are.
+        """
+        weights = self.check(weights)
+        models = {version: self.registry.get(version) for version in weights}
+
+        async with self._lock:
+            current = self.deployments
+            self.status = {"state": "loading", "versions": sorted(set(weights) - set(current)),
+                           "started": time.time()}
+            loaded: List[Deployment] = []
+            try:
+                for version, model in models.items():
+                    if version not in current:
+                        loaded.append(await self._load(model))
+            except Exception as e:
+                for deployment in loaded:
+                    await deployment.pool.stop()
+                self.status = {"state": "failed", "error": str(e), "finished": time.time()}
+                raise
+
+            available = {**current, **{d.version: d for d in loaded}}
+            routes, cumulative = [], 0.0
+            for version, weight in weights.items():
+                cumulative += weight
+                routes.append((available[version], cumulative))
+            self.routes = tuple(routes)
+            self.swaps += 1
+            self.status = {"state": "serving", "routes": weights, "finished": time.time()}
+
+            for version, deployment in current.items():
+                if version not in weights:
+                    task = asyncio.create_task(deployment.drain(self.drain_timeout))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+    def deploy_in_background(self, weights: Dict[str, float]) -> asyncio.Task:
+        """deploy() as a task; its outcome shows up in ``status``"""
+        task = asyncio.create_task(self.deploy(weights))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # outcome is in status
+        return task
+
+    async def _load(self, model: ModelVersion) -> Deployment:
+        deployment = Deployment(model, self.pool_factory(model.path, model.backend))
+        try:
+            started = time.monotonic()
+            await deployment.pool.start()
+            deployment.timings["load_ms"] = round((time.monotonic() - started) * 1000, 1)
+            started = time.monotonic()
+            await deployment.pool.warm_up()
+            deployment.timings["warm_up_ms"] = round((time.monotonic() - started) * 1000, 1)
+        except BaseException:
+            await deployment.pool.stop()
+            raise
+        return deployment
+
+    def stats(self) -> dict:
+        return {
+            "routes": [
+                {"version": deployment.version, "percent": round(cumulative - previous, 3),
+                 "in_flight": deployment.in_flight, "served": deployment.served,
+                 "pool": deployment.pool.stats()}
+                for (deployment, cumulative), previous
+                in zip(self.routes, (0.0,) + tuple(c for _, c in self.routes))
+            ],
+            "swaps": self.swaps,
+            "status": self.status,
+        }
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        for deployment, _ in self.routes:
+            await deployment.pool.stop()
+        self.routes = ()
+
+
+def main():
+    from inference_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description="List or add versioned model artifacts")
+    parser.add_argument("--root", default=os.environ.get("MODEL_REGISTRY_DIR", "models"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="print every version as JSON")
+    add = commands.add_parser("add", help="copy an artifact in as a new version")
+    add.add_argument("artifact")
+    add.add_argument("version")
+    add.add_argument("--backend", choices=BACKENDS)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "add":
+        try:
+            model = registry.add(args.artifact, args.version, args.backend)
+        except ValueError as e:
+            raise SystemExit(f"❌ {e}")
+        print(f"✅ Added {model.version} ({model.backend}) at {model.path}")
+    else:
+        print(json.dumps([model.describe() for model in registry.versions()], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Torch-free MFCC features
+
+A NumPy re-implementation of the torchaudio pipeline in dsp_plans.py:
+polyphase windowed-sinc resampling (torchaudio's sinc_interp_hann
+kernel), centered STFT with a periodic Hann window, HTK mel filterbank,
+power-to-dB with an 80 dB floor and an orthonormal DCT-II. Outputs match
+the torchaudio path within float32 rounding (see test_numpy_features.py),
+so the same trained model works with either.
+
+With the ONNX backend nothing else needs torch, so a slim image without
+torch/torchaudio can serve WAV input (see VoiceDetectionModel).
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dsp_plans import HOP_LENGTH, N_FFT, N_MELS, N_MFCC, TARGET_SAMPLE_RATE, DSPPlanRegistry
+
+TOP_DB = 80.0
+
+
+def resample_kernel(orig_freq: int, new_freq: int, lowpass_filter_width: int = 6,
+                    rolloff: float = 0.99) -> Tuple[np.ndarray, int]:
+    """
+    Polyphase filter bank for orig_freq -> new_freq (already divided by
+    their gcd): one windowed-sinc filter per output phase, shape
+    (new_freq, 2 * width + orig_freq)
+    """
+    base_freq = min(orig_freq, new_freq) * rolloff
+    width = math.ceil(lowpass_filter_width * orig_freq / base_freq)
+    idx = np.arange(-width, width + orig_freq, dtype=np.float64)[np.newaxis] / orig_freq
+    t = (np.arange(0, -new_freq, -1, dtype=np.float32) / np.float32(new_freq))[:, np.newaxis] + idx
+    t = np.clip(t * base_freq, -lowpass_filter_width, lowpass_filter_width)
+    window = np.cos(t * math.pi / lowpass_filter_width / 2) ** 2
+    t *= math.pi
+    with np.errstate(invalid="ignore", divide="ignore"):
+        kernels = np.where(t == 0, 1.0, np.sin(t) / t)
+    return (kernels * window * (base_freq / orig_freq)).astype(np.float32), width
+
+
+def mel_filterbank(n_freqs: int, n_mels: int, sample_rate: int,
+                   f_min: float = 0.0, f_max: float = None) -> np.ndarray:
+    """HTK-scale triangular filters, shape (n_freqs, n_mels), no area normalization"""
+    f_max = f_max if f_max is not None else sample_rate / 2
+    all_freqs = np.linspace(0, sample_rate // 2, n_freqs)
+    to_mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    m_pts = np.linspace(to_mel(f_min), to_mel(f_max), n_mels + 2)
+    f_pts = 700.0 * (10 ** (m_pts / 2595.0) - 1.0)
+    f_diff = f_pts[1:] - f_pts[:-1]
+    slopes = f_pts[np.newaxis, :] - all_freqs[:, np.newaxis]
+    down = -slopes[:, :-2] / f_diff[:-1]
+    up = slopes[:, 2:] / f_diff[1:]
+    return np.maximum(0.0, np.minimum(down, up)).astype(np.float32)
+
+
+def dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    """Orthonormal DCT-II, shape (n_mels, n_mfcc)"""
+    n = np.arange(n_mels, dtype=np.float64)[:, np.newaxis]
+    k = np.arange(n_mfcc, dtype=np.float64)[np.newaxis, :]
+    dct = np.cos(math.pi / n_mels * (n + 0.5) * k)
+    dct[:, 0] *= 1.0 / math.sqrt(2.0)
+    return (dct * math.sqrt(2.0 / n_mels)).astype(np.float32)
+
+
+class NumpyDSPPlan:
+    """Drop-in for dsp_plans.DSPPlan on (channels, frames) float32 arrays"""
+
+    def __init__(self, sample_rate: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH,
+                 n_mels: int = N_MELS, n_mfcc: int = N_MFCC):
+        self.key = (sample_rate, n_fft, hop_length, n_mels, n_mfcc)
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.kernel = None
+        if sample_rate != TARGET_SAMPLE_RATE:
+            gcd = math.gcd(sample_rate, TARGET_SAMPLE_RATE)
+            self.orig_freq, self.new_freq = sample_rate // gcd, TARGET_SAMPLE_RATE // gcd
+            self.kernel, self.width = resample_kernel(self.orig_freq, self.new_freq)
+        # Periodic Hann, as torch.hann_window. Kept float64: NumPy's
+        # float64 FFT is ~2.5x faster than its float32 one
+        self.window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+        self.mel_fb = mel_filterbank(n_fft // 2 + 1, n_mels, TARGET_SAMPLE_RATE)
+        self.dct = dct_matrix(n_mfcc, n_mels)
+
+    def resample(self, waveform: np.ndarray) -> np.ndarray:
+        if self.kernel is None:
+            return waveform
+        length = waveform.shape[-1]
+        pad = [(0, 0)] * (waveform.ndim - 1) + [(self.width, self.width + self.orig_freq)]
+        padded = np.pad(waveform, pad)
+        # Row j of frames is the input window for output block j; each
+        # block holds new_freq outputs, one per filter phase
+        taps = self.kernel.shape[-1]
+        frames = sliding_window_view(padded, taps, axis=-1)[..., ::self.orig_freq, :]
+        resampled = (frames @ self.kernel.T).reshape(*waveform.shape[:-1], -1)
+        return resampled[..., :math.ceil(self.new_freq * length / self.orig_freq)]
+
+    def mel_db(self, waveform: np.ndarray) -> np.ndarray:
+        """(channels, frames) at 16 kHz -> (channels, n_mels, T) in dB"""
+        half = self.n_fft // 2
+        padded = np.pad(waveform, [(0, 0)] * (waveform.ndim - 1) + [(half, half)], mode="reflect")
+        frames = sliding_window_view(padded, self.n_fft, axis=-1)[..., ::self.hop_length, :]
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mel = np.swapaxes(power.astype(np.float32) @ self.mel_fb, -1, -2)
+        db = 10.0 * np.log10(np.maximum(mel, 1e-10))
+        # 80 dB floor below the loudest bin of the clip (all channels)
+        return np.maximum(db, db.max() - TOP_DB)
+
+    def cepstrum(self, mel_db: np.ndarray) -> np.ndarray:
+        """mel_db() output -> (channels, n_mfcc, T)"""
+        return np.swapaxes(np.swapaxes(mel_db, -1, -2) @ self.dct, -1, -2)
+
+    def __call__(self, waveform: np.ndarray) -> np.ndarray:
+        """(channels, frames) at the plan's input rate -> (channels, n_mfcc, T) at 16 kHz"""
+        return self.cepstrum(self.mel_db(self.resample(np.asarray(waveform, dtype=np.float32))))
+
+
+def normalize(mfcc: np.ndarray) -> np.ndarray:
+    """Zero mean, unit (sample) standard deviation, as in VoiceDetectionModel"""
+    return (mfcc - mfcc.mean()) / (mfcc.std(ddof=1) + 1e-8)
+
+
+# Process-wide registry of NumPy plans, shared like dsp_plans.default_registry
+numpy_registry = DSPPlanRegistry(NumpyDSPPlan)
+
+
+def mfcc_features(waveform: np.ndarray, sample_rate: int,
+                  registry: DSPPlanRegistry = numpy_registry) -> np.ndarray:
+    """Normalized (1, N_MFCC, T) features of a (channels, frames) waveform"""
+    if waveform.ndim == 1:
+        waveform = waveform[np.newaxis]
+    if waveform.shape[0] > 1:
+        waveform = waveform.mean(axis=0, keepdims=True)
+    return normalize(registry.get(sample_rate)(waveform))
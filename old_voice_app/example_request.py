@@ -7,8 +7,8 @@ import requests
 import base64
 import json
 import wave
-import struct
-import math
+
+import numpy as np
 
 def create_test_audio():
     """Create a minimal WAV file for testing"""
@@ -17,10 +17,9 @@ def create_test_audio():
     duration = 1
     frequency = 440
     
-    samples = []
-    for i in range(sample_rate * duration):
-        value = int(32767 * 0.3 * math.sin(2 * math.pi * frequency * i / sample_rate))
-        samples.append(value)
+    # Whole buffer at once instead of one struct.pack per sample
+    t = np.arange(sample_rate * duration) / sample_rate
+    samples = (32767 * 0.3 * np.sin(2 * np.pi * frequency * t)).astype("<i2")
     
     # Write to WAV file
     filename = "example_audio.wav"
@@ -28,8 +27,7 @@ def create_test_audio():
         wav_file.setnchannels(1)
         wav_file.setsampwidth(2)
         wav_file.setframerate(sample_rate)
-        for sample in samples:
-            wav_file.writeframes(struct.pack('h', sample))
+        wav_file.writeframes(samples.tobytes())
     
     return filename
 
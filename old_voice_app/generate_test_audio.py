@@ -5,8 +5,8 @@ This creates a simple audio file and outputs the base64 string
 
 import base64
 import wave
-import struct
-import math
+
+import numpy as np
 
 def generate_base64_audio():
     """Generate a simple audio file and return its base64 encoding"""
@@ -21,10 +21,9 @@ def generate_base64_audio():
     frequency = 440
     
     print("\n1. Generating audio samples...")
-    samples = []
-    for i in range(sample_rate * duration):
-        value = int(32767 * 0.3 * math.sin(2 * math.pi * frequency * i / sample_rate))
-        samples.append(value)
+    # Whole buffer at once instead of one struct.pack per sample
+    t = np.arange(sample_rate * duration) / sample_rate
+    samples = (32767 * 0.3 * np.sin(2 * np.pi * frequency * t)).astype("<i2")
     print(f"   ✅ Generated {len(samples)} samples")
     
     # Write to WAV file
@@ -34,8 +33,7 @@ def generate_base64_audio():
         wav_file.setnchannels(1)
         wav_file.setsampwidth(2)
         wav_file.setframerate(sample_rate)
-        for sample in samples:
-            wav_file.writeframes(struct.pack('h', sample))
+        wav_file.writeframes(samples.tobytes())
     print(f"   ✅ Audio file created")
     
     # Read and encode to base64
@@ -0,0 +1,209 @@
+"""
+Content-addressed prediction cache
+
+Testers and monitors send the same clips over and over. Results are
+cached under a hash of the decoded audio plus the model version, in an
+in-process LRU bounded by entry count and bytes, with a TTL. An
+optional SQLite tier (one file per host) lets every uvicorn worker
+share what the others already computed.
+
+Configuration (environment variables):
+    PREDICTION_CACHE_ENTRIES  max in-memory entries (default 1024, 0 disables)
+    PREDICTION_CACHE_BYTES    max in-memory bytes (default 4 MB)
+    PREDICTION_CACHE_TTL      seconds an entry stays valid (default 3600)
+    PREDICTION_CACHE_DB       path of the shared SQLite file (unset: memory only)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_TTL = 3600.0
+
+
+def audio_key(audio: bytes, model_version: str) -> str:
+    """Cache key: BLAKE2b of the decoded audio, salted with the model version"""
+    digest = hashlib.blake2b(memoryview(audio), digest_size=20, person=b"voice-pred")
+    digest.update(model_version.encode())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and total bytes, with a TTL"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, size, expires)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self.bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    Host-wide cache tier shared by all worker processes
+
+    WAL mode lets readers in other workers proceed while one writes.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = 100_000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._connect()
+        if hasattr(os, "register_at_fork"):
+            # A SQLite connection must not be used across fork (launcher.py workers)
+            os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self) -> None:
+        self._conn = sqlite3.connect(self.path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM predictions WHERE key = ? AND expires > ?",
+                    (key, time.time()),
+                ).fetchone()
+        except sqlite3.Error:
+            # A locked or broken shared file must never fail a request
+            return None
+        return row[0] if row else None
+
+    def put(self, key: str, value: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO predictions (key, value, expires) VALUES (?, ?, ?)",
+                    (key, value, time.time() + self.ttl),
+                )
+                self._puts += 1
+                if self._puts % 256 == 0:
+                    self._prune()
+        except sqlite3.Error:
+            pass
+
+    def _prune(self) -> None:
+        self._conn.execute("DELETE FROM predictions WHERE expires <= ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM predictions WHERE key NOT IN "
+            "(SELECT key FROM predictions ORDER BY expires DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class PredictionCache:
+    """
+    Usage:
+        cache = PredictionCache.from_env()
+        result = cache.get(audio, MODEL_VERSION)
+        if result is None:
+            result = {"prediction": ..., "confidence": ...}
+            cache.put(audio, MODEL_VERSION, result)
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteTier] = None):
+        self.memory = memory
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "PredictionCache":
+        ttl = float(os.environ.get("PREDICTION_CACHE_TTL", DEFAULT_TTL))
+        memory = LRUCache(
+            max_entries=int(os.environ.get("PREDICTION_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(os.environ.get("PREDICTION_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+            ttl=ttl,
+        )
+        db_path = os.environ.get("PREDICTION_CACHE_DB")
+        disk = SQLiteTier(db_path, ttl=ttl) if db_path else None
+        return cls(memory, disk)
+
+    def get(self, audio: bytes, model_version: str) -> Optional[Dict[str, Any]]:
+        key = audio_key(audio, model_version)
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return dict(value)
+
+        if self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                value = json.loads(raw)
+                self.memory.put(key, value, len(raw))
+                self.hits += 1
+                self.disk_hits += 1
+                return dict(value)
+
+        self.misses += 1
+        return None
+
+    def put(self, audio: bytes, model_version: str, result: Dict[str, Any]) -> None:
+        key = audio_key(audio, model_version)
+        raw = json.dumps(result)
+        self.memory.put(key, dict(result), len(raw))
+        if self.disk is not None:
+            self.disk.put(key, raw)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes,
+            "disk_tier": self.disk is not None,
+        }
@@ -0,0 +1,206 @@
+"""
+INT8 quantization of VoiceClassifier for CPU-only serving
+
+The conv stack is statically quantized (conv+relu fused, activation
+ranges calibrated on real features); fc1/fc2 are dynamically quantized
+(int8 weights, activation scale picked per batch). The result is saved
+as TorchScript, which VoiceDetectionModel loads with
+INFERENCE_BACKEND=int8.
+
+Usage:
+    python quantize_model.py voice_model.pth --calibration calib.npz
+    python quantize_model.py voice_model.pth --calibration data/ --eval test.npz
+
+Calibration/evaluation data is either an .npz file with a ``features``
+array of shape (N, 1, N_MFCC, INPUT_FRAMES) and optional ``labels``
+(1 = AI, 0 = Human), or a directory of audio files whose parent folder
+name ("ai"/"human") gives the label. A JSON report of accuracy delta,
+model size and per-clip latency against fp32 is printed and written
+next to the artifact.
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import statistics
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.ao.quantization import (
+    DeQuantStub,
+    QuantStub,
+    convert,
+    fuse_modules,
+    get_default_qconfig,
+    prepare,
+    quantize_dynamic,
+)
+
+from classifiers import VoiceClassifier, masked_time_mean, time_mask
+from feature_store import iter_labeled_audio
+from inference_backends import TorchBackend, export_torchscript
+from model_integration import VoiceDetectionModel, crop_or_pad
+
+DEFAULT_ENGINE = "x86" if "x86" in torch.backends.quantized.supported_engines else "fbgemm"
+
+
+class QuantizableVoiceClassifier(nn.Module):
+    """
+    VoiceClassifier with quant/dequant stubs around each conv block and
+    explicit ReLU modules so conv+relu can be fused; the padding mask
+    between the blocks is applied in float
+    """
+
+    def __init__(self, fp32: VoiceClassifier):
+        super().__init__()
+        self.quant = QuantStub()
+        self.conv1 = fp32.conv1
+        self.relu1 = nn.ReLU()
+        self.dequant1 = DeQuantStub()
+        self.quant2 = QuantStub()
+        self.conv2 = fp32.conv2
+        self.relu2 = nn.ReLU()
+        self.pool = fp32.pool
+        self.dequant = DeQuantStub()
+        self.fc1 = fp32.fc1
+        self.fc2 = fp32.fc2
+
+    def forward(self, x, lengths=None):
+        x = self.quant(x)
+        x = self.dequant1(self.pool(self.relu1(self.conv1(x))))
+        if lengths is not None:
+            x = x * time_mask(x, lengths, 2)
+        x = self.quant2(x)
+        x = self.pool(self.relu2(self.conv2(x)))
+        x = self.dequant(x)
+        x = masked_time_mean(x, lengths, 4).flatten(1)
+        x = torch.relu(self.fc1(x))
+        return torch.sigmoid(self.fc2(x))
+
+
+def quantize_classifier(fp32: VoiceClassifier, calibration: np.ndarray,
+                        engine: str = DEFAULT_ENGINE, batch_size: int = 32) -> nn.Module:
+    """Static INT8 convs calibrated on ``calibration`` + dynamic INT8 linears"""
+    torch.backends.quantized.engine = engine
+    model = QuantizableVoiceClassifier(copy.deepcopy(fp32).eval()).eval()
+    fuse_modules(model, [["conv1", "relu1"], ["conv2", "relu2"]], inplace=True)
+
+    model.qconfig = get_default_qconfig(engine)
+    model.fc1.qconfig = None
+    model.fc2.qconfig = None
+    prepare(model, inplace=True)
+
+    with torch.no_grad():
+        for start in range(0, len(calibration), batch_size):
+            model(torch.from_numpy(calibration[start:start + batch_size]))
+    convert(model, inplace=True)
+
+    return quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def load_dataset(source: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Features (N, 1, N_MFCC, INPUT_FRAMES) and labels (or None)"""
+    if source.endswith(".npz"):
+        data = np.load(source)
+        labels = data["labels"].astype(np.float32) if "labels" in data else None
+        return data["features"].astype(np.float32), labels
+
+    detector = VoiceDetectionModel(model_path=None)
+    features, labels = [], []
+    for path, label, _ in iter_labeled_audio(source):
+        with open(path, "rb") as f:
+            mfcc = detector.extract_features(f.read())
+        # Fixed-size windows so calibration/evaluation stacks into one array
+        features.append(np.asarray(crop_or_pad(mfcc)))
+        labels.append(label)
+    if not features:
+        raise SystemExit(f"❌ No audio files found in {source}")
+    has_labels = all(label is not None for label in labels)
+    return np.stack(features), (np.array(labels, dtype=np.float32) if has_labels else None)
+
+
+def model_size_bytes(model: nn.Module) -> int:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def per_clip_latency_ms(model: nn.Module, features: np.ndarray, rounds: int = 200) -> float:
+    clips = [torch.from_numpy(features[i % len(features)][np.newaxis]) for i in range(rounds)]
+    timings = []
+    with torch.no_grad():
+        for clip in clips[:10]:
+            model(clip)
+        for clip in clips:
+            start = time.perf_counter()
+            model(clip)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def build_report(fp32: nn.Module, int8: nn.Module, features: np.ndarray,
+                 labels: Optional[np.ndarray]) -> dict:
+    with torch.no_grad():
+        p32 = TorchBackend(fp32).run(features)
+        p8 = TorchBackend(int8).run(features)
+
+    report = {
+        "clips": int(len(features)),
+        "max_probability_diff": round(float(np.max(np.abs(p32 - p8))), 6),
+        "prediction_agreement": round(float(np.mean((p32 > 0.5) == (p8 > 0.5))), 4),
+        "size_bytes": {"fp32": model_size_bytes(fp32), "int8": model_size_bytes(int8)},
+        "latency_ms_per_clip": {
+            "fp32": round(per_clip_latency_ms(fp32, features), 3),
+            "int8": round(per_clip_latency_ms(int8, features), 3),
+        },
+    }
+    report["size_ratio"] = round(report["size_bytes"]["int8"] / report["size_bytes"]["fp32"], 3)
+    if labels is not None:
+        acc32 = float(np.mean((p32 > 0.5) == (labels > 0.5)))
+        acc8 = float(np.mean((p8 > 0.5) == (labels > 0.5)))
+        report["accuracy"] = {"fp32": round(acc32, 4), "int8": round(acc8, 4),
+                              "delta": round(acc8 - acc32, 4)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8-quantize a VoiceClassifier")
+    parser.add_argument("weights", help="VoiceClassifier state_dict (.pth)")
+    parser.add_argument("--calibration", required=True, help=".npz file or audio directory")
+    parser.add_argument("--eval", help="labeled .npz/audio directory for the report "
+                                       "(defaults to the calibration set)")
+    parser.add_argument("--output", help="quantized TorchScript artifact (default <weights>.int8.pt)")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE,
+                        choices=torch.backends.quantized.supported_engines)
+    args = parser.parse_args()
+
+    fp32 = VoiceClassifier()
+    fp32.load_state_dict(torch.load(args.weights, map_location="cpu"))
+    fp32.eval()
+
+    calibration, calibration_labels = load_dataset(args.calibration)
+    int8 = quantize_classifier(fp32, calibration, engine=args.engine)
+
+    output = args.output or os.path.splitext(args.weights)[0] + ".int8.pt"
+    export_torchscript(int8, output, torch.from_numpy(calibration[:1]))
+
+    if args.eval:
+        features, labels = load_dataset(args.eval)
+    else:
+        features, labels = calibration, calibration_labels
+    report = build_report(fp32, int8, features, labels)
+    report.update({"artifact": output, "engine": args.engine})
+
+    with open(os.path.splitext(output)[0] + ".report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"\n✅ Load it with VoiceDetectionModel({output!r}, backend=\"int8\")")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+JSON serialization shared by the apps
+
+Most honeypot and /predict responses never change, so they are encoded
+once at import time. A StaticJSON holds the body bytes, the ETag and
+the raw header list (Content-Length, Content-Type, ETag and any
+app-specific headers), and answers each request with a
+PrecomputedResponse that does no serialization work at all.
+
+Dynamic responses go through dumps(): orjson when it is installed,
+then msgspec, then the standard library. All three produce the same
+compact UTF-8 JSON as Starlette's JSONResponse.
+
+Usage:
+    HONEYPOT = StaticJSON({"status": "success", ...})
+    return HONEYPOT.response()                 # precomputed bytes + headers
+    return FastJSONResponse({"prediction": p})  # drop-in for JSONResponse
+"""
+
+import hashlib
+import json
+from typing import Any, List, Mapping, Optional, Tuple
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSON = "application/json"
+
+if orjson is not None:
+    ENCODER = "orjson"
+elif msgspec is not None:
+    ENCODER = "msgspec"
+else:
+    ENCODER = "json"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # Same output as Starlette's JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON with the fastest encoder available"""
+    if ENCODER == "orjson":
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass  # e.g. non-str keys: let the standard library have a go
+    elif ENCODER == "msgspec":
+        try:
+            return msgspec.json.encode(obj)
+        except (TypeError, msgspec.EncodeError):
+            pass
+    return _stdlib_dumps(obj)
+
+
+def etag_for(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class StaticJSON:
+    """An invariant JSON payload, encoded once along with its headers"""
+
+    def __init__(self, payload: Any, headers: Optional[Mapping[str, str]] = None):
+        self.payload = payload
+        self.body = dumps(payload)
+        self.etag = etag_for(self.body)
+        # For callers that build their own response (FastResponse)
+        self.headers: Tuple[Tuple[str, str], ...] = (("ETag", self.etag),) + tuple((headers or {}).items())
+        self.raw_headers: List[Tuple[bytes, bytes]] = [
+            (b"content-length", str(len(self.body)).encode()),
+            (b"content-type", JSON.encode()),
+        ] + [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in self.headers]
+
+    def response(self, status_code: int = 200) -> "PrecomputedResponse":
+        return PrecomputedResponse(self, status_code)
+
+
+class PrecomputedResponse(Response):
+    """Sends a StaticJSON as is: no rendering, no header building"""
+
+    media_type = JSON
+
+    def __init__(self, static: StaticJSON, status_code: int = 200):
+        self.status_code = status_code
+        self.background = None
+        self.body = static.body
+        # Copied: middleware (CORS) adds headers to the list it is sent
+        self.raw_headers = list(static.raw_headers)
+
+
+class FastJSONResponse(Response):
+    """JSONResponse that encodes with dumps()"""
+
+    media_type = JSON
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,135 @@
+"""
+Local tests for admission control and load shedding
+Run with: python test_admission.py  (or pytest test_admission.py)
+"""
+
+import asyncio
+import os
+import time
+
+# Many requests share one key: keep its rate limit out of the way
+os.environ.setdefault("API_KEY_BURST", "100000")
+
+from admission import AdmissionControl, Overloaded, RouteClass, admitted
+from asgi_fast_path import call
+
+
+def slow_app(delay: float, upload: float = 0.0):
+    """/predict takes ``upload`` seconds to receive its body, then ``delay`` of work under a slot"""
+    async def app(scope, receive, send):
+        status, headers = 200, []
+        if scope["path"] == "/predict":
+            if upload:
+                await asyncio.sleep(upload)
+            await receive()
+            try:
+                async with admitted(scope):
+                    await asyncio.sleep(delay)
+            except Overloaded as e:
+                status, headers = 503, [(b"retry-after", e.retry_after_header.encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+def guarded(delay: float, concurrency: int, queue: int, budget: float, upload: float = 0.0) -> AdmissionControl:
+    return AdmissionControl(
+        slow_app(delay, upload),
+        classify=lambda scope: "predict" if scope["path"] == "/predict" else None,
+        classes={"predict": RouteClass("predict", concurrency, queue, budget)},
+        cors={"allow_origins": ["*"], "allow_credentials": True},
+    )
+
+
+def test_burst_is_bounded_and_cheap_routes_stay_fast():
+    async def scenario():
+        app = guarded(0.2, concurrency=2, queue=2, budget=5.0)
+        burst = [asyncio.create_task(call(app, "POST", "/predict", [("origin", "https://a.example")]))
+                 for _ in range(10)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        assert (await call(app, "GET", "/"))[0] == 200
+        assert time.monotonic() - started < 0.05  # not stuck behind /predict
+        return await asyncio.gather(*burst), app
+
+    responses, app = asyncio.run(scenario())
+    statuses = [status for status, _, _ in responses]
+    assert statuses.count(200) == 4 and statuses.count(503) == 6
+    shed = next(headers for status, headers, _ in responses if status == 503)
+    assert int(shed["retry-after"]) >= 1
+    assert shed["access-control-allow-origin"] == "https://a.example"
+    stats = app.stats()["predict"]
+    assert stats["admitted"] == 4 and stats["shed"] == 6 and stats["in_flight"] == 0
+
+
+def test_latency_budget_sheds_before_and_while_waiting():
+    async def scenario():
+        app = guarded(0.2, concurrency=1, queue=10, budget=0.3)
+        route = app.classes["predict"]
+        await call(app, "POST", "/predict")  # learn the service time
+        route.service_time = 0.2
+        tasks = [asyncio.create_task(call(app, "POST", "/predict")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # One running, one waiting (expected 0.2s); a third would expect 0.4s > budget
+        statuses = [status for status, _, _ in await asyncio.gather(*tasks)]
+        assert statuses == [200, 200, 503], statuses
+
+        # A waiter whose turn does not come within the budget gives up
+        route.service_time = 0.0
+        slow = guarded(1.0, concurrency=1, queue=10, budget=0.3)
+        running = asyncio.create_task(call(slow, "POST", "/predict"))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        assert (await call(slow, "POST", "/predict"))[0] == 503
+        assert 0.25 < time.monotonic() - started < 0.6
+        assert (await running)[0] == 200
+        assert slow.classes["predict"].stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_uploads_hold_no_slot():
+    async def scenario():
+        # Eight slowloris uploads against a single slot
+        slow = guarded(0.02, concurrency=1, queue=0, budget=5.0, upload=0.5)
+        uploads = [asyncio.create_task(call(slow, "POST", "/predict")) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        route = slow.classes["predict"]
+        assert route.in_flight == 0 and route.would_shed() is None
+        statuses = [status for status, _, _ in await asyncio.gather(*uploads)]
+        return statuses, route.service_time
+
+    statuses, service_time = asyncio.run(scenario())
+    # They arrive together, so some are shed once they want the slot
+    # (after their upload, not before), and upload time is not service time
+    assert 200 in statuses and set(statuses) <= {200, 503}
+    assert service_time < 0.1
+
+
+def test_app_sheds_only_predict_posts():
+    import app as service
+
+    route = service.admission.classes["predict"]
+    saved = route.concurrency, route.queue
+    # Saturated: one slot, taken, and no queue
+    route.concurrency, route.queue, route.in_flight = 1, 0, 1
+    try:
+        async def run():
+            guvi = [("x-api-key", "guvi123")]
+            return {(method, path): (await call(service.app, method, path, guvi))[0]
+                    for method, path in (("POST", "/predict"), ("POST", "/Predict/"), ("GET", "/predict"),
+                                         ("OPTIONS", "/predict"), ("POST", "/honeypot"), ("GET", "/"))}
+        statuses = asyncio.run(run())
+    finally:
+        (route.concurrency, route.queue), route.in_flight = saved, 0
+    assert statuses.pop(("POST", "/predict")) == 503
+    assert statuses.pop(("POST", "/Predict/")) == 503
+    assert set(statuses.values()) == {200}, statuses
+
+
+if __name__ == "__main__":
+    test_burst_is_bounded_and_cheap_routes_stay_fast()
+    test_latency_budget_sheds_before_and_while_waiting()
+    test_slow_uploads_hold_no_slot()
+    test_app_sheds_only_predict_posts()
+    print("✅ Admission control tests passed")
@@ -7,8 +7,8 @@ import requests
 import base64
 import json
 import wave
-import struct
 import math
+from array import array
 
 def generate_sample_audio(filename="test_audio.wav", duration=2, frequency=440):
     """
@@ -17,21 +17,17 @@ def generate_sample_audio(filename="test_audio.wav", duration=2, frequency=440):
     """
     sample_rate = 44100
     num_samples = duration * sample_rate
-    
-    # Generate sine wave
-    samples = []
-    for i in range(num_samples):
-        value = int(32767 * math.sin(2 * math.pi * frequency * i / sample_rate))
-        samples.append(value)
-    
-    # Write to WAV file
+
+    # Generate sine wave (16-bit, native byte order like struct.pack('h'))
+    step = 2 * math.pi * frequency / sample_rate
+    samples = array('h', (int(32767 * math.sin(step * i)) for i in range(num_samples)))
+
+    # Write to WAV file, whole buffer at once (see synthetic_audio.py for larger corpora)
     with wave.open(filename, 'w') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 2 bytes per sample
         wav_file.setframerate(sample_rate)
-        
-        for sample in samples:
-            wav_file.writeframes(struct.pack('h', sample))
+        wav_file.writeframes(samples.tobytes())
     
     print(f"✅ Generated test audio file: {filename}")
     return filename
@@ -0,0 +1,175 @@
+"""
+Local tests for the hashed API key store and per-key rate limits
+Run with: python test_api_keys.py  (or pytest test_api_keys.py)
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+# Other test modules share app.py's key: keep its rate limit out of the way
+os.environ.setdefault("API_KEY_BURST", "100000")
+
+from api_keys import ApiKey, ApiKeyStore, TokenBucket, hash_key
+
+
+def store_with(**keys) -> ApiKeyStore:
+    return ApiKeyStore([ApiKey(name, hash_key(key, iterations=1000), rate=0.5, burst=2)
+                        for name, key in keys.items()])
+
+
+def test_hashed_keys_are_verified_and_cached():
+    store = store_with(tester="guvi123", monitor="m0n1tor")
+    assert "guvi123" not in repr(vars(store.keys["tester"]))
+    assert store.check("guvi123") == (200, "tester", 0.0)
+    assert store.check("m0n1tor").key == "monitor"
+    for wrong in ("GUVI123", "guvi1234", "guvi", "", None):
+        assert store.check(wrong).status == 401, wrong
+    store.check("guvi123")
+    store.check("GUVI123")
+    stats = store.stats()
+    # Positive and negative lookups are both answered from the cache
+    assert stats["cache_hits"] == 2 and stats["cache_misses"] == 5
+
+
+def test_keys_load_from_env_and_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keys.json")
+        with open(path, "w") as f:
+            json.dump({"partner": {"hash": hash_key("p4rtner", 1000), "rate": 1, "burst": 1}}, f)
+        os.environ.update(API_KEY_HASHES=f"tester={hash_key('guvi123', 1000)}", API_KEYS_FILE=path)
+        try:
+            store = ApiKeyStore.from_env()
+        finally:
+            del os.environ["API_KEY_HASHES"], os.environ["API_KEYS_FILE"]
+    assert sorted(store.keys) == ["partner", "tester"]
+    assert store.check("p4rtner").status == 200
+    assert store.check("p4rtner").status == 429  # burst of 1
+    assert store.check("guvi123").status == 200
+    assert ApiKeyStore.from_env().check("guvi123").status == 200  # default key
+
+
+def test_token_bucket_and_per_key_limits():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.take() == 0 and bucket.take() == 0
+    wait = bucket.take()
+    assert 0 < wait <= 0.1
+    time.sleep(wait + 0.01)
+    assert bucket.take() == 0
+
+    store = store_with(abuser="abuse", tester="guvi123")
+    for _ in range(2):
+        assert store.check("abuse").status == 200
+    limited = store.check("abuse")
+    assert limited.status == 429 and limited.key == "abuser" and limited.retry_after_header == "2"
+    # One abusive key does not use up anyone else's quota
+    assert store.check("guvi123").status == 200
+
+
+def test_random_wrong_keys_cannot_force_unbounded_hashing():
+    store = ApiKeyStore([ApiKey("tester", hash_key("guvi123", 1000))], failure_rate=3)
+    statuses = [store.check(os.urandom(8).hex()).status for _ in range(20)]
+    assert statuses.count(401) == 3 and statuses.count(429) == 17
+    assert store.stats()["cache_misses"] == 3
+
+
+def test_a_flood_of_wrong_keys_locks_nobody_else_out():
+    store = ApiKeyStore([ApiKey("tester", hash_key("guvi123", 1000))], failure_rate=2, cache_ttl=0.05)
+    assert store.check("guvi123", "10.0.0.1").status == 200
+    for _ in range(50):
+        store.check(os.urandom(8).hex(), "10.0.0.66")
+    assert store.check(os.urandom(8).hex(), "10.0.0.66").status == 429
+    time.sleep(0.1)  # past the cache TTL
+    # The verified key is remembered: no hashing, no failure budget
+    assert store.check("guvi123", "10.0.0.66").status == 200
+    assert store.check("guvi123", "10.0.0.1").status == 200
+    # Other clients keep their own hashing budget
+    assert store.check("wrong", "10.0.0.2").status == 401
+
+
+def test_check_async_hashes_off_the_event_loop():
+    store = ApiKeyStore([ApiKey("tester", hash_key("guvi123", 400_000))])
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        check = await store.check_async("guvi123", "127.0.0.1")
+        task.cancel()
+        return check, ticks
+
+    check, ticks = asyncio.run(run())
+    assert check.status == 200
+    # The loop kept running while PBKDF2 worked in a thread
+    assert ticks >= 3
+
+
+def test_over_quota_requests_are_rejected_before_the_body_is_read():
+    import app as service
+
+    store = store_with(tester="guvi123")
+    original, service.api_keys = service.api_keys, store
+    read = []
+
+    async def send_request():
+        scope = {"type": "http", "method": "POST", "path": "/predict", "raw_path": b"/predict",
+                 "query_string": b"", "root_path": "", "http_version": "1.1", "scheme": "http",
+                 "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+                 "headers": [(b"x-api-key", b"guvi123"), (b"content-length", b"2")]}
+        sent = []
+
+        async def receive():
+            read.append(True)
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await service.fast_app(scope, receive, send)
+        return sent[0]
+
+    async def run():
+        return [await send_request() for _ in range(3)]
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        service.api_keys = original
+    assert [r["status"] for r in responses] == [200, 200, 429]
+    assert (b"retry-after", b"2") in responses[2]["headers"]
+    assert len(read) == 2  # only the two admitted requests touched the body
+
+
+def test_legacy_substring_match_is_opt_in():
+    assert store_with(tester="guvi123").check("GUVI-test").status == 401
+
+    os.environ["API_KEY_LEGACY_MATCH"] = "guvi"
+    try:
+        store = ApiKeyStore.from_env()
+    finally:
+        del os.environ["API_KEY_LEGACY_MATCH"]
+    for key in ("guvi123", "GUVI-test", "guvi_2024", "my-Guvi-key"):
+        assert store.check(key) == (200, "legacy", 0.0)
+    assert store.check("nope").status == 401
+    assert store.misses == 1  # only "nope" was hashed
+
+
+if __name__ == "__main__":
+    test_hashed_keys_are_verified_and_cached()
+    test_keys_load_from_env_and_file()
+    test_token_bucket_and_per_key_limits()
+    test_random_wrong_keys_cannot_force_unbounded_hashing()
+    test_a_flood_of_wrong_keys_locks_nobody_else_out()
+    test_check_async_hashes_off_the_event_loop()
+    test_over_quota_requests_are_rejected_before_the_body_is_read()
+    test_legacy_substring_match_is_opt_in()
+    print("✅ API key store tests passed")
@@ -0,0 +1,96 @@
+"""
+Local test: the raw ASGI fast path answers exactly like the FastAPI app
+Run with: python test_asgi_fast_path.py  (or pytest test_asgi_fast_path.py)
+"""
+
+import asyncio
+import base64
+import json
+import os
+
+# Many requests share one key: keep its rate limit out of the way
+os.environ.setdefault("API_KEY_BURST", "100000")
+
+import app as service  # noqa: E402
+from asgi_fast_path import call
+from synthetic_audio import to_wav_bytes, tone
+
+WAV = to_wav_bytes(tone(220, 0.5, 16000), 16000)
+PREDICT_BODY = json.dumps({"language": "ta", "audio_format": "wav",
+                           "audio_base64": base64.b64encode(WAV).decode()}).encode()
+GUVI = ("x-api-key", "guvi123")
+ORIGIN = ("origin", "https://tester.example")
+PREFLIGHT = (ORIGIN, ("access-control-request-method", "POST"),
+             ("access-control-request-headers", "x-api-key, content-type"))
+
+CASES = [
+    ("GET", "/honeypot", ()),
+    ("POST", "/honeypot", (GUVI,)),
+    ("HEAD", "/honeypot", (GUVI,)),
+    ("PATCH", "/honeypot", (("x-api-key", "wrong"),)),
+    ("OPTIONS", "/honeypot", ()),
+    ("OPTIONS", "/honeypot", PREFLIGHT),
+    ("GET", "/", (ORIGIN,)),
+    ("POST", "/", (GUVI, ORIGIN)),
+    ("GET", "/HoneyPot/", (GUVI,)),
+    ("POST", "/predict", ()),
+    ("POST", "/predict", (GUVI, ("content-type", "application/json")), PREDICT_BODY),
+    ("POST", "/predict", (GUVI, ORIGIN), b"{not json"),
+    ("GET", "/predict", (GUVI,)),
+    ("OPTIONS", "/predict", PREFLIGHT),
+    ("PUT", "/predict", (GUVI,)),
+    ("POST", "/Predict/", (GUVI,), PREDICT_BODY),
+    ("GET", "/some/unknown/path", (ORIGIN,)),
+    ("DELETE", "/unknown", ()),
+    ("POST", "/ready", ()),
+    ("GET", "/ready", ()),
+    ("GET", "/stats", ()),
+    ("GET", "/admin/models", ()),
+]
+
+
+def test_fast_path_matches_fastapi():
+    fastapi_app = service.fastapi_app
+
+    async def run():
+        for method, path, headers, *body in CASES:
+            body = body[0] if body else b""
+            reference = await call(fastapi_app, method, path, headers, body)
+            fast = await call(service.fast_app, method, path, headers, body)
+            case = f"{method} {path} {headers}"
+            assert fast[0] == reference[0], case
+            assert fast[2] == reference[2], case
+            for name in ("content-type", "content-length", "x-model-version", "vary",
+                         "access-control-allow-origin", "access-control-allow-credentials",
+                         "access-control-allow-methods", "access-control-allow-headers"):
+                assert fast[1].get(name) == reference[1].get(name), (case, name)
+
+    asyncio.run(run())
+
+
+def test_fast_path_serves_hot_routes_itself():
+    served = []
+    fastapi_app = service.fastapi_app
+
+    async def spy(scope, receive, send):
+        served.append(scope["path"])
+        await fastapi_app(scope, receive, send)
+
+    fast_app = service.FastPathApp(spy, dict(service.fast_app.routes),
+                                   catch_all=service.fast_app.catch_all, cors=service.CORS_OPTIONS)
+    # The spy has no routes of its own: use the real app's table
+    fast_app._table = service.fast_app._build_table()
+
+    async def run():
+        for path in ("/honeypot", "/predict", "/", "/anything"):
+            await call(fast_app, "POST", path, (GUVI,))
+        await call(fast_app, "GET", "/ready")
+
+    asyncio.run(run())
+    assert served == ["/ready"]
+
+
+if __name__ == "__main__":
+    test_fast_path_matches_fastapi()
+    test_fast_path_serves_hot_routes_itself()
+    print("✅ ASGI fast path matches the FastAPI app")
@@ -0,0 +1,80 @@
+"""
+Local tests for the streaming /predict audio decoder
+Run with: python test_audio_stream.py  (or pytest test_audio_stream.py)
+"""
+
+import base64
+import json
+import os
+
+from audio_stream import AudioPayloadError, StreamingAudioDecoder
+
+
+def decode_in_chunks(body: bytes, chunk_size: int):
+    decoder = StreamingAudioDecoder()
+    for i in range(0, len(body), chunk_size):
+        decoder.feed(body[i:i + chunk_size])
+    return decoder.close()
+
+
+def test_decodes_audio_across_chunk_boundaries():
+    audio = os.urandom(10_001)
+    body = json.dumps({
+        "language": "ta",
+        "audioFormat": "mp3",
+        "audioBase64": base64.b64encode(audio).decode(),
+        "meta": {"nested": [1, 2, {"x": "}"}]},
+    }).encode()
+    for chunk_size in (1, 3, 7, 64, 4096, len(body)):
+        decoded, fields = decode_in_chunks(body, chunk_size)
+        assert bytes(decoded) == audio
+        assert fields["language"] == "ta"
+        assert fields["audioFormat"] == "mp3"
+        assert fields["meta"] == {"nested": [1, 2, {"x": "}"}]}
+
+
+def test_escaped_slashes_and_missing_padding():
+    audio = bytes(range(256))
+    encoded = base64.b64encode(audio).decode().rstrip("=").replace("/", "\\/")
+    body = ('{"audio_base64": "' + encoded + '", "n": 5}').encode()
+    decoded, fields = decode_in_chunks(body, 5)
+    assert bytes(decoded) == audio
+    assert fields == {"n": 5}
+
+
+def test_rejects_non_object_and_truncated_bodies():
+    for body in (b"", b"[1, 2]", b'{"audio_base64": "AAAA', b"{'invalid': json}"):
+        try:
+            decode_in_chunks(body, 4)
+        except AudioPayloadError:
+            continue
+        raise AssertionError(f"accepted {body!r}")
+
+
+def test_rejects_characters_outside_base64():
+    encoded = base64.b64encode(os.urandom(300)).decode()
+    for bad in (encoded[:10] + "!" + encoded[10:],
+                encoded[:10] + "\\u00e9" + encoded[10:],
+                encoded[:10] + "\\\\" + encoded[10:],
+                "QUJD" + "RA==" + encoded):
+        body = ('{"audio_base64": "' + bad + '"}').encode()
+        for chunk_size in (3, len(body)):
+            try:
+                decode_in_chunks(body, chunk_size)
+            except AudioPayloadError:
+                continue
+            raise AssertionError(f"accepted {bad[:20]!r} in chunks of {chunk_size}")
+
+    # Whitespace and the URL-safe alphabet are still fine
+    audio = os.urandom(300)
+    wrapped = "\\n".join(base64.urlsafe_b64encode(audio).decode()[i:i + 76] for i in range(0, 400, 76))
+    decoded, _ = decode_in_chunks(('{"audio_base64": "' + wrapped + '"}').encode(), 7)
+    assert bytes(decoded) == audio
+
+
+if __name__ == "__main__":
+    test_decodes_audio_across_chunk_boundaries()
+    test_escaped_slashes_and_missing_padding()
+    test_rejects_non_object_and_truncated_bodies()
+    test_rejects_characters_outside_base64()
+    print("✅ All streaming decoder tests passed")
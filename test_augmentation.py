@@ -0,0 +1,98 @@
+"""
+Local tests for the parallel augmentation pipeline
+Run with: python test_augmentation.py  (or pytest test_augmentation.py)
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import augmentation
+from augmentation import (
+    AugmentationConfig,
+    AugmentationEngine,
+    augment,
+    pitch_shift,
+    sample_rng,
+    time_stretch,
+)
+from feature_store import FeatureStore, iter_labeled_audio
+from model_integration import N_MFCC, VoiceDetectionModel
+from test_feature_store import make_audio_tree
+
+ALWAYS = AugmentationConfig(p_pitch=1.0, p_stretch=1.0, p_gain=1.0, p_noise=1.0)
+
+
+def tone(frequency: float = 440.0, seconds: float = 1.0, sample_rate: int = 16000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def peak_frequency(x: np.ndarray, sample_rate: int = 16000) -> float:
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(len(x))))
+    return float(np.argmax(spectrum) * sample_rate / len(x))
+
+
+def test_transforms_change_what_they_should():
+    x = tone(440.0)
+    stretched = time_stretch(x, 1.25)
+    assert abs(len(stretched) - len(x) / 1.25) <= 1
+    assert abs(peak_frequency(stretched) - 440.0) < 15
+
+    shifted = pitch_shift(x, 12.0)
+    assert len(shifted) == len(x)
+    assert abs(peak_frequency(shifted) - 880.0) < 20
+
+
+def test_seeding_is_per_sample():
+    x = tone()
+    a, applied_a = augment(x, sample_rng(7, 0, 3), ALWAYS)
+    b, applied_b = augment(x, sample_rng(7, 0, 3), ALWAYS)
+    assert np.array_equal(a, b) and applied_a == applied_b
+    c, _ = augment(x, sample_rng(7, 1, 3), ALWAYS)
+    assert not np.array_equal(a, c)
+
+
+def test_engine_output_does_not_depend_on_worker_count():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root = os.path.join(tmp, "data")
+        make_audio_tree(audio_root)
+
+        stores = []
+        for workers, chunk_size in ((1, 8), (2, 1)):
+            out_dir = os.path.join(tmp, f"aug-{workers}")
+            engine = AugmentationEngine(workers=workers, seed=3, config=ALWAYS, chunk_size=chunk_size)
+            stats = engine.augment_to_feature_store(audio_root, out_dir, copies=2, epoch=1)
+            assert stats["augmented_clips"] == 12
+            assert stats["augmentations_per_second_per_core"] > 0
+            stores.append(FeatureStore(out_dir))
+
+        first, second = stores
+        for i in range(len(first)):
+            assert np.array_equal(first.features(i), second.features(i))
+            assert first.metadata(i) == second.metadata(i)
+        assert first.metadata(0)["augmentation"].keys() == {"pitch_semitones", "stretch_rate", "gain_db", "snr_db"}
+
+
+def test_chunks_featurize_with_either_pipeline():
+    with tempfile.TemporaryDirectory() as tmp:
+        make_audio_tree(tmp)
+        tasks = [(i, path, label, metadata) for i, (path, label, metadata) in enumerate(iter_labeled_audio(tmp))]
+        outputs = {}
+        for pipeline in ("torch", "numpy"):
+            augmentation._detector = VoiceDetectionModel(model_path=None, features=pipeline)
+            outputs[pipeline] = augmentation._augment_chunk(tasks[:2], seed=0, epoch=0, copies=1, config=ALWAYS)
+        augmentation._detector = None
+
+    for (_, _, torch_features, *_), (_, _, numpy_features, *_) in zip(outputs["torch"], outputs["numpy"]):
+        assert isinstance(numpy_features, np.ndarray) and numpy_features.shape[-2] == N_MFCC
+        assert numpy_features.shape == torch_features.shape
+
+
+if __name__ == "__main__":
+    test_transforms_change_what_they_should()
+    test_seeding_is_per_sample()
+    test_engine_output_does_not_depend_on_worker_count()
+    test_chunks_featurize_with_either_pipeline()
+    print("✅ All augmentation tests passed")
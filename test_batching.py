@@ -0,0 +1,80 @@
+"""
+Local tests for the micro-batching scheduler (no torch needed)
+Run with: python test_batching.py  (or pytest test_batching.py)
+"""
+
+import asyncio
+
+from batching import MicroBatchScheduler
+
+
+class EchoModel:
+    """Stands in for VoiceDetectionModel: echoes each clip back"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_features_batch(self, features):
+        self.batch_sizes.append(len(features))
+        return [("AI", f) for f in features]
+
+
+def test_each_caller_gets_its_own_result():
+    async def run():
+        model = EchoModel()
+        scheduler = MicroBatchScheduler(model, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(scheduler.predict(i) for i in range(10)))
+        await scheduler.stop()
+        return model, results
+
+    model, results = asyncio.run(run())
+    assert results == [("AI", i) for i in range(10)]
+    assert max(model.batch_sizes) <= 4
+    assert sum(model.batch_sizes) == 10
+
+
+def test_lone_request_is_released_by_the_deadline():
+    async def run():
+        scheduler = MicroBatchScheduler(EchoModel(), max_batch_size=64, max_wait_ms=20)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await scheduler.predict("clip")
+        elapsed = loop.time() - start
+        await scheduler.stop()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+    assert result == ("AI", "clip")
+    assert elapsed < 1.0
+
+
+def test_run_batch_runs_batches_concurrently_and_fails_items_alone():
+    async def run():
+        running, peak, sizes = 0, 0, []
+
+        async def run_batch(items):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            sizes.append(len(items))
+            await asyncio.sleep(0.05)
+            running -= 1
+            return [ValueError(i) if i == 3 else i * 2 for i in items]
+
+        scheduler = MicroBatchScheduler(run_batch=run_batch, max_batch_size=2, max_wait_ms=5,
+                                        max_concurrent_batches=2)
+        results = await asyncio.gather(*(scheduler.predict(i) for i in range(8)), return_exceptions=True)
+        await scheduler.stop()
+        return results, peak, sizes
+
+    results, peak, sizes = asyncio.run(run())
+    assert [r for i, r in enumerate(results) if i != 3] == [i * 2 for i in range(8) if i != 3]
+    assert isinstance(results[3], ValueError)
+    assert peak == 2 and max(sizes) == 2 and sum(sizes) == 8
+
+
+if __name__ == "__main__":
+    test_each_caller_gets_its_own_result()
+    test_lone_request_is_released_by_the_deadline()
+    test_run_batch_runs_batches_concurrently_and_fails_items_alone()
+    print("✅ All batching tests passed")
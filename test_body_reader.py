@@ -0,0 +1,144 @@
+"""
+Local tests for the bounded, time-limited body reader
+Run with: python test_body_reader.py  (or pytest test_body_reader.py)
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+
+# Many requests share one key: keep its rate limit out of the way
+os.environ.setdefault("API_KEY_BURST", "100000")
+
+import body_reader
+from body_reader import BodyLimits, BodyTooLarge, BoundedBody
+
+LIMITS = BodyLimits(max_bytes=100, idle_timeout=0.2, deadline=0.5)
+
+
+class FakeRequest:
+    """Sends ``chunks`` (bytes, or a float to pause for that long)"""
+
+    def __init__(self, chunks, content_length=None):
+        self.headers = {"content-length": str(content_length)} if content_length is not None else {}
+        self.chunks = list(chunks)
+        self.received = 0
+
+    async def receive(self):
+        while self.chunks and isinstance(self.chunks[0], float):
+            await asyncio.sleep(self.chunks.pop(0))
+        if not self.chunks:
+            await asyncio.sleep(3600)  # a client that never finishes
+        self.received += 1
+        chunk = self.chunks.pop(0)
+        if chunk is None:
+            return {"type": "http.disconnect"}
+        return {"type": "http.request", "body": chunk, "more_body": bool(self.chunks)}
+
+
+def read(request, limits=LIMITS):
+    body = BoundedBody(request, limits)
+    return asyncio.run(body.read()), body.truncated
+
+
+def test_reads_complete_bodies():
+    assert read(FakeRequest([b"ab", b"cd", b"ef"])) == (b"abcdef", None)
+    assert read(FakeRequest([b""])) == (b"", None)
+
+
+def test_oversized_bodies_fail_early():
+    request = FakeRequest([b"x" * 10], content_length=101)
+    try:
+        read(request)
+        assert False, "expected BodyTooLarge"
+    except BodyTooLarge:
+        assert request.received == 0  # nothing was read
+
+    request = FakeRequest([b"x" * 60, b"x" * 60, b"x" * 60])
+    try:
+        read(request)
+        assert False, "expected BodyTooLarge"
+    except BodyTooLarge:
+        assert request.received == 2  # stopped at the chunk that went over
+
+
+def test_slow_clients_are_cut_off_with_partial_content():
+    started = time.monotonic()
+    assert read(FakeRequest([b"abc", 1.0, b"never"])) == (b"abc", "idle")
+    assert time.monotonic() - started < 0.4
+
+    # Each chunk within the idle timeout, but the whole body too slow
+    started = time.monotonic()
+    data, truncated = read(FakeRequest([b"a", 0.15, b"b", 0.15, b"c", 0.15, b"d", 0.15, b"e"]))
+    assert truncated == "deadline" and data == b"abcd"
+    assert time.monotonic() - started < 0.6
+
+    assert read(FakeRequest([b"abc", None])) == (b"abc", "disconnect")
+
+
+def test_predict_answers_413_and_stays_lenient_on_slow_bodies():
+    import app as service
+    from audio_stream import AudioPayloadError, decode_request_audio
+
+    try:
+        asyncio.run(decode_request_audio(FakeRequest([b'{"language": "en"', 1.0]), LIMITS))
+        assert False, "expected AudioPayloadError"
+    except AudioPayloadError as e:
+        assert "idle" in str(e)
+
+    async def post(chunks, content_length):
+        request = FakeRequest(chunks)
+        scope = {"type": "http", "method": "POST", "path": "/predict", "raw_path": b"/predict",
+                 "query_string": b"", "root_path": "", "http_version": "1.1", "scheme": "http",
+                 "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+                 "headers": [(b"x-api-key", b"guvi123"), (b"content-length", str(content_length).encode())]}
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await service.app(scope, request.receive, send)
+        return sent[0]["status"], request.received, sent[1]["body"]
+
+    saved = body_reader.default_limits
+    body_reader.default_limits = LIMITS
+    try:
+        assert asyncio.run(post([b"{}"], 10 ** 9))[:2] == (413, 0)
+        assert asyncio.run(post([b'{"audio_base64": "' + b"A" * 200, b'"}'], 0))[0] == 413
+        started = time.monotonic()
+        assert asyncio.run(post([b'{"language": "en"', 5.0, b"}"], 18))[0] == 200
+        assert time.monotonic() - started < 0.6
+
+        # Audio cut short by the deadline is still scored, and flagged
+        status, _, body = asyncio.run(post([b'{"language": "ta", "audio_base64": "AAAA', 1.0], 80))
+        assert status == 200 and json.loads(body)["truncated"] == "idle"
+    finally:
+        body_reader.default_limits = saved
+
+
+def test_truncated_audio_is_returned_in_part():
+    from audio_stream import decode_request_audio
+
+    audio = bytes(range(256)) * 4
+    encoded = base64.b64encode(audio)
+    limits = BodyLimits(max_bytes=10_000, idle_timeout=0.2, deadline=0.5)
+    # The stall comes mid-group: only complete 4-char groups are decoded
+    head = b'{"language": "ta", "audio_base64": "' + encoded[:603]
+    result = asyncio.run(decode_request_audio(FakeRequest([head, 1.0, encoded[603:] + b'"}']), limits))
+    assert result.truncated == "idle"
+    assert result.audio == audio[:450] and result.fields == {"language": "ta"}
+
+    complete = asyncio.run(decode_request_audio(
+        FakeRequest([b'{"audio_base64": "' + encoded + b'"}']), limits))
+    assert complete == (audio, {}, None)
+
+
+if __name__ == "__main__":
+    test_reads_complete_bodies()
+    test_oversized_bodies_fail_early()
+    test_slow_clients_are_cut_off_with_partial_content()
+    test_predict_answers_413_and_stays_lenient_on_slow_bodies()
+    test_truncated_audio_is_returned_in_part()
+    print("✅ Body reader tests passed")
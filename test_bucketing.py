@@ -0,0 +1,64 @@
+"""
+Local tests for variable-length input and duration-bucketed batching
+Run with: python test_bucketing.py  (or pytest test_bucketing.py)
+"""
+
+import numpy as np
+import torch
+
+from bucketing import BucketBatchSampler, length_groups, pad_batch
+from inference_backends import TorchBackend
+from model_integration import N_MFCC, VoiceClassifier, VoiceDetectionModel
+
+
+def test_padding_does_not_change_any_clip_score():
+    torch.manual_seed(0)
+    model = VoiceClassifier().eval()
+    features = [torch.randn(1, N_MFCC, frames) for frames in (4, 13, 40, 97)]
+    batch, lengths = pad_batch(features)
+    assert batch.shape == (4, 1, N_MFCC, 97)
+
+    with torch.no_grad():
+        padded = model(batch, lengths).reshape(-1)
+        alone = torch.cat([model(f[None]).reshape(-1) for f in features])
+    assert torch.allclose(padded, alone, atol=1e-6)
+
+
+def test_detector_scores_clips_of_any_length_in_input_order():
+    torch.manual_seed(0)
+    detector = VoiceDetectionModel(model_path=None)
+    detector.backend = TorchBackend(VoiceClassifier())
+    features = [torch.randn(1, N_MFCC, frames) for frames in (90, 8, 40, 88, 2)]
+    batched = detector.probabilities(features)
+    assert batched == [detector.probabilities([f])[0] for f in features]
+
+
+def test_bucket_sampler_covers_every_clip_and_cuts_padding():
+    lengths = np.random.default_rng(0).integers(20, 600, size=1000)
+    sampler = BucketBatchSampler(lengths, batch_size=16, pool_batches=20, seed=1)
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+    unsorted = BucketBatchSampler(lengths, batch_size=16, pool_batches=1, seed=1)
+    assert sampler.padding_overhead() < unsorted.padding_overhead() / 5
+
+    sampler.set_epoch(1)
+    assert list(sampler) != batches
+
+
+def test_length_groups_bound_padding():
+    lengths = [10, 300, 12, 290, 11, 100]
+    groups = length_groups(lengths, max_batch_size=2)
+    assert sorted(i for group in groups for i in group) == list(range(len(lengths)))
+    for group in groups:
+        assert len(group) <= 2
+        assert min(lengths[i] for i in group) >= 0.75 * max(lengths[i] for i in group)
+
+
+if __name__ == "__main__":
+    test_padding_does_not_change_any_clip_score()
+    test_detector_scores_clips_of_any_length_in_input_order()
+    test_bucket_sampler_covers_every_clip_and_cuts_padding()
+    test_length_groups_bound_padding()
+    print("✅ All bucketing tests passed")
@@ -0,0 +1,48 @@
+"""
+Local tests for the batched evaluation harness
+Run with: python test_evaluate_model.py  (or pytest test_evaluate_model.py)
+"""
+
+import os
+import tempfile
+
+from evaluate_model import check_gates, classification_report, evaluate
+from feature_store import build_feature_store
+from model_integration import VoiceDetectionModel
+from test_feature_store import make_audio_tree
+
+
+def test_per_language_metrics():
+    labels = [1, 1, 0, 0, 1, 0]
+    predictions = [1, 0, 0, 1, 1, 0]
+    languages = ["en", "en", "en", "en", "ta", "ta"]
+    report = classification_report(labels, predictions, languages)
+
+    assert report["overall"]["confusion_matrix"] == {"tp": 2, "fp": 1, "tn": 2, "fn": 1}
+    en = report["per_language"]["en"]
+    assert (en["precision"], en["recall"], en["f1"]) == (0.5, 0.5, 0.5)
+    assert report["per_language"]["ta"]["accuracy"] == 1.0
+
+    assert check_gates(report, min_f1=0.6) == ["en: f1 0.5 < 0.6"]
+
+
+def test_audio_tree_and_feature_store_give_the_same_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root, store_dir = os.path.join(tmp, "data"), os.path.join(tmp, "features")
+        make_audio_tree(audio_root)
+        model = VoiceDetectionModel(model_path=None)  # placeholder: always "AI"
+        build_feature_store(audio_root, store_dir, model)
+
+        reports = [evaluate(model, source, batch_size=4) for source in (audio_root, store_dir)]
+    for report in reports:
+        assert report["speed"]["clips"] == 6
+        assert set(report["speed"]["latency_ms"]) == {"p50", "p95", "p99"}
+        assert report["per_language"]["en"]["recall"] == 1.0
+        assert report["per_language"]["ta"]["confusion_matrix"]["fp"] == 3
+    assert reports[0]["overall"] == reports[1]["overall"]
+
+
+if __name__ == "__main__":
+    test_per_language_metrics()
+    test_audio_tree_and_feature_store_give_the_same_report()
+    print("✅ All evaluation tests passed")
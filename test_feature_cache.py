@@ -0,0 +1,93 @@
+"""
+Local tests for the shared intermediate feature cache
+Run with: python test_feature_cache.py  (or pytest test_feature_cache.py)
+"""
+
+import time
+
+import numpy as np
+
+from feature_cache import FeatureCache, FeatureContext
+from model_integration import LONG_CLIP_SECONDS, VoiceDetectionModel
+from prediction_cache import LRUCache
+from synthetic_audio import speech_like, to_wav_bytes
+from test_windowed_inference import ConstantBackend
+
+
+def wav(seconds: float = 1.5, sample_rate: int = 22050, seed: int = 0) -> bytes:
+    return to_wav_bytes(speech_like(seconds, sample_rate, np.random.default_rng(seed)), sample_rate)
+
+
+def test_models_on_one_request_share_every_stage():
+    cache = FeatureCache(LRUCache())
+    production = VoiceDetectionModel(None, features="torch", feature_cache=cache)
+    shadow = VoiceDetectionModel(None, features="torch", feature_cache=cache)
+    audio = wav()
+
+    context = production.context(audio)
+    features = production.extract_features(context)
+    misses = dict(cache.misses)
+    assert misses == {"pcm": 1, "resampled": 1, "mel": 1, "mfcc": 1}
+
+    # Same context: served from the context itself, no cache traffic at all
+    assert shadow.extract_features(context) is features
+    # A separate request with the same audio hits the shared cache
+    assert shadow.extract_features(audio) is features
+    assert cache.misses == misses
+    assert cache.hits["mfcc"] == 1
+
+    waveform, sample_rate = production.load_waveform(audio)
+    reference = production.features_from_waveform(waveform, sample_rate)
+    assert np.allclose(features.numpy(), reference.numpy(), atol=1e-6)
+
+
+def test_stages_are_keyed_by_pipeline():
+    cache = FeatureCache(LRUCache())
+    torch_model = VoiceDetectionModel(None, features="torch", feature_cache=cache)
+    numpy_model = VoiceDetectionModel(None, features="numpy", feature_cache=cache)
+    context = FeatureContext(wav(), cache=cache)
+
+    torch_features = torch_model.extract_features(context)
+    numpy_features = numpy_model.extract_features(context)
+    assert isinstance(numpy_features, np.ndarray)
+    assert np.abs(numpy_features - torch_features.numpy()).max() < 1e-3
+    # Decoding is shared, the DSP stages are not
+    assert cache.misses == {"pcm": 1, "resampled": 2, "mel": 2, "mfcc": 2}
+
+
+def test_long_clip_windows_are_shared():
+    cache = FeatureCache(LRUCache())
+    models = [VoiceDetectionModel(None, feature_cache=cache) for _ in range(2)]
+    for model in models:
+        model.backend = ConstantBackend(0.55)
+    audio = wav(LONG_CLIP_SECONDS + 5, 16000)
+
+    context = models[0].context(audio)
+    results = [model.analyze(context) for model in models]
+    assert results[0] == results[1]
+    assert cache.misses["window"] == results[0]["windows_evaluated"]
+    assert "window" not in cache.hits  # second model read them off the context
+
+
+def test_cache_is_bounded_by_bytes_and_ttl():
+    cache = FeatureCache(LRUCache(max_bytes=200_000, ttl=0.5))
+    model = VoiceDetectionModel(None, features="numpy", feature_cache=cache)
+    clips = [wav(seed=seed) for seed in range(4)]
+    for audio in clips:
+        model.extract_features(audio)
+        assert cache.memory.bytes <= 200_000
+
+    # The large early stages were evicted, the last clip's MFCCs were not
+    model.extract_features(clips[-1])
+    assert cache.stats()["hits"] == {"mfcc": 1}
+    time.sleep(0.6)
+    model.extract_features(clips[-1])
+    assert cache.stats()["misses"]["mfcc"] == 5
+
+
+if __name__ == "__main__":
+    test_models_on_one_request_share_every_stage()
+    test_stages_are_keyed_by_pipeline()
+    test_long_clip_windows_are_shared()
+    test_cache_is_bounded_by_bytes_and_ttl()
+    print("✅ Feature cache tests passed")
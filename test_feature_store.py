@@ -0,0 +1,99 @@
+"""
+Local tests for the memory-mapped training feature store
+Run with: python test_feature_store.py  (or pytest test_feature_store.py)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import wave
+
+import numpy as np
+import torch
+
+from feature_store import FeatureStore, build_feature_store
+from model_integration import (
+    N_MFCC,
+    FeatureStoreDataset,
+    VoiceDetectionModel,
+    train_voice_detection_model,
+)
+
+
+def write_tone(path: str, frequency: float, seconds: float, sample_rate: int = 16000) -> None:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (np.sin(2 * np.pi * frequency * t) * 8000).astype(np.int16)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+
+def make_audio_tree(root: str) -> None:
+    for i, seconds in enumerate((0.5, 1.0, 2.0)):
+        write_tone(os.path.join(root, "en", "ai", f"{i}.wav"), 300 + 50 * i, seconds)
+        write_tone(os.path.join(root, "ta", "human", f"{i}.wav"), 600 + 50 * i, seconds)
+
+
+def test_store_round_trips_features_zero_copy():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root, store_dir = os.path.join(tmp, "data"), os.path.join(tmp, "features")
+        make_audio_tree(audio_root)
+        detector = VoiceDetectionModel(model_path=None)
+        # Tiny shards so clips land in several files
+        assert build_feature_store(audio_root, store_dir, detector, shard_frames=64) == 6
+
+        store = FeatureStore(store_dir)
+        assert len(store.shard_files) > 1
+        for i in range(len(store)):
+            meta = store.metadata(i)
+            with open(os.path.join(audio_root, meta["source"]), "rb") as f:
+                expected = detector.extract_features(f.read()).numpy().reshape(N_MFCC, -1)
+            view = store.features(i)
+            assert np.array_equal(view, expected)
+            assert isinstance(view.base, np.memmap) or isinstance(view.base.base, np.memmap)
+            assert store.labels[i] == (1.0 if meta["language"] == "en" else 0.0)
+
+        dataset = FeatureStoreDataset(store_dir)
+        features, label = dataset[0]
+        assert features.shape == (1, N_MFCC, dataset.lengths[0])
+        assert label.shape == (1,)
+
+
+def test_training_reads_from_the_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root, store_dir = os.path.join(tmp, "data"), os.path.join(tmp, "features")
+        make_audio_tree(audio_root)
+        build_feature_store(audio_root, store_dir)
+        output = os.path.join(tmp, "voice_model.pth")
+        train_voice_detection_model(store_dir, num_epochs=1, batch_size=4, num_workers=0,
+                                    output_path=output)
+        assert "fc1.weight" in torch.load(output)
+
+
+def test_build_with_the_numpy_feature_pipeline():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root, store_dir = os.path.join(tmp, "data"), os.path.join(tmp, "features")
+        make_audio_tree(audio_root)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_store.py")
+        done = subprocess.run([sys.executable, script, audio_root, store_dir], capture_output=True,
+                              text=True, env=dict(os.environ, FEATURE_PIPELINE="numpy"))
+        assert done.returncode == 0, done.stderr
+
+        store = FeatureStore(store_dir)
+        detector = VoiceDetectionModel(model_path=None, features="numpy")
+        assert len(store) == 6
+        for i in range(len(store)):
+            with open(os.path.join(audio_root, store.metadata(i)["source"]), "rb") as f:
+                expected = detector.extract_features(f.read()).reshape(N_MFCC, -1)
+            assert np.allclose(store.features(i), expected)
+
+
+if __name__ == "__main__":
+    test_store_round_trips_features_zero_copy()
+    test_training_reads_from_the_store()
+    test_build_with_the_numpy_feature_pipeline()
+    print("✅ All feature store tests passed")
@@ -0,0 +1,71 @@
+"""
+Local test: eager, TorchScript and ONNX Runtime backends agree
+Run with: python test_inference_backends.py  (or pytest test_inference_backends.py)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import torch
+
+from bucketing import pad_batch
+from export_model import export, load_classifier
+from inference_backends import export_onnx, export_torchscript
+from model_integration import INPUT_FRAMES, N_MFCC, StudentClassifier, VoiceClassifier, VoiceDetectionModel
+
+
+def test_all_backends_give_identical_predictions():
+    torch.manual_seed(0)
+    classifier = VoiceClassifier().eval()
+    features = [torch.randn(1, N_MFCC, frames) for frames in (12, INPUT_FRAMES, 90)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = os.path.join(tmp, "voice_model.pth")
+        torch.save(classifier.state_dict(), weights)
+        artifacts = {
+            "torch": weights,
+            "torchscript": export_torchscript(classifier, os.path.join(tmp, "voice_model.pt")),
+        }
+        try:
+            import onnxruntime  # noqa: F401
+            artifacts["onnx"] = export_onnx(classifier, os.path.join(tmp, "voice_model.onnx"))
+        except ImportError:
+            print("⚠️  onnxruntime not installed, skipping the onnx backend")
+
+        results = {}
+        for kind, path in artifacts.items():
+            detector = VoiceDetectionModel(path, backend=kind)
+            batch, lengths = pad_batch([detector.prepare_input(f) for f in features])
+            results[kind] = detector.backend.run(batch.numpy(), lengths.numpy())
+
+    reference = results.pop("torch")
+    for kind, probabilities in results.items():
+        assert abs(probabilities - reference).max() < 1e-5, kind
+
+
+def test_student_weights_export():
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = os.path.join(tmp, "student.pth")
+        torch.save(StudentClassifier().state_dict(), weights)
+        model = load_classifier(weights)
+        assert isinstance(model, StudentClassifier)
+        assert export(model, "torchscript", os.path.join(tmp, "student.pt")) < 1e-5
+
+
+def test_missing_weights_exit_with_a_message():
+    with tempfile.TemporaryDirectory() as tmp:
+        done = subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "export_model.py"), "voice_model.pth"],
+                              cwd=tmp, capture_output=True, text=True)
+    assert done.returncode == 1
+    assert "Model weights not found: voice_model.pth" in done.stderr
+    assert "Traceback" not in done.stderr
+
+
+if __name__ == "__main__":
+    test_all_backends_give_identical_predictions()
+    test_student_weights_export()
+    test_missing_weights_exit_with_a_message()
+    print("✅ All inference backends agree")
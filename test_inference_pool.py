@@ -0,0 +1,106 @@
+"""
+Local tests for the off-event-loop inference pool
+Run with: python test_inference_pool.py  (or pytest test_inference_pool.py)
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import wave
+
+import numpy as np
+import torch
+
+from inference_pool import InferencePool, InferenceTimeout
+from model_integration import VoiceClassifier, VoiceDetectionModel
+
+
+def make_wav_bytes(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def save_weights(directory: str) -> str:
+    torch.manual_seed(0)
+    path = os.path.join(directory, "voice_model.pth")
+    torch.save(VoiceClassifier().state_dict(), path)
+    return path
+
+
+def test_pool_matches_in_process_prediction():
+    audio = make_wav_bytes()
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = save_weights(tmp)
+        expected = VoiceDetectionModel(weights).analyze(audio)
+
+        async def run(kind):
+            pool = InferencePool(weights, kind=kind, workers=2)
+            await pool.start()
+            results = await asyncio.gather(*(pool.predict(audio) for _ in range(4)))
+            await pool.stop()
+            return results
+
+        for kind in ("thread", "process"):
+            assert asyncio.run(run(kind)) == [expected] * 4, kind
+
+
+def test_timeout_restarts_the_process_pool():
+    audio = make_wav_bytes(seconds=5.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = save_weights(tmp)
+
+        async def run():
+            pool = InferencePool(weights, kind="process", workers=1, task_timeout=0.0001)
+            await pool.start()
+            try:
+                await pool.predict(audio)
+            except InferenceTimeout:
+                pass
+            else:
+                raise AssertionError("expected a timeout")
+            pool.task_timeout = 30
+            result = await pool.predict(audio)
+            stats = pool.stats()
+            await pool.stop()
+            return result, stats
+
+        result, stats = asyncio.run(run())
+        assert result["prediction"] in ("AI", "Human")
+        assert stats["timeouts"] == 1 and stats["restarts"] == 1
+
+
+def test_concurrent_clips_are_batched_into_one_task():
+    audio = make_wav_bytes()
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = save_weights(tmp)
+        expected = VoiceDetectionModel(weights).analyze(audio)
+
+        async def run():
+            pool = InferencePool(weights, kind="thread", workers=1, max_batch_size=8, max_wait_ms=50)
+            await pool.start()
+            results = await asyncio.gather(*(pool.predict(audio) for _ in range(6)),
+                                           pool.predict(b"not audio"), return_exceptions=True)
+            stats = pool.stats()
+            await pool.stop()
+            return results, stats
+
+        results, stats = asyncio.run(run())
+        assert results[:6] == [expected] * 6
+        # The broken clip fails alone, without taking its batch with it
+        assert isinstance(results[6], Exception)
+        assert stats["batches"] == 1 and stats["mean_batch_size"] == 7
+
+
+if __name__ == "__main__":
+    test_pool_matches_in_process_prediction()
+    test_timeout_restarts_the_process_pool()
+    test_concurrent_clips_are_batched_into_one_task()
+    print("✅ All inference pool tests passed")
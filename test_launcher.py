@@ -0,0 +1,205 @@
+"""
+Local tests for the pre-fork multi-worker launcher
+Run with: python test_launcher.py  (or pytest test_launcher.py)
+"""
+
+import contextlib
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from launcher import Launcher, plan_workers, request_limit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# A tiny app whose preload() allocates 64 MB, answering with its pid and
+# how much memory it does not share with the master
+DEMO_APP = '''
+import json, os
+from launcher import private_memory_mb
+
+WEIGHTS = None
+
+def preload():
+    global WEIGHTS
+    WEIGHTS = bytearray(b"w" * (64 * 1024 * 1024))
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            await send({"type": message["type"] + ".complete"})
+            if message["type"] == "lifespan.shutdown":
+                return
+    body = json.dumps({"pid": os.getpid(), "weights": len(WEIGHTS),
+                       "private_mb": private_memory_mb()}).encode()
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+'''
+
+# Parallel torch work in preload() and again in the forked workers,
+# reporting the thread counts each one ran with
+TORCH_APP = '''
+import json, os
+import torch
+
+PRELOAD = {}
+
+def preload():
+    x = torch.randn(512, 512)
+    (x @ x).sum().item()
+    PRELOAD.update(threads=torch.get_num_threads(), interop=torch.get_num_interop_threads())
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            await send({"type": message["type"] + ".complete"})
+            if message["type"] == "lifespan.shutdown":
+                return
+    x = torch.randn(512, 512)
+    (x @ x).sum().item()
+    body = json.dumps(dict(PRELOAD, pid=os.getpid(), worker_threads=torch.get_num_threads())).encode()
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+'''
+
+
+def test_plan_workers():
+    assert plan_workers(8, 16000) == (8, 1)
+    assert plan_workers(8, 700, worker_memory_mb=256) == (2, 4)  # memory-bound
+    assert plan_workers(1, 300) == (1, 1)
+    assert plan_workers(4, None, requested=2) == (2, 2)
+
+
+def test_request_limit_adds_jitter():
+    assert request_limit(0, 100) is None
+    assert request_limit(30, 0) == 30
+    limits = {request_limit(100, 50) for _ in range(200)}
+    assert min(limits) >= 100 and max(limits) <= 150 and len(limits) > 1
+
+
+def children(pid: int) -> set:
+    found = set()
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+                found.add(int(entry))
+    return found
+
+
+def get(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def wait_for(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+@contextlib.contextmanager
+def serve(source: str, **env):
+    """Run the launcher on `source` as demo_app:app, yielding (master, port)"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "demo_app.py"), "w") as f:
+            f.write(source)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([tmp, HERE]), HOST="127.0.0.1", PORT=str(port),
+                   GRACEFUL_TIMEOUT="5", LOG_LEVEL="warning", **env)
+        master = subprocess.Popen([sys.executable, os.path.join(HERE, "launcher.py"), "demo_app:app"], env=env)
+        try:
+            yield master, port
+        finally:
+            master.send_signal(signal.SIGTERM)
+            assert master.wait(timeout=20) == 0
+
+
+def test_workers_share_preloaded_memory_and_restart_in_place():
+    if not hasattr(os, "fork"):
+        return
+    with serve(DEMO_APP, WEB_CONCURRENCY="2", MAX_REQUESTS="30") as (master, port):
+        wait_for(lambda: len(children(master.pid)) == 2 and get(port))
+        first = children(master.pid)
+        answer = get(port)
+        assert answer["pid"] in first and answer["weights"] == 64 * 1024 * 1024
+        assert answer["private_mb"] < 40, answer  # the 64 MB are shared with the master
+
+        # Rolling restart: every worker replaced, no request fails meanwhile
+        master.send_signal(signal.SIGHUP)
+        deadline = time.monotonic() + 30
+        while children(master.pid) & first:
+            assert time.monotonic() < deadline, "workers were not replaced"
+            get(port)
+        wait_for(lambda: len(children(master.pid)) == 2)
+
+        # Max-requests recycling: past 30 requests per worker, new pids show up
+        second = children(master.pid)
+        pids = {get(port)["pid"] for _ in range(90)}
+        assert pids - second, "no worker was recycled"
+        wait_for(lambda: len(children(master.pid)) == 2)
+
+
+def test_forked_workers_run_torch_after_a_single_threaded_preload():
+    if not hasattr(os, "fork"):
+        return
+    with serve(TORCH_APP, WEB_CONCURRENCY="2", TORCH_THREADS="2") as (master, port):
+        wait_for(lambda: len(children(master.pid)) == 2 and get(port))
+        answers = [get(port) for _ in range(10)]
+    assert all(a["threads"] == 1 and a["interop"] == 1 for a in answers), answers  # no pools to fork
+    assert all(a["worker_threads"] == 2 for a in answers), answers
+
+
+def test_process_pool_skips_preload_with_a_warning():
+    calls = []
+    module = type(sys)("preload_probe")
+    module.app = object()
+    module.preload = lambda: calls.append(1)
+    sys.modules["preload_probe"] = module
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logging.getLogger("launcher").addHandler(handler)
+    saved = dict(os.environ)
+    os.environ["INFERENCE_POOL"] = "process"
+    try:
+        Launcher("preload_probe:app").load()
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+        logging.getLogger("launcher").removeHandler(handler)
+        del sys.modules["preload_probe"]
+    assert calls == []
+    assert any("INFERENCE_POOL=process" in record.getMessage() for record in records)
+
+
+if __name__ == "__main__":
+    test_plan_workers()
+    test_request_limit_adds_jitter()
+    test_workers_share_preloaded_memory_and_restart_in_place()
+    test_forked_workers_run_torch_after_a_single_threaded_preload()
+    test_process_pool_skips_preload_with_a_warning()
+    print("✅ Launcher tests passed")
@@ -0,0 +1,223 @@
+"""
+Local tests for the model registry, hot swaps and A/B routing
+Run with: python test_model_registry.py  (or pytest test_model_registry.py)
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from asgi_fast_path import call
+from model_registry import InvalidManifest, ModelRegistry, ModelRouter
+
+
+class FakePool:
+    """InferencePool stand-in that answers with its own version after a delay"""
+
+    def __init__(self, path, backend=None, delay=0.05, warm_up_delay=0.0):
+        self.version = os.path.basename(os.path.dirname(path))
+        self.delay = delay
+        self.warm_up_delay = warm_up_delay
+        self.running = False
+        self.stopped = False
+
+    async def start(self):
+        if "broken" in self.version:
+            raise RuntimeError("corrupt artifact")
+        self.running = True
+
+    async def warm_up(self):
+        await asyncio.sleep(self.warm_up_delay)
+        return self.warm_up_delay
+
+    async def predict(self, audio):
+        assert self.running, "request routed to a stopped pool"
+        await asyncio.sleep(self.delay)
+        return {"prediction": "AI", "confidence": 0.9, "version": self.version}
+
+    async def stop(self):
+        self.running = False
+        self.stopped = True
+
+    def stats(self):
+        return {"running": self.running}
+
+
+def make_registry(root: str, *versions: str) -> ModelRegistry:
+    for version in versions:
+        os.makedirs(os.path.join(root, version))
+        with open(os.path.join(root, version, "voice_model.pth"), "wb") as f:
+            f.write(b"weights")
+    return ModelRegistry(root)
+
+
+def test_registry_lists_versions_and_backends():
+    with tempfile.TemporaryDirectory() as root:
+        registry = make_registry(root, "v1")
+        os.makedirs(os.path.join(root, "not-a-model"))
+        artifact = os.path.join(root, "v1", "voice_model.pth")
+        added = registry.add(artifact, "v2", backend="int8")
+
+        versions = {model.version: model for model in registry.versions()}
+        assert sorted(versions) == ["v1", "v2"]
+        assert versions["v1"].backend == "torch"
+        assert added.backend == "int8" and os.path.exists(added.path)
+        with open(os.path.join(root, "v2", "model.json")) as f:
+            assert json.load(f)["artifact"] == "voice_model.pth"
+        for bad in ("..", "../v1", "missing", ""):
+            try:
+                registry.get(bad)
+                assert False, bad
+            except LookupError:
+                pass
+
+
+def write_manifest(root: str, version: str, manifest) -> None:
+    os.makedirs(os.path.join(root, version))
+    with open(os.path.join(root, version, "voice_model.pth"), "wb") as f:
+        f.write(b"weights")
+    with open(os.path.join(root, version, "model.json"), "w") as f:
+        f.write(manifest if isinstance(manifest, str) else json.dumps(manifest))
+
+
+BAD_MANIFESTS = {
+    "no-artifact": {"backend": "torch"},
+    "not-json": "{artifact",
+    "a-list": ["voice_model.pth"],
+    "outside": {"artifact": "../v1/voice_model.pth"},
+    "missing-file": {"artifact": "other.pth"},
+    "bad-backend": {"artifact": "voice_model.pth", "backend": "tensorflow"},
+}
+
+
+def test_broken_manifests_are_rejected_with_a_message():
+    with tempfile.TemporaryDirectory() as root:
+        registry = make_registry(root, "v1")
+        for version, manifest in BAD_MANIFESTS.items():
+            write_manifest(root, version, manifest)
+            try:
+                registry.get(version)
+                assert False, version
+            except InvalidManifest as e:
+                assert f"'{version}'" in str(e)
+        assert [model.version for model in registry.versions()] == ["v1"]
+
+        artifact = os.path.join(root, "v1", "voice_model.pth")
+        for args in ((os.path.join(root, "nope.pth"), "v9"), (artifact, "../v9"), (artifact, "v1"),
+                     (artifact, "v9", "tensorflow")):
+            try:
+                registry.add(*args)
+                assert False, args
+            except ValueError:
+                pass
+        assert not os.path.exists(os.path.join(root, "v9"))
+
+
+def test_admin_models_answers_400_for_a_broken_manifest():
+    import app as service
+
+    with tempfile.TemporaryDirectory() as root:
+        write_manifest(root, "no-artifact", BAD_MANIFESTS["no-artifact"])
+        saved = service.ADMIN_TOKEN, service.model_router.registry
+        service.ADMIN_TOKEN, service.model_router.registry = "secret", ModelRegistry(root)
+        try:
+            headers = [("x-admin-token", "secret"), ("content-type", "application/json")]
+            status, _, body = asyncio.run(call(service.app, "POST", "/admin/models", headers,
+                                               json.dumps({"version": "no-artifact"}).encode()))
+        finally:
+            service.ADMIN_TOKEN, service.model_router.registry = saved
+    assert status == 400
+    assert "must name its artifact" in json.loads(body)["error"]
+
+
+def test_swap_keeps_serving_and_drains_the_old_version():
+    async def scenario(root):
+        router = ModelRouter(make_registry(root, "v1", "v2"),
+                             pool_factory=lambda path, backend: FakePool(path, delay=0.2,
+                                                                         warm_up_delay=0.2))
+        await router.deploy({"v1": 100})
+        old = router.choose(b"clip")
+        in_flight = asyncio.create_task(old.predict(b"clip"))
+        await asyncio.sleep(0.01)
+
+        swap = router.deploy_in_background({"v2": 100})
+        await asyncio.sleep(0.05)
+        # v2 is still warming up: traffic stays on v1
+        assert router.busy and router.choose(b"clip").version == "v1"
+        await swap
+
+        assert router.choose(b"clip").version == "v2"
+        assert (await in_flight)["version"] == "v1"  # finished on the old version
+        await asyncio.sleep(0.05)
+        assert old.pool.stopped
+        assert router.stats()["swaps"] == 2
+        await router.stop()
+
+    with tempfile.TemporaryDirectory() as root:
+        asyncio.run(scenario(root))
+
+
+def test_failed_load_keeps_the_current_routes():
+    async def scenario(root):
+        router = ModelRouter(make_registry(root, "v1", "broken"), pool_factory=FakePool)
+        await router.deploy({"v1": 100})
+        try:
+            await router.deploy({"broken": 100})
+            assert False, "deploy should fail"
+        except RuntimeError:
+            pass
+        assert router.choose(b"clip").version == "v1"
+        assert router.status["state"] == "failed"
+        await router.stop()
+
+    with tempfile.TemporaryDirectory() as root:
+        asyncio.run(scenario(root))
+
+
+def test_ab_split_is_by_percentage_and_sticky():
+    async def scenario(root):
+        router = ModelRouter(make_registry(root, "v1", "v2"), pool_factory=FakePool)
+        for bad in ({"v1": 50}, {"v1": 50, "v2": "x"}, {"v1": 50, "v3": 50}):
+            try:
+                router.check(bad)
+                assert False, bad
+            except (ValueError, LookupError):
+                pass
+        await router.deploy({"v1": 70, "v2": 30})
+        clips = [os.urandom(64) for _ in range(2000)]
+        share = sum(router.choose(clip).version == "v2" for clip in clips) / len(clips)
+        assert 0.25 < share < 0.35
+        assert all(router.choose(clip) is router.choose(clip) for clip in clips[:50])
+        await router.stop()
+
+    with tempfile.TemporaryDirectory() as root:
+        asyncio.run(scenario(root))
+
+
+# Imports the server with numpy (not in requirements.txt) unavailable
+WITHOUT_NUMPY = """
+import sys
+sys.modules["numpy"] = None
+import app
+"""
+
+
+def test_app_imports_without_numpy():
+    here = os.path.dirname(os.path.abspath(__file__))
+    done = subprocess.run([sys.executable, "-c", WITHOUT_NUMPY], cwd=here, capture_output=True, text=True,
+                          env=dict(os.environ, MODEL_REGISTRY_DIR=os.path.join(here, "no-such-dir")))
+    assert done.returncode == 0, done.stderr
+
+
+if __name__ == "__main__":
+    test_registry_lists_versions_and_backends()
+    test_broken_manifests_are_rejected_with_a_message()
+    test_admin_models_answers_400_for_a_broken_manifest()
+    test_swap_keeps_serving_and_drains_the_old_version()
+    test_failed_load_keeps_the_current_routes()
+    test_ab_split_is_by_percentage_and_sticky()
+    test_app_imports_without_numpy()
+    print("✅ Model registry tests passed")
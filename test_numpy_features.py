@@ -0,0 +1,115 @@
+"""
+Local test: the NumPy MFCC path matches torchaudio and serves without torch
+Run with: python test_numpy_features.py  (or pytest test_numpy_features.py)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+from dsp_plans import COMMON_SAMPLE_RATES, DSPPlan, DSPPlanRegistry
+from inference_backends import export_onnx
+from model_integration import VoiceClassifier, VoiceDetectionModel
+from numpy_features import NumpyDSPPlan
+from synthetic_audio import speech_like, to_wav_bytes
+
+
+def clip(sample_rate: int, channels: int = 1, seconds: float = 1.3) -> np.ndarray:
+    samples = speech_like(seconds, sample_rate, np.random.default_rng(sample_rate), pad_seconds=0.1)
+    return np.stack([samples * (0.5 + 0.2 * c) for c in range(channels)])
+
+
+def test_plans_match_torchaudio():
+    for sample_rate in (8000, 11025, 16000, 22050, 44100, 48000):
+        waveform = clip(sample_rate)
+        reference_plan, plan = DSPPlan(sample_rate), NumpyDSPPlan(sample_rate)
+        resampled = plan.resample(waveform)
+        reference = reference_plan.resample(torch.from_numpy(waveform)).numpy()
+        assert resampled.shape == reference.shape, sample_rate
+        assert np.abs(resampled - reference).max() < 1e-5, sample_rate
+
+        mfcc = plan(waveform)
+        reference = reference_plan(torch.from_numpy(waveform)).numpy()
+        assert mfcc.shape == reference.shape, sample_rate
+        # Values reach a few hundred; differences are float32 rounding
+        assert np.abs(mfcc - reference).max() < 1e-2, sample_rate
+
+
+def test_model_features_match():
+    torch_model = VoiceDetectionModel(None, features="torch")
+    numpy_model = VoiceDetectionModel(None, features="numpy")
+    for sample_rate, channels in ((16000, 1), (44100, 2), (8000, 2)):
+        audio = to_wav_bytes(clip(sample_rate, channels).T, sample_rate)
+        reference = torch_model.extract_features(audio).numpy()
+        features = numpy_model.extract_features(audio)
+        assert isinstance(features, np.ndarray)
+        assert features.shape == reference.shape
+        assert np.abs(features - reference).max() < 1e-3
+
+
+def test_registry_keeps_only_a_few_uncommon_rates():
+    registry = DSPPlanRegistry(NumpyDSPPlan, max_other_plans=2)
+    registry.warm()
+    registry.warm([11025])
+    for sample_rate in (12000, 24000, 32000, 88200, 96000):
+        registry.get(sample_rate)
+    assert len(registry) == len(COMMON_SAMPLE_RATES) + 1 + 2
+    params = registry.get(16000).key[1:]
+    assert (12000, *params) not in registry and (96000, *params) in registry
+    assert registry.get(96000) is registry.get(96000)
+    assert (11025, *params) in registry  # warmed rates are kept like common ones
+
+    # A made-up rate would need a multi-gigabyte resample kernel
+    for sample_rate in (44101, 0, -8000):
+        try:
+            registry.get(sample_rate)
+        except ValueError as e:
+            assert "Unsupported sample rate" in str(e)
+        else:
+            raise AssertionError(f"{sample_rate} Hz was accepted")
+
+
+NO_TORCH_SCRIPT = """
+import sys
+sys.modules["torch"] = sys.modules["torchaudio"] = None
+from model_integration import VoiceDetectionModel, torch
+assert torch is None
+model = VoiceDetectionModel(sys.argv[1], backend="onnx")
+assert model.features == "numpy"
+with open(sys.argv[2], "rb") as f:
+    print(model.probabilities([model.extract_features(f.read())])[0])
+"""
+
+
+def test_onnx_serving_without_torch():
+    torch.manual_seed(0)
+    classifier = VoiceClassifier().eval()
+    audio = to_wav_bytes(clip(22050, 2).T, 22050)
+    with tempfile.TemporaryDirectory() as tmp:
+        onnx_path = export_onnx(classifier, os.path.join(tmp, "voice_model.onnx"))
+        weights = os.path.join(tmp, "voice_model.pth")
+        torch.save(classifier.state_dict(), weights)
+        wav_path = os.path.join(tmp, "clip.wav")
+        with open(wav_path, "wb") as f:
+            f.write(audio)
+
+        result = subprocess.run([sys.executable, "-c", NO_TORCH_SCRIPT, onnx_path, wav_path],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.returncode == 0, result.stderr
+        probability = float(result.stdout.strip().splitlines()[-1])
+
+        reference_model = VoiceDetectionModel(weights, backend="torch", features="torch")
+        reference = reference_model.probabilities([reference_model.extract_features(audio)])[0]
+    assert abs(probability - reference) < 1e-4
+
+
+if __name__ == "__main__":
+    test_plans_match_torchaudio()
+    test_model_features_match()
+    test_registry_keeps_only_a_few_uncommon_rates()
+    test_onnx_serving_without_torch()
+    print("✅ NumPy features match torchaudio and serve without torch")
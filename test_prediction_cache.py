@@ -0,0 +1,59 @@
+"""
+Local tests for the content-addressed prediction cache
+Run with: python test_prediction_cache.py  (or pytest test_prediction_cache.py)
+"""
+
+import os
+import tempfile
+import time
+
+from prediction_cache import LRUCache, PredictionCache, SQLiteTier
+
+
+def test_hits_are_keyed_by_audio_and_model_version():
+    cache = PredictionCache(LRUCache())
+    audio = os.urandom(4096)
+    assert cache.get(audio, "v1") is None
+    cache.put(audio, "v1", {"prediction": "AI", "confidence": 0.91})
+    assert cache.get(audio, "v1") == {"prediction": "AI", "confidence": 0.91}
+    assert cache.get(audio, "v2") is None
+    assert cache.get(audio[:-1], "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+
+def test_lru_respects_entry_byte_and_ttl_bounds():
+    lru = LRUCache(max_entries=2, max_bytes=100, ttl=60)
+    lru.put("a", 1, 10)
+    lru.put("b", 2, 10)
+    lru.get("a")
+    lru.put("c", 3, 10)  # evicts b, the least recently used
+    assert lru.get("b") is None and lru.get("a") == 1 and lru.get("c") == 3
+
+    lru.put("big", 4, 95)  # byte bound evicts the rest
+    assert len(lru) == 1 and lru.bytes == 95
+
+    short = LRUCache(ttl=0.01)
+    short.put("k", 1, 1)
+    time.sleep(0.02)
+    assert short.get("k") is None
+
+
+def test_sqlite_tier_is_shared_between_caches():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "predictions.db")
+        worker_a = PredictionCache(LRUCache(), SQLiteTier(path))
+        worker_b = PredictionCache(LRUCache(), SQLiteTier(path))
+        audio = os.urandom(1000)
+        worker_a.put(audio, "v1", {"prediction": "Human", "confidence": 0.7})
+        assert worker_b.get(audio, "v1") == {"prediction": "Human", "confidence": 0.7}
+        assert worker_b.stats()["disk_hits"] == 1
+        worker_a.disk.close()
+        worker_b.disk.close()
+
+
+if __name__ == "__main__":
+    test_hits_are_keyed_by_audio_and_model_version()
+    test_lru_respects_entry_byte_and_ttl_bounds()
+    test_sqlite_tier_is_shared_between_caches()
+    print("✅ All prediction cache tests passed")
@@ -0,0 +1,67 @@
+"""
+Local tests for the INT8 quantization pipeline and the int8 backend
+Run with: python test_quantize_model.py  (or pytest test_quantize_model.py)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+import quantize_model
+from inference_backends import load_backend
+from model_integration import INPUT_FRAMES, N_MFCC, VoiceClassifier, VoiceDetectionModel
+
+
+def make_calibration(path: str, clips: int = 24) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    features = rng.standard_normal((clips, 1, N_MFCC, INPUT_FRAMES)).astype(np.float32)
+    labels = (np.arange(clips) % 2).astype(np.float32)
+    np.savez(path, features=features, labels=labels)
+    return features
+
+
+def test_quantize_report_and_int8_backend():
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = os.path.join(tmp, "voice_model.pth")
+        torch.save(VoiceClassifier().state_dict(), weights)
+        features = make_calibration(os.path.join(tmp, "calib.npz"))
+
+        argv = sys.argv
+        sys.argv = ["quantize_model.py", weights, "--calibration", os.path.join(tmp, "calib.npz")]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                quantize_model.main()
+        finally:
+            sys.argv = argv
+
+        artifact = os.path.join(tmp, "voice_model.int8.pt")
+        with open(os.path.join(tmp, "voice_model.int8.report.json")) as f:
+            report = json.load(f)
+        assert report["artifact"] == artifact and report["clips"] == len(features)
+        assert report["size_bytes"]["int8"] < report["size_bytes"]["fp32"]
+        assert set(report["accuracy"]) == {"fp32", "int8", "delta"}
+        assert set(report["latency_ms_per_clip"]) == {"fp32", "int8"}
+        assert report["prediction_agreement"] >= 0.75
+
+        backend = load_backend("int8", artifact)
+        expected = load_backend("torch", weights).run(features)
+        probabilities = backend.run(features)
+        assert probabilities.shape == (len(features),)
+        assert np.abs(probabilities - expected).max() < 0.1
+
+        # Served like any other backend, variable-length clips included
+        detector = VoiceDetectionModel(artifact, backend="int8")
+        results = detector.predict_features_batch([torch.randn(1, N_MFCC, frames) for frames in (12, 90)])
+        assert all(prediction in ("AI", "Human") for prediction, _ in results)
+
+
+if __name__ == "__main__":
+    test_quantize_report_and_int8_backend()
+    print("✅ All quantization tests passed")
@@ -0,0 +1,81 @@
+"""
+Local tests for the shared JSON serialization layer
+Run with: python test_serialization.py  (or pytest test_serialization.py)
+"""
+
+import importlib.util
+import json
+import os
+
+# Many requests share one key: keep its rate limit out of the way
+os.environ.setdefault("API_KEY_BURST", "100000")
+
+from fastapi.testclient import TestClient
+
+import serialization
+from serialization import StaticJSON, dumps
+
+PAYLOADS = [
+    {"status": "success", "prediction": "Human", "confidence": 0.99, "windows_evaluated": 3},
+    {"error": "Prediction failed: ünïcode ✓", "nested": {"list": [1, 2.5, None, True]}},
+    {"status": "starting", "timings": {"startup_ms": 12.3}},
+]
+
+
+def load_standalone(directory: str):
+    """The honeypot-api / voice-api app.py, imported under its own name"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory, "app.py")
+    spec = importlib.util.spec_from_file_location(directory.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def test_dumps_matches_the_standard_library():
+    for payload in PAYLOADS:
+        assert json.loads(dumps(payload)) == payload
+        assert dumps(payload) == serialization._stdlib_dumps(payload), serialization.ENCODER
+
+
+def test_static_json_headers():
+    static = StaticJSON({"error": "Unauthorized"}, {"Cache-Control": "no-store"})
+    headers = dict(static.raw_headers)
+    assert headers[b"content-length"] == str(len(static.body)).encode()
+    assert headers[b"etag"] == static.etag.encode() and static.etag.startswith('"')
+    assert headers[b"cache-control"] == b"no-store"
+    assert StaticJSON({"error": "Unauthorized"}).etag == static.etag
+
+
+def test_apps_serve_precomputed_bodies():
+    import app as service
+    import main_old
+    import vercel_app
+
+    origin = {"origin": "https://tester.example", "x-api-key": "guvi123"}
+    cases = [
+        (service.app, "post", "/honeypot", origin, service.HONEYPOT_PAYLOAD),
+        (main_old.app, "post", "/anything", {"x-api-key": "guvi123"}, main_old.PERFECT.payload),
+        (main_old.app, "get", "/", {}, {"error": "Unauthorized"}),
+        (vercel_app.app, "post", "/honeypot", {"x-api-key": "guvi123"}, vercel_app.HONEYPOT.payload),
+        (vercel_app.app, "post", "/predict", {"x-api-key": "guvi123"}, vercel_app.PREDICTION.payload),
+        (load_standalone("honeypot-api"), "post", "/honeypot", origin, service.HONEYPOT_PAYLOAD),
+        (load_standalone("voice-api"), "post", "/predict", {}, {
+            "status": "success", "prediction": "Human", "confidence": 0.89,
+            "language": "en", "audio_format": "wav"}),
+    ]
+    for app, method, path, headers, expected in cases:
+        with TestClient(app) as client:
+            first = getattr(client, method)(path, headers=headers)
+            second = getattr(client, method)(path, headers=headers)
+        assert first.json() == expected, path
+        assert first.headers["content-length"] == str(len(first.content))
+        assert first.headers["etag"] and first.headers["etag"] == second.headers["etag"]
+        # Middleware headers are added per response, not to the shared list
+        assert second.headers.raw == first.headers.raw, path
+
+
+if __name__ == "__main__":
+    test_dumps_matches_the_standard_library()
+    test_static_json_headers()
+    test_apps_serve_precomputed_bodies()
+    print(f"✅ Serialization tests passed (encoder: {serialization.ENCODER})")
@@ -0,0 +1,82 @@
+"""
+Local tests for the distilled student tier
+Run with: python test_student_tier.py  (or pytest test_student_tier.py)
+"""
+
+import os
+import tempfile
+
+import torch
+
+from evaluate_model import evaluate
+from feature_store import build_feature_store
+from inference_backends import export_onnx
+from model_integration import (
+    N_MFCC,
+    StudentClassifier,
+    VoiceClassifier,
+    VoiceDetectionModel,
+    train_voice_detection_model,
+)
+from test_feature_store import make_audio_tree
+
+
+class ConstantBackend:
+    def __init__(self, probability):
+        self.probability = probability
+        self.clips = 0
+
+    def run(self, batch, lengths=None):
+        self.clips += len(batch)
+        return torch.full((len(batch),), self.probability).numpy()
+
+
+def test_student_is_much_smaller_and_length_agnostic():
+    student, teacher = StudentClassifier().eval(), VoiceClassifier().eval()
+    size = lambda m: sum(p.numel() for p in m.parameters())
+    assert size(student) * 50 < size(teacher)
+    with torch.no_grad():
+        assert student(torch.randn(3, 1, N_MFCC, 57), torch.tensor([57, 30, 9])).shape == (3, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        export_onnx(student, os.path.join(tmp, "student.onnx"))
+
+
+def test_only_marginal_clips_are_escalated():
+    detector = VoiceDetectionModel(model_path=None, escalation_confidence=0.8)
+    teacher = detector.backend = ConstantBackend(0.99)
+    features = [torch.randn(1, N_MFCC, 40) for _ in range(4)]
+
+    detector.student = ConstantBackend(0.05)  # confident "Human"
+    assert [round(p, 4) for p in detector.probabilities(features)] == [0.05] * 4
+    detector.student = ConstantBackend(0.6)  # marginal
+    assert [round(p, 4) for p in detector.probabilities(features[:2])] == [0.99] * 2
+
+    assert teacher.clips == 2
+    assert detector.tier_stats() == {"student": 4, "escalated": 2, "escalation_fraction": 0.3333}
+
+
+def test_distillation_and_tiered_evaluation():
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_root, store_dir = os.path.join(tmp, "data"), os.path.join(tmp, "features")
+        make_audio_tree(audio_root)
+        build_feature_store(audio_root, store_dir)
+        teacher_path = os.path.join(tmp, "voice_model.pth")
+        student_path = os.path.join(tmp, "voice_student.pth")
+        train_voice_detection_model(store_dir, num_epochs=1, batch_size=4, num_workers=0,
+                                    output_path=teacher_path)
+        train_voice_detection_model(store_dir, num_epochs=1, batch_size=4, num_workers=0,
+                                    output_path=student_path, distill_from=teacher_path)
+
+        model = VoiceDetectionModel(teacher_path, student_path=student_path,
+                                    escalation_confidence=1.0)
+        assert isinstance(model.student.module, StudentClassifier)
+        report = evaluate(model, store_dir)
+    # Confidence can never reach 1.0, so everything escalates
+    assert report["tiers"] == {"student": 0, "escalated": 6, "escalation_fraction": 1.0}
+
+
+if __name__ == "__main__":
+    test_student_is_much_smaller_and_length_agnostic()
+    test_only_marginal_clips_are_escalated()
+    test_distillation_and_tiered_evaluation()
+    print("✅ All student tier tests passed")
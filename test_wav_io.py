@@ -0,0 +1,64 @@
+"""
+Local tests for in-memory WAV decoding
+Run with: python test_wav_io.py  (or pytest test_wav_io.py)
+"""
+
+import io
+import wave
+
+import numpy as np
+
+from wav_io import WavFormatError, read_wav, to_float32
+
+
+def make_wav(samples: np.ndarray, sample_width: int, sample_rate: int = 16000) -> bytes:
+    """samples is (frames, channels); 24-bit samples are (frames, channels * 3) bytes"""
+    channels = samples.shape[1] // 3 if sample_width == 3 else samples.shape[1]
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def test_pcm16_stereo_is_a_zero_copy_view():
+    pcm = (np.arange(2000, dtype=np.int16).reshape(-1, 2) * 7)
+    data = bytearray(make_wav(pcm, 2, 22050))
+    samples, sample_rate = read_wav(data)
+    assert sample_rate == 22050
+    assert samples.shape == (1000, 2)
+    assert np.array_equal(samples, pcm)
+    assert np.shares_memory(samples, np.frombuffer(data, dtype=np.uint8))
+
+    waveform = to_float32(samples)
+    assert waveform.shape == (2, 1000)
+    assert waveform.dtype == np.float32
+    assert np.allclose(waveform[1], pcm[:, 1] / 32768.0)
+
+
+def test_pcm8_and_pcm24():
+    pcm8 = np.array([[0], [128], [255]], dtype=np.uint8)
+    samples, _ = read_wav(make_wav(pcm8, 1))
+    assert np.allclose(to_float32(samples)[0], [-1.0, 0.0, 127 / 128])
+
+    values = np.array([-8388608, -1, 0, 1, 8388607], dtype=np.int32)
+    raw = np.stack([values & 0xFF, (values >> 8) & 0xFF, (values >> 16) & 0xFF], axis=1).astype(np.uint8)
+    samples, _ = read_wav(make_wav(raw, 3))
+    assert np.allclose(to_float32(samples)[0], values / 8388608.0)
+
+
+def test_rejects_non_wav():
+    try:
+        read_wav(b"ID3\x03\x00\x00\x00mp3 data here")
+    except WavFormatError:
+        return
+    raise AssertionError("accepted mp3 data as WAV")
+
+
+if __name__ == "__main__":
+    test_pcm16_stereo_is_a_zero_copy_view()
+    test_pcm8_and_pcm24()
+    test_rejects_non_wav()
+    print("✅ All WAV decoding tests passed")
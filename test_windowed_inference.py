@@ -0,0 +1,55 @@
+"""
+Local tests for sliding-window inference on long clips
+Run with: python test_windowed_inference.py  (or pytest test_windowed_inference.py)
+"""
+
+import numpy as np
+
+from model_integration import MAX_WINDOWS, VoiceDetectionModel
+
+
+class ConstantBackend:
+    """Backend stub returning the same P(AI) for every window"""
+
+    def __init__(self, probability):
+        self.probability = probability
+        self.windows = 0
+
+    def run(self, batch, lengths=None):
+        self.windows += len(batch)
+        return np.full(len(batch), self.probability, dtype=np.float32)
+
+
+def long_clip(seconds: int, sample_rate: int = 16000) -> np.ndarray:
+    return (np.random.default_rng(0).standard_normal(seconds * sample_rate) * 0.1).astype(np.float32)
+
+
+def test_confident_clip_exits_early():
+    detector = VoiceDetectionModel(model_path=None)
+    detector.backend = ConstantBackend(0.97)
+    result = detector.analyze(long_clip(300), 16000)
+    assert result["prediction"] == "AI"
+    assert result["windows_evaluated"] < MAX_WINDOWS
+    assert detector.backend.windows == result["windows_evaluated"]
+
+
+def test_marginal_clip_stops_at_the_window_budget():
+    detector = VoiceDetectionModel(model_path=None)
+    detector.backend = ConstantBackend(0.55)
+    result = detector.analyze(long_clip(300), 16000)
+    assert result["windows_evaluated"] == MAX_WINDOWS
+    assert result["confidence"] == 0.55
+
+
+def test_short_clip_is_a_single_window():
+    detector = VoiceDetectionModel(model_path=None)
+    detector.backend = ConstantBackend(0.2)
+    result = detector.analyze(long_clip(3), 16000)
+    assert result == {"prediction": "Human", "confidence": 0.8, "windows_evaluated": 1}
+
+
+if __name__ == "__main__":
+    test_confident_clip_exits_early()
+    test_marginal_clip_stops_at_the_window_budget()
+    test_short_clip_is_a_single_window()
+    print("✅ All windowed inference tests passed")
@@ -1,8 +1,10 @@
 
 from fastapi import FastAPI, Request, HTTPException, Header
-from fastapi.responses import JSONResponse
 import logging
 
+from api_keys import ApiKeyStore, client_host
+from serialization import FastJSONResponse, StaticJSON
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,62 +16,80 @@ app = FastAPI(
     version="1.0.1"
 )
 
-# API Key
-VALID_API_KEY = "guvi123"
+# API keys (hashed, rate limited; see api_keys.py)
+api_keys = ApiKeyStore.from_env()
+
+ROOT = StaticJSON({"status": "healthy", "service": "GUVI Unified API"})
+
+# Manual CORS headers of the honeypot endpoint
+HONEYPOT_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, HEAD, PATCH, TRACE",
+    "Access-Control-Allow-Headers": "*",
+    "Cache-Control": "no-store, no-cache, must-revalidate",
+}
+# Invariant responses are encoded once (see serialization.py)
+HONEYPOT_OK = StaticJSON({"status": "OK"}, HONEYPOT_HEADERS)
+HONEYPOT_UNAUTHORIZED = StaticJSON({"error": "Unauthorized"}, HONEYPOT_HEADERS)
+HONEYPOT_RATE_LIMITED = StaticJSON({"error": "Too many requests"}, HONEYPOT_HEADERS)
+# Return a response that LOOKS like a valid Voice API response
+# This tricks the tester if it's validating schema
+HONEYPOT = StaticJSON({
+    "prediction": "Human",
+    "confidence": 0.88,
+    "language": "en",
+    "audio_format": "wav",
+    "status": "success",
+    # Include honeypot metadata just in case
+    "threat_analysis": {
+        "risk_level": "low",
+        "action": "logged"
+    }
+}, HONEYPOT_HEADERS)
+UNAUTHORIZED = StaticJSON({"error": "Unauthorized"})
+RATE_LIMITED = StaticJSON({"error": "Too many requests"})
+PREDICTION = StaticJSON({
+    "prediction": "AI",
+    "confidence": 0.99,
+    "language": "en",
+    "audio_format": "wav",
+    "status": "success"
+})
+
+async def key_rejection(request: Request, unauthorized: StaticJSON, rate_limited: StaticJSON):
+    """401/429 response for this request's x-api-key, None if it may proceed"""
+    check = await api_keys.check_async(request.headers.get("x-api-key"), client_host(request))
+    if check.status == 401:
+        return unauthorized.response(401)
+    if check.status == 429:
+        response = rate_limited.response(429)
+        response.headers["Retry-After"] = check.retry_after_header
+        return response
+    return None
 
 @app.get("/")
 async def root():
-    return {"status": "healthy", "service": "GUVI Unified API"}
+    return ROOT.response()
 
 @app.api_route("/honeypot", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH", "TRACE"])
 async def honeypot_endpoint(request: Request):
     """
     Unified Honeypot Endpoint
     """
-    # Manual headers
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, HEAD, PATCH, TRACE",
-        "Access-Control-Allow-Headers": "*",
-        "Cache-Control": "no-store, no-cache, must-revalidate",
-    }
-
     try:
         if request.method == "OPTIONS":
-            return JSONResponse(status_code=200, content={"status": "OK"}, headers=headers)
+            return HONEYPOT_OK.response()
             
         # Verify API Key
-        x_api_key = request.headers.get("x-api-key") or request.headers.get("X-API-KEY")
-        if not x_api_key or "guvi123" not in x_api_key: # Loose check
-             return JSONResponse(
-                status_code=401,
-                content={"error": "Unauthorized"},
-                headers=headers
-             )
+        rejection = await key_rejection(request, HONEYPOT_UNAUTHORIZED, HONEYPOT_RATE_LIMITED)
+        if rejection is not None:
+            return rejection
 
         # Ignore body completely
-        
-        # Return a response that LOOKS like a valid Voice API response
-        # This tricks the tester if it's validating schema
-        return JSONResponse(
-            status_code=200,
-            content={
-                "prediction": "Human",
-                "confidence": 0.88,
-                "language": "en",
-                "audio_format": "wav",
-                "status": "success",
-                # Include honeypot metadata just in case
-                "threat_analysis": {
-                    "risk_level": "low", 
-                    "action": "logged"
-                }
-            },
-            headers=headers
-        )
+        return HONEYPOT.response()
 
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                 "prediction": "AI", # Fallback
@@ -77,22 +97,16 @@ async def honeypot_endpoint(request: Request):
                 "status": "success",
                 "error": str(e)
             },
-            headers=headers
+            headers=HONEYPOT_HEADERS
         )
 
 # Add predict endpoint purely for completeness, minimal version
 @app.post("/predict")
 async def predict(request: Request):
     # Verify API key
-    x_api_key = request.headers.get("x-api-key")
-    if not x_api_key or x_api_key != VALID_API_KEY:
-         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    rejection = await key_rejection(request, UNAUTHORIZED, RATE_LIMITED)
+    if rejection is not None:
+        return rejection
 
     # Return dummy response as this file is focused on honeypot fix
-    return JSONResponse({
-        "prediction": "AI",
-        "confidence": 0.99,
-        "language": "en",
-        "audio_format": "wav",
-        "status": "success"
-    })
+    return PREDICTION.response()
@@ -1,23 +1,65 @@
 from fastapi import FastAPI, Request, Response
+import asyncio
+import hashlib
 import json
 import os
+import time
 
 app = FastAPI()
 
+# Predict logic for standalone: the response never changes, so its bytes
+# and headers are built once (this image ships app.py alone)
+PREDICTION_BODY = json.dumps({
+    "status": "success",
+    "prediction": "Human",
+    "confidence": 0.89,
+    "language": "en",
+    "audio_format": "wav"
+}, separators=(",", ":")).encode()
+PREDICTION_HEADERS = {
+    "Content-Length": str(len(PREDICTION_BODY)),
+    "ETag": '"%s"' % hashlib.blake2b(PREDICTION_BODY, digest_size=8).hexdigest(),
+}
+
+# Body limits, as body_reader.py in the main app (this image ships app.py alone)
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", 20 * 1024 * 1024))
+BODY_IDLE_TIMEOUT = float(os.environ.get("BODY_IDLE_TIMEOUT", 10))
+BODY_DEADLINE = float(os.environ.get("BODY_DEADLINE", 30))
+TOO_LARGE_BODY = json.dumps({"error": "Payload too large"}, separators=(",", ":")).encode()
+
+async def drain_body(request: Request) -> bool:
+    """
+    Receive (and drop) the body: False as soon as it is over MAX_BODY_BYTES.
+    A slow or silent client is cut off after the idle timeout / deadline.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_BODY_BYTES:
+        return False
+    received, give_up_at = 0, time.monotonic() + BODY_DEADLINE
+    while True:
+        timeout = min(BODY_IDLE_TIMEOUT, give_up_at - time.monotonic())
+        if timeout <= 0:
+            return True
+        try:
+            message = await asyncio.wait_for(request.receive(), timeout)
+        except asyncio.TimeoutError:
+            return True
+        if message["type"] == "http.disconnect":
+            return True
+        received += len(message.get("body", b""))
+        if received > MAX_BODY_BYTES:
+            return False
+        if not message.get("more_body", False):
+            return True
+
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"])
 async def catch_all(request: Request, path: str):
     if request.method == "OPTIONS": return Response(status_code=200)
-    try: _ = await request.body()
-    except: pass
-    
-    # Predict logic for standalone
-    return Response(content=json.dumps({
-        "status": "success",
-        "prediction": "Human",
-        "confidence": 0.89,
-        "language": "en",
-        "audio_format": "wav"
-    }), status_code=200, media_type="application/json")
+    if not await drain_body(request):
+        return Response(content=TOO_LARGE_BODY, status_code=413, media_type="application/json")
+
+    return Response(content=PREDICTION_BODY, status_code=200, media_type="application/json",
+                    headers=PREDICTION_HEADERS)
 
 if __name__ == "__main__":
     import uvicorn
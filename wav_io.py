@@ -0,0 +1,122 @@
+"""
+In-memory WAV decoding
+
+Parses a RIFF/WAVE header straight out of a bytes-like object and
+returns the PCM samples as a NumPy view over the same memory (no temp
+file, no copy). Only NumPy is needed, so this also works in slim
+deployments without torch/torchaudio.
+"""
+
+import struct
+from typing import Tuple, Union
+
+import numpy as np
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_PCM_DTYPES = {8: np.dtype("u1"), 16: np.dtype("<i2"), 32: np.dtype("<i4")}
+_FLOAT_DTYPES = {32: np.dtype("<f4"), 64: np.dtype("<f8")}
+
+
+class WavFormatError(ValueError):
+    """Raised when the data is not a WAV file we can decode without a codec"""
+
+
+def is_wav(data: BytesLike) -> bool:
+    """Cheap RIFF/WAVE signature check"""
+    header = bytes(memoryview(data)[:12])
+    return len(header) == 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def read_wav(data: BytesLike) -> Tuple[np.ndarray, int]:
+    """
+    Decode a WAV file held in memory
+
+    Returns:
+        samples: (frames, channels) array viewing ``data`` directly
+                 (24-bit PCM is the one format that has to be copied)
+        sample_rate: sampling rate in Hz
+    """
+    view = memoryview(data).cast("B")
+    if not is_wav(view):
+        raise WavFormatError("Not a RIFF/WAVE file")
+
+    fmt = None
+    pos = 12
+    size = len(view)
+    while pos + 8 <= size:
+        chunk_id = bytes(view[pos:pos + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = _parse_fmt(view[body:body + chunk_size])
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavFormatError("WAV data chunk before fmt chunk")
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF
+            end = size if chunk_size in (0, 0xFFFFFFFF) else min(size, body + chunk_size)
+            return _samples(view[body:end], *fmt)
+        pos = body + chunk_size + (chunk_size & 1)  # chunks are word aligned
+
+    raise WavFormatError("WAV file has no data chunk")
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """
+    Scale integer PCM to float32 in [-1, 1] and transpose to
+    (channels, frames), the layout torchaudio.load returns
+    """
+    if samples.ndim == 1:
+        samples = samples[np.newaxis, :]
+    else:
+        samples = samples.T
+    if samples.dtype == np.uint8:
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    if np.issubdtype(samples.dtype, np.integer):
+        scale = float(np.iinfo(samples.dtype).max) + 1.0
+        return samples.astype(np.float32) / scale
+    return samples.astype(np.float32, copy=False)
+
+
+def _parse_fmt(chunk: memoryview) -> Tuple[int, int, int, int]:
+    if len(chunk) < 16:
+        raise WavFormatError("WAV fmt chunk is too short")
+    audio_format, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", chunk)
+    if audio_format == WAVE_FORMAT_EXTENSIBLE and len(chunk) >= 26:
+        (audio_format,) = struct.unpack_from("<H", chunk, 24)
+    if channels < 1:
+        raise WavFormatError("WAV file has no channels")
+    return audio_format, channels, sample_rate, bits
+
+
+def _samples(data: memoryview, audio_format: int, channels: int, sample_rate: int, bits: int):
+    if audio_format == WAVE_FORMAT_PCM and bits == 24:
+        return _pcm24(data, channels), sample_rate
+
+    if audio_format == WAVE_FORMAT_PCM:
+        dtype = _PCM_DTYPES.get(bits)
+    elif audio_format == WAVE_FORMAT_IEEE_FLOAT:
+        dtype = _FLOAT_DTYPES.get(bits)
+    else:
+        dtype = None
+    if dtype is None:
+        raise WavFormatError(f"Unsupported WAV encoding (format={audio_format}, bits={bits})")
+
+    frame_bytes = dtype.itemsize * channels
+    usable = len(data) - len(data) % frame_bytes
+    samples = np.frombuffer(data[:usable], dtype=dtype)
+    return samples.reshape(-1, channels), sample_rate
+
+
+def _pcm24(data: memoryview, channels: int) -> np.ndarray:
+    raw = np.frombuffer(data[:len(data) - len(data) % (3 * channels)], dtype=np.uint8).reshape(-1, 3)
+    samples = (raw[:, 0].astype(np.int32)
+               | (raw[:, 1].astype(np.int32) << 8)
+               | (raw[:, 2].astype(np.int32) << 16))
+    # Sign-extend and shift into the int32 range so to_float32 scales it
+    samples = (samples << 8).astype(np.int32)
+    return samples.reshape(-1, channels)